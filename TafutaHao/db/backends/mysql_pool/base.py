@@ -0,0 +1,14 @@
+"""MySQL backend with an in-process connection pool (see TafutaHao/db/pool.py)."""
+
+from django.db.backends.mysql import base
+
+from TafutaHao.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def pooled_connection_usable(self, conn):
+        try:
+            conn.ping()
+        except self.Database.Error:
+            return False
+        return True
@@ -0,0 +1,12 @@
+"""
+SQLite backend with the same in-process pool as mysql_pool, so connection
+handling can be benchmarked without a MySQL server.
+"""
+
+from django.db.backends.sqlite3 import base
+
+from TafutaHao.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    pass
@@ -0,0 +1,142 @@
+"""
+In-process connection pool for database backends without a native one
+(Django 5.2 only pools PostgreSQL). Used by the mysql_pool and sqlite3_pool
+engines; configure it with OPTIONS['pool'] = {'max_size': N, 'timeout': s}.
+
+Threads of one worker (gthread workers, the ASGI sync_to_async executor)
+share up to max_size open connections; closing a Django connection returns
+it to the pool instead of disconnecting. Pools are per process: a forked
+child starts with an empty pool and never touches the parent's sockets.
+"""
+
+import os
+import threading
+from collections import deque
+
+DEFAULT_MAX_SIZE = 10
+DEFAULT_TIMEOUT = 10
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._idle = deque()
+        self._size = 0  # open connections, idle or checked out
+        self._available = threading.Condition()
+
+    def checkout(self, connect, is_usable=None):
+        """
+        Return an idle connection (most recently used first), or open a new
+        one while below max_size, else wait up to `timeout` seconds. Raises
+        TimeoutError when no connection frees up in time.
+        """
+        with self._available:
+            while True:
+                while self._idle:
+                    conn = self._idle.pop()
+                    if is_usable is None or is_usable(conn):
+                        return conn
+                    self._size -= 1
+                    _close_quietly(conn)
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                if not self._available.wait(self.timeout):
+                    raise TimeoutError(
+                        f"No database connection available within {self.timeout}s "
+                        f"(pool max_size={self.max_size})."
+                    )
+        try:
+            return connect()
+        except BaseException:
+            self._release_slot()
+            raise
+
+    def checkin(self, conn):
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    def discard(self, conn):
+        _close_quietly(conn)
+        self._release_slot()
+
+    def stats(self):
+        with self._available:
+            return {'size': self._size, 'idle': len(self._idle), 'max_size': self.max_size}
+
+    def _release_slot(self):
+        with self._available:
+            self._size -= 1
+            self._available.notify()
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def get_pool(alias, options):
+    """The pool for a database alias in this process, created on first use."""
+    pid = os.getpid()
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != pid:
+            # Connections inherited across fork are dropped, not closed
+            pool = _pools[alias] = ConnectionPool(
+                max_size=options.get('max_size', DEFAULT_MAX_SIZE),
+                timeout=options.get('timeout', DEFAULT_TIMEOUT),
+            )
+        return pool
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mix into a backend's DatabaseWrapper (before it in the MRO) to take
+    connections from, and return them to, the process-wide pool.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict['OPTIONS'].get('pool') or {})
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)  # not a driver argument
+        return params
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        check = self.pooled_connection_usable if self.settings_dict['CONN_HEALTH_CHECKS'] else None
+        try:
+            return self.pool.checkout(lambda: connect(conn_params), check)
+        except TimeoutError as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def pooled_connection_usable(self, conn):
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        conn = self.connection
+        if self.in_atomic_block:
+            # Django keeps this wrapper's connection object until the
+            # atomic block exits, so it can't go back to the pool
+            with self.wrap_database_errors:
+                self.pool.discard(conn)
+            return
+        try:
+            if not self.autocommit:
+                conn.rollback()
+        except self.Database.Error:
+            self.pool.discard(conn)
+        else:
+            self.pool.checkin(conn)
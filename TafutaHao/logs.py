@@ -0,0 +1,101 @@
+# TafutaHao/logs.py
+
+"""
+Structured (JSON lines) logging that stays off the request thread.
+
+BackgroundJsonHandler only puts records on a bounded in-memory queue; a
+listener thread formats them as JSON and writes them to stderr or
+LOG_FILE. When the queue is full (the disk or pipe cannot keep up) records
+are dropped and counted rather than blocking requests. The listener is
+started lazily in each process, so it also works in gunicorn workers forked
+from a preloaded master.
+
+Extra fields passed with ``logger.info(..., extra={...})`` become JSON keys.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class BackgroundJsonHandler(logging.handlers.QueueHandler):
+    """Queue in front of a JSON stream or file handler, drained by a thread."""
+
+    def __init__(self, filename=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.filename = filename
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _target(self):
+        if self.filename:
+            os.makedirs(os.path.dirname(os.path.abspath(self.filename)), exist_ok=True)
+            handler = logging.handlers.WatchedFileHandler(self.filename)  # follows logrotate
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        return handler
+
+    def _ensure_listener(self):
+        # A forked child has the parent's queue but not its thread
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self.queue = queue.Queue(self.maxsize)
+                self._listener = logging.handlers.QueueListener(self.queue, self._target(), respect_handler_level=False)
+                self._listener.start()
+                self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Only what the JSON formatter needs, resolved now (args and the
+        # exception may not survive until the listener gets to them)
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        # Also called by logging.shutdown() at exit
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()  # writes what is still queued
+            self._pid = None
+        super().close()
+
@@ -0,0 +1,155 @@
+# TafutaHao/management/commands/benchmark_asgi.py
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from properties.models import Property
+
+HOST = 'localhost'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent-connection throughput of the read-only endpoints "
+        "served by the sync views under WSGI (thread pool, like gunicorn's "
+        "gthread workers) and the async views under ASGI (one event loop, like "
+        "a uvicorn worker). Each mode runs in its own subprocess so the URLconf "
+        "is built with the matching ASYNC_VIEWS setting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per concurrency level")
+        parser.add_argument('--concurrency', default='1,8,32', help="Comma-separated concurrency levels")
+        parser.add_argument('--path', action='append', dest='paths', help="URL to hit (repeatable)")
+        parser.add_argument('--page-cache', action='store_true', help="Leave the anonymous page cache on")
+        parser.add_argument('--mode', choices=['wsgi', 'asgi'], help="Run a single mode in-process and print JSON")
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or self.default_paths()
+        levels = [int(c) for c in options['concurrency'].split(',')]
+
+        if options['mode']:
+            runner = self.run_wsgi if options['mode'] == 'wsgi' else self.run_asgi
+            results = [runner(paths, options['requests'], level) for level in levels]
+            self.stdout.write(json.dumps(results))
+            return
+
+        self.stdout.write(f"Paths: {', '.join(paths)}")
+        self.stdout.write(f"{'mode':<6}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        for mode in ('wsgi', 'asgi'):
+            for row in self.run_subprocess(mode, paths, options):
+                self.stdout.write(
+                    f"{mode:<6}{row['concurrency']:>6}{row['rps']:>10.1f}"
+                    f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['errors']:>8}"
+                )
+
+    def default_paths(self):
+        property_id = Property.objects.filter(available=True).values_list('pk', flat=True).first()
+        paths = ['/browse/', '/properties/', '/properties/ajax/get-towns/?county=Nairobi']
+        if property_id:
+            paths.append(f'/properties/{property_id}/')
+        return paths
+
+    def run_subprocess(self, mode, paths, options):
+        cmd = [
+            sys.executable, sys.argv[0], 'benchmark_asgi', '--mode', mode,
+            '--requests', str(options['requests']), '--concurrency', options['concurrency'],
+        ]
+        for path in paths:
+            cmd += ['--path', path]
+        env = dict(os.environ, ASYNC_VIEWS='1' if mode == 'asgi' else '0')
+        if not options['page_cache']:
+            env['PAGE_CACHE_TIMEOUT'] = '0'  # measure the views, not cache hits
+        output = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    # ---- WSGI: blocking handler on a thread pool ----
+    def run_wsgi(self, paths, total, concurrency):
+        handler = WSGIHandler()
+        factory = RequestFactory(SERVER_NAME=HOST)
+
+        def one(i):
+            environ = factory.get(paths[i % len(paths)]).environ
+            status = []
+            start = time.perf_counter()
+            response = handler(environ, lambda s, headers, exc_info=None: status.append(s))
+            b''.join(response)
+            response.close()
+            return time.perf_counter() - start, not status[0].startswith('200')
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(concurrency)))  # warm-up
+            start = time.perf_counter()
+            samples = list(pool.map(one, range(total)))
+        return self.summarize(concurrency, samples, time.perf_counter() - start)
+
+    # ---- ASGI: coroutine handler on one event loop ----
+    def run_asgi(self, paths, total, concurrency):
+        handler = ASGIHandler()
+
+        async def one(i):
+            path, _, query = paths[i % len(paths)].partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                'query_string': query.encode(), 'root_path': '',
+                'headers': [(b'host', HOST.encode())],
+                'client': ('127.0.0.1', 50000), 'server': (HOST, 80),
+            }
+            sent = []
+            body_sent = False
+            finished = asyncio.Event()
+
+            async def receive():
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Django listens for a disconnect while the view runs
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if message['type'] == 'http.response.body' and not message.get('more_body'):
+                    finished.set()
+
+            start = time.perf_counter()
+            await handler(scope, receive, send)
+            return time.perf_counter() - start, sent[0]['status'] != 200
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(i):
+                async with semaphore:
+                    return await one(i)
+
+            await asyncio.gather(*(bounded(i) for i in range(concurrency)))  # warm-up
+            start = time.perf_counter()
+            samples = await asyncio.gather(*(bounded(i) for i in range(total)))
+            return samples, time.perf_counter() - start
+
+        samples, elapsed = asyncio.run(run())
+        return self.summarize(concurrency, samples, elapsed)
+
+    def summarize(self, concurrency, samples, elapsed):
+        latencies = sorted(latency for latency, _ in samples)
+        return {
+            'concurrency': concurrency,
+            'rps': len(samples) / elapsed,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            'errors': sum(1 for _, failed in samples if failed),
+        }
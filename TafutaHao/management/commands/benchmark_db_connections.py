@@ -0,0 +1,99 @@
+# TafutaHao/management/commands/benchmark_db_connections.py
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+
+from properties.models import Property
+
+# Environment for each connection strategy (see DATABASES in settings.py)
+MODES = {
+    'per-request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL_SIZE': '0'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL_SIZE': '0'},
+    'pool': {'DB_CONN_MAX_AGE': '0'},  # DB_POOL_SIZE set to the thread count
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database connection overhead. Each simulated "
+        "request fires request_started/request_finished around one small "
+        "query, exactly where Django opens and closes connections, across "
+        "worker threads. Compares a new connection per request, persistent "
+        "connections (CONN_MAX_AGE) and the in-process pool (DB_POOL_SIZE). "
+        "Point DATABASE_URL at a local MySQL, or at a SQLite file as a stand-in."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Simulated requests per mode")
+        parser.add_argument('--threads', type=int, default=4, help="Worker threads")
+        parser.add_argument('--mode', choices=list(MODES), help="Run a single mode in-process and print JSON")
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            self.stdout.write(json.dumps(self.run(options['requests'], options['threads'])))
+            return
+
+        self.stdout.write(f"Database: {connection.settings_dict['ENGINE']} {connection.settings_dict['NAME']}")
+        self.stdout.write(f"{'mode':<13}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'connects':>10}")
+        for mode, env in MODES.items():
+            row = self.run_subprocess(mode, env, options)
+            self.stdout.write(
+                f"{mode:<13}{row['rps']:>10.1f}{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['connects']:>10}"
+            )
+
+    def run_subprocess(self, mode, mode_env, options):
+        cmd = [
+            sys.executable, sys.argv[0], 'benchmark_db_connections', '--mode', mode,
+            '--requests', str(options['requests']), '--threads', str(options['threads']),
+        ]
+        env = {**os.environ, 'DB_POOL_SIZE': str(options['threads']), **mode_env}
+        output = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def run(self, total, threads):
+        connects = []
+        lock = threading.Lock()
+
+        def count_connect(sender, connection, **kwargs):
+            with lock:
+                connects.append(connection.alias)
+
+        def one(_):
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            try:
+                Property.objects.filter(available=True).exists()
+            finally:
+                request_finished.send(sender=self.__class__)
+            return time.perf_counter() - start
+
+        connection_created.connect(count_connect)
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                start = time.perf_counter()
+                latencies = sorted(pool.map(one, range(total)))
+                elapsed = time.perf_counter() - start
+                # Release each thread's connection before the pool goes away
+                list(pool.map(lambda _: connections.close_all(), range(threads)))
+        finally:
+            connection_created.disconnect(count_connect)
+
+        # connection_created fires on every pool checkout; count real sockets
+        pool = getattr(connection, 'pool', None)
+        return {
+            'rps': total / elapsed,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            'connects': pool.stats()['size'] if pool else len(connects),
+        }
@@ -0,0 +1,135 @@
+# TafutaHao/management/commands/benchmark_startup.py
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so nothing is imported or cached yet
+STARTUP_SCRIPT = '''
+import json, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from TafutaHao.wsgi import application
+loaded = time.perf_counter()
+if {warm!r}:
+    from TafutaHao.warmup import warm_up
+    warm_up()
+warmed = time.perf_counter()
+
+from django.test import RequestFactory
+factory = RequestFactory(SERVER_NAME='localhost')
+
+def request():
+    begin = time.perf_counter()
+    status = []
+    response = application(factory.get({path!r}).environ, lambda s, h, e=None: status.append(s))
+    b''.join(response)
+    response.close()
+    return (time.perf_counter() - begin) * 1000, status[0]
+
+first_ms, status = request()
+second_ms, _ = request()
+print(json.dumps({{
+    'setup_ms': (setup - start) * 1000,
+    'wsgi_ms': (loaded - setup) * 1000,
+    'warm_up_ms': (warmed - loaded) * 1000,
+    'first_request_ms': first_ms,
+    'second_request_ms': second_ms,
+    'status': status,
+}}))
+'''
+
+IMPORT_SCRIPT = 'import django; django.setup(); import TafutaHao.wsgi'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker cold start: a `python -X importtime` breakdown of "
+        "django.setup() plus the WSGI app, and the first/second request "
+        "latency of a fresh process with and without TafutaHao.warmup. "
+        "Pass --output to append the results to a JSON-lines file so they "
+        "can be tracked across commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/browse/', help="URL for the first-request timing")
+        parser.add_argument('--runs', type=int, default=3, help="Fresh processes per variant (median is reported)")
+        parser.add_argument('--top', type=int, default=15, help="Packages to list in the import breakdown")
+        parser.add_argument('--output', help="Append a JSON line with the results to this file")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, PAGE_CACHE_TIMEOUT='0')  # time the view, not a cache hit
+
+        imports = self.import_breakdown(env)
+        self.stdout.write(f"Import time ({imports['modules']} modules, {imports['total_ms']:.1f} ms self time)")
+        self.stdout.write(f"{'self ms':>10}{'modules':>9}  package")
+        for package, ms, count in imports['packages'][:options['top']]:
+            self.stdout.write(f"{ms:>10.1f}{count:>9}  {package}")
+
+        results = {}
+        for variant, warm in (('cold', False), ('warm', True)):
+            runs = [self.startup_run(env, options['path'], warm) for _ in range(options['runs'])]
+            results[variant] = {key: statistics.median(run[key] for run in runs) for key in runs[0] if key != 'status'}
+            results[variant]['status'] = runs[0]['status']
+
+        keys = ('setup_ms', 'wsgi_ms', 'warm_up_ms', 'first_request_ms', 'second_request_ms')
+        self.stdout.write(f"\nStartup, median of {options['runs']} fresh processes (GET {options['path']})")
+        self.stdout.write(f"{'':<8}" + ''.join(f"{key[:-3]:>16}" for key in keys))
+        for variant, row in results.items():
+            self.stdout.write(f"{variant:<8}" + ''.join(f"{row[key]:>16.1f}" for key in keys))
+
+        if options['output']:
+            record = {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'path': options['path'],
+                'import_total_ms': round(imports['total_ms'], 1),
+                'import_top': [[package, round(ms, 1)] for package, ms, _ in imports['packages'][:options['top']]],
+                'startup': results,
+            }
+            with open(options['output'], 'a') as f:
+                f.write(json.dumps(record) + '\n')
+            self.stdout.write(f"\nAppended results to {options['output']}")
+
+    def import_breakdown(self, env):
+        stderr = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', IMPORT_SCRIPT],
+            env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stderr
+
+        packages = defaultdict(lambda: [0.0, 0])
+        for line in stderr.splitlines():
+            # "import time:       412 |       1830 |   django.db.models"
+            if not line.startswith('import time:') or 'imported package' in line:
+                continue
+            self_us, _, name = line[len('import time:'):].split('|')
+            package = packages[name.strip().split('.')[0]]
+            package[0] += int(self_us) / 1000
+            package[1] += 1
+
+        rows = sorted(((name, ms, count) for name, (ms, count) in packages.items()), key=lambda r: r[1], reverse=True)
+        return {
+            'total_ms': sum(ms for _, ms, _ in rows),
+            'modules': sum(count for _, _, count in rows),
+            'packages': rows,
+        }
+
+    def startup_run(self, env, path, warm):
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT.format(path=path, warm=warm)],
+            env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
@@ -0,0 +1,402 @@
+# TafutaHao/management/commands/loadtest.py
+
+import io
+import itertools
+import json
+import mimetypes
+import random
+import re
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from functools import lru_cache
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import Resolver404, resolve
+from PIL import Image
+
+from accounts.deletion import purge_account
+from accounts.models import CustomUser
+from landlords.models import LandlordProfile
+from properties.constants import KENYA_COUNTIES
+from properties.models import Property
+
+HOST = 'localhost'
+PASSWORD = 'Load-test-pass-42'
+USER_PREFIX = 'loadtest_'
+SEED_USERNAME = 'loadtest-seed'
+SEED_PLACES = [('Nairobi', 'Westlands'), ('Nairobi', 'Kilimani'), ('Mombasa', 'Nyali'), ('Kiambu', 'Ruiru'), ('Nakuru', 'Milimani')]
+HOUSE_TYPES = [value for value, _ in Property.HOUSE_TYPE]
+EDIT_LINK_RE = re.compile(rb'/landlord/edit/(\d+)/')
+DEFAULT_MIX = 'browse=70,tenant=20,landlord=10'
+
+
+def _png(seed):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (seed * 37 % 256, 120, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=1024)
+def url_name(path):
+    try:
+        return resolve(path.split('?')[0]).view_name
+    except Resolver404:
+        return path
+
+
+# =========================
+# Sessions (one per simulated visitor)
+# =========================
+class ClientSession:
+    """In-process: the test client, through the full middleware stack."""
+
+    def __init__(self):
+        self.client = Client(SERVER_NAME=HOST)
+
+    def request(self, method, path, data=None, files=None, headers=None):
+        if method == 'GET':
+            response = self.client.get(path, data, headers=headers)
+        else:
+            payload = dict(data or {})
+            for name, uploads in (files or {}).items():
+                payload[name] = [SimpleUploadedFile(filename, content) for filename, content in uploads]
+            response = self.client.post(path, payload, headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, body
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None  # journeys check the redirect status themselves
+
+
+class RemoteSession:
+    """A running server over HTTP, with cookies and the CSRF token."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirect())
+
+    def _csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def request(self, method, path, data=None, files=None, headers=None):
+        url = self.base_url + path
+        headers = dict(headers or {})
+        body = None
+        if method == 'GET':
+            if data:
+                url += ('&' if '?' in url else '?') + urlencode(data)
+        else:
+            headers['X-CSRFToken'] = self._csrf_token()
+            headers['Referer'] = url
+            if files:
+                body, headers['Content-Type'] = self._multipart(data or {}, files)
+            else:
+                body = urlencode(data or {}).encode()
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            with self.opener.open(Request(url, data=body, headers=headers, method=method), timeout=60) as response:
+                return response.status, response.read()
+        except HTTPError as exc:
+            return exc.code, exc.read()
+
+    @staticmethod
+    def _multipart(data, files):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in data.items():
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        for name, uploads in files.items():
+            for filename, content in uploads:
+                content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                parts.append(
+                    f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                    f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+                )
+        parts.append(f'--{boundary}--\r\n'.encode())
+        return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+# =========================
+# Journeys
+# =========================
+class Visitor:
+    """One simulated visitor running one journey; every request is recorded."""
+
+    def __init__(self, session, record, rng, listings, think_time):
+        self.session = session
+        self.record = record
+        self.rng = rng
+        self.listings = listings
+        self.think_time = think_time
+
+    def step(self, method, path, data=None, files=None, expect=(200,), headers=None):
+        start = time.perf_counter()
+        try:
+            status, body = self.session.request(method, path, data, files, headers)
+        except Exception:
+            status, body = None, b''
+        name = url_name(path) if method == 'GET' else f'{url_name(path)} [{method}]'
+        self.record(name, time.perf_counter() - start, status not in expect)
+        if self.think_time:
+            time.sleep(self.rng.uniform(0, 2 * self.think_time))
+        return status, body
+
+    def filters(self):
+        county, town = self.rng.choice(self.listings.places)
+        params = {'county': county}
+        if self.rng.random() < 0.4:
+            params['town'] = town
+        if self.rng.random() < 0.5:
+            params['house_type'] = self.rng.choice(HOUSE_TYPES)
+        if self.rng.random() < 0.3:
+            params['max_rent'] = self.rng.choice([10000, 20000, 50000])
+        return params
+
+    def signup(self, username, role):
+        self.step('GET', '/accounts/signup/')
+        status, _ = self.step('POST', '/accounts/signup/', {
+            'username': username, 'email': f'{username}@example.com',
+            'password1': PASSWORD, 'password2': PASSWORD, 'role': role,
+        }, expect=(302,))
+        return status == 302
+
+    def browse(self):
+        """Anonymous: filter, page through the results, open a listing."""
+        params = self.filters()
+        self.step('GET', '/browse/', params)
+        self.step('GET', '/properties/ajax/get-towns/', {'county': params['county']})
+        self.step('GET', '/browse/', {**params, 'page': 2}, expect=(200, 404), headers={'X-Fragment': 'results'})
+        for property_id in self.rng.sample(self.listings.ids, min(2, len(self.listings.ids))):
+            self.step('GET', f'/properties/{property_id}/')
+            self.step('GET', f'/properties/{property_id}/images/')
+
+    def tenant(self, username):
+        """Sign up as a tenant, browse, toggle favorites, open the profile."""
+        if not self.signup(username, 'tenant'):
+            return
+        self.step('GET', '/browse/', self.filters())
+        for property_id in self.rng.sample(self.listings.ids, min(3, len(self.listings.ids))):
+            self.step('GET', f'/properties/{property_id}/')
+            self.step('POST', f'/browse/favorite/{property_id}/', expect=(302,))
+            if self.rng.random() < 0.3:
+                self.step('POST', f'/browse/favorite/{property_id}/', expect=(302,))  # and back
+        self.step('GET', '/browse/profile/')
+
+    def landlord(self, username):
+        """Sign up as a landlord, add a listing with images, then edit it."""
+        if not self.signup(username, 'landlord'):
+            return
+        county, town = self.rng.choice(self.listings.places)
+        listing = {
+            'house_type': self.rng.choice(HOUSE_TYPES), 'house_number': f'LT-{self.rng.randint(1, 9999)}',
+            'rent': self.rng.randrange(5000, 80000, 500), 'county': county, 'town': town,
+            'location': f'{town} Road', 'description': 'Load test listing', 'available': 'on',
+        }
+        images = [(f'photo{n}.png', _png(n)) for n in range(2)]
+        self.step('GET', '/landlord/add/')
+        self.step('POST', '/landlord/add/', listing, {'images': images}, expect=(302,))
+        _, body = self.step('GET', '/landlord/properties/')
+        match = EDIT_LINK_RE.search(body)
+        if not match:
+            return
+        edit_path = f'/landlord/edit/{int(match.group(1))}/'
+        self.step('GET', edit_path)
+        self.step('POST', edit_path, {**listing, 'rent': listing['rent'] + 500}, expect=(302,))
+        self.step('GET', '/landlord/')
+
+
+class Listings:
+    def __init__(self):
+        rows = list(Property.objects.filter(available=True).order_by('-pk').values_list('pk', 'county', 'town')[:500])
+        self.ids = [pk for pk, _, _ in rows]
+        self.places = sorted({(county, town) for _, county, town in rows})
+
+
+# =========================
+# Command
+# =========================
+class Command(BaseCommand):
+    help = (
+        "Load-test the site with scripted journeys: anonymous browsing with "
+        "filters and detail views, tenant signup with favorite toggles, and "
+        "landlords adding a listing with images and editing it. Runs each "
+        "concurrency level for --duration seconds, in-process through the test "
+        "client (one process with N threads, like a gthread worker) or against "
+        "a running server with --url, and reports throughput, latency "
+        "percentiles and errors per URL name plus the saturation point. Users "
+        "it signs up are purged afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="Base URL of a running server (default: in-process test client)")
+        parser.add_argument('--concurrency', default='1,4,8,16', help="Comma-separated concurrent visitor counts")
+        parser.add_argument('--duration', type=float, default=15, help="Seconds per concurrency level")
+        parser.add_argument('--mix', default=DEFAULT_MIX, help="Journey weights, e.g. browse=70,tenant=20,landlord=10")
+        parser.add_argument('--think-time', type=float, default=0, help="Mean pause between requests, in seconds")
+        parser.add_argument('--seed', type=int, default=0, help="Create this many listings first if there are fewer")
+        parser.add_argument('--json', action='store_true', help="Print the results as JSON")
+        parser.add_argument('--keep', action='store_true', help="Keep the users (and listings) the journeys created")
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        levels = sorted(int(level) for level in options['concurrency'].split(','))
+        if options['seed']:
+            self.seed_listings(options['seed'])
+        listings = Listings()
+        if not listings.ids:
+            raise CommandError("No available listings to browse; run with --seed 200 first.")
+
+        user_prefix = f'{USER_PREFIX}{uuid.uuid4().hex[:6]}_'
+        results = []
+        try:
+            for index, level in enumerate(levels):
+                # Levels (which may repeat) and their workers number users apart
+                result = self.run_level(level, options, mix, listings, f'{user_prefix}{index}_')
+                results.append(result)
+                if not options['json']:
+                    self.print_level(result)
+        finally:
+            if not options['keep']:
+                purged = self.purge_users(user_prefix)
+                if purged and not options['json']:
+                    self.stdout.write(f"Purged {purged} load-test users.")
+
+        saturation = self.saturation_point(results)
+        if options['json']:
+            self.stdout.write(json.dumps({'levels': results, 'saturation': saturation}))
+            return
+        self.stdout.write(f"\n{'visitors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+        for result in results:
+            total = result['total']
+            self.stdout.write(
+                f"{result['concurrency']:>8}{result['rps']:>10.1f}{total['p50_ms']:>10.1f}"
+                f"{total['p95_ms']:>10.1f}{total['p99_ms']:>10.1f}{total['error_rate']:>8.1%}"
+            )
+        if saturation and saturation['concurrency'] == levels[-1]:
+            self.stdout.write(f"Not saturated: throughput still rises at {levels[-1]} visitors; try higher levels.")
+        elif saturation:
+            self.stdout.write(self.style.SUCCESS(
+                f"Saturation: ~{saturation['concurrency']} concurrent visitors at {saturation['rps']:.1f} req/s; "
+                f"more visitors only add latency."
+            ))
+
+    def parse_mix(self, value):
+        mix = {}
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            if name not in ('browse', 'tenant', 'landlord') or not weight.isdigit():
+                raise CommandError(f"Bad --mix entry: {part!r}")
+            mix[name] = int(weight)
+        return mix
+
+    def seed_listings(self, count):
+        missing = count - Property.objects.filter(available=True).count()
+        if missing <= 0:
+            return
+        user, created = CustomUser.objects.get_or_create(username=SEED_USERNAME, defaults={'role': 'landlord'})
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        landlord, _ = LandlordProfile.objects.get_or_create(user=user)
+        rng = random.Random(count)
+        for n in range(missing):
+            county, town = rng.choice(SEED_PLACES) if rng.random() < 0.8 else (rng.choice(KENYA_COUNTIES), 'Town Centre')
+            Property.objects.create(
+                landlord=landlord, house_type=rng.choice(HOUSE_TYPES), house_number=f'S-{n}',
+                rent=rng.randrange(4000, 90000, 500), county=county, town=town,
+                location=f'{town} Estate', description='Seeded for load testing',
+            )
+        self.stdout.write(f"Seeded {missing} listings (landlord {SEED_USERNAME}).")
+
+    def run_level(self, concurrency, options, mix, listings, user_prefix):
+        samples = defaultdict(list)  # url name -> [(seconds, failed)]
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+        journeys, weights = zip(*mix.items())
+
+        def record(name, seconds, failed):
+            with lock:
+                samples[name].append((seconds, failed))
+
+        def worker(number):
+            rng = random.Random(f'{concurrency}-{number}')
+            # Generators are not thread-safe, so each worker numbers its own users
+            usernames = (f'{user_prefix}{number}_{n}' for n in itertools.count())
+            while time.monotonic() < deadline:
+                session = RemoteSession(options['url']) if options['url'] else ClientSession()
+                visitor = Visitor(session, record, rng, listings, options['think_time'])
+                journey = rng.choices(journeys, weights)[0]
+                if journey == 'browse':
+                    visitor.browse()
+                else:
+                    getattr(visitor, journey)(next(usernames))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        all_samples = [sample for rows in samples.values() for sample in rows]
+        return {
+            'concurrency': concurrency,
+            'elapsed': elapsed,
+            'rps': len(all_samples) / elapsed,
+            'total': self.summarize(all_samples, elapsed),
+            'urls': {name: self.summarize(rows, elapsed) for name, rows in sorted(samples.items())},
+        }
+
+    def summarize(self, rows, elapsed):
+        latencies = sorted(seconds for seconds, _ in rows)
+        errors = sum(1 for _, failed in rows if failed)
+
+        def percentile(p):
+            return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else 0
+
+        return {
+            'requests': len(rows),
+            'rps': len(rows) / elapsed,
+            'p50_ms': statistics.median(latencies) * 1000 if latencies else 0,
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'errors': errors,
+            'error_rate': errors / len(rows) if rows else 0,
+        }
+
+    def print_level(self, result):
+        self.stdout.write(f"\n== {result['concurrency']} concurrent visitors, {result['elapsed']:.1f} s ==")
+        self.stdout.write(f"{'url name':<42}{'reqs':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for name, row in list(result['urls'].items()) + [('TOTAL', result['total'])]:
+            self.stdout.write(
+                f"{name:<42}{row['requests']:>7}{row['rps']:>9.1f}{row['p50_ms']:>9.1f}"
+                f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['error_rate']:>7.1%}"
+            )
+
+    def saturation_point(self, results):
+        """The lowest level reaching 90% of the best throughput."""
+        if len(results) < 2:
+            return None
+        best = max(result['rps'] for result in results)
+        for result in results:
+            if result['rps'] >= 0.9 * best:
+                return {'concurrency': result['concurrency'], 'rps': result['rps']}
+
+    def purge_users(self, prefix):
+        user_ids = list(CustomUser.objects.filter(username__startswith=prefix).values_list('pk', flat=True))
+        for user_id in user_ids:
+            purge_account(user_id)
+        return len(user_ids)
@@ -0,0 +1,55 @@
+# TafutaHao/management/commands/profile_templates.py
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from TafutaHao.templating import profile_template_nodes
+
+HOST = 'localhost'
+
+
+class Command(BaseCommand):
+    help = (
+        "Render pages repeatedly and report where template time goes, per "
+        "{% for %} and {% include %} node (inclusive and self time). The "
+        "landlord dashboard needs --user with a landlord account."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', dest='paths', help="URL to render (repeatable)")
+        parser.add_argument('--user', help="Username to log in as")
+        parser.add_argument('--repeat', type=int, default=20, help="Renders per path")
+        parser.add_argument('--top', type=int, default=20, help="Rows to show per path")
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/browse/', '/landlord/']
+        client = Client(SERVER_NAME=HOST)
+        if options['user']:
+            try:
+                client.force_login(get_user_model().objects.get(username=options['user']))
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}.")
+
+        # Page-cache hits skip rendering entirely
+        with override_settings(PAGE_CACHE_TIMEOUT=0):
+            for path in paths:
+                self.profile(client, path, options['repeat'], options['top'])
+
+    def profile(self, client, path, repeat, top):
+        response = client.get(path)  # warm the template cache and connections
+        if response.status_code != 200:
+            self.stdout.write(f"\n{path}: HTTP {response.status_code}, skipped (login required? pass --user)")
+            return
+
+        with profile_template_nodes() as timings:
+            for _ in range(repeat):
+                client.get(path)
+
+        self.stdout.write(f"\n{path} ({repeat} renders, ms per render)")
+        self.stdout.write(f"{'total':>9}{'self':>9}{'calls':>7}  node")
+        for template, line, tag, calls, total, own in timings.rows()[:top]:
+            self.stdout.write(
+                f"{total * 1000 / repeat:>9.3f}{own * 1000 / repeat:>9.3f}{calls // repeat:>7}"
+                f"  {template}:{line} {{% {tag[:60]} %}}"
+            )
@@ -0,0 +1,24 @@
+# TafutaHao/management/commands/warm_templates.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from TafutaHao.templating import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile every project and app template so syntax errors surface at "
+        "deploy time. With TEMPLATE_CACHED_LOADER on, warm_templates() can run "
+        "in-process at worker start to keep compiled templates in memory "
+        "before the first request."
+    )
+
+    def handle(self, *args, **options):
+        compiled, errors = warm_templates()
+        for name, error in errors.items():
+            self.stderr.write(f"{name}: {error}")
+        mode = 'cached' if settings.TEMPLATE_CACHED_LOADER else 'uncached'
+        self.stdout.write(f"Compiled {len(compiled)} templates ({mode} loader).")
+        if errors:
+            raise CommandError(f"{len(errors)} templates failed to compile.")
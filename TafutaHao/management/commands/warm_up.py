@@ -0,0 +1,21 @@
+# TafutaHao/management/commands/warm_up.py
+
+from django.core.management.base import BaseCommand
+
+from TafutaHao.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the worker warm-up steps (import views, build URL reverse tables, "
+        "compile templates, connect to the database, prime the town facets) "
+        "and report how long each takes. gunicorn.conf.py runs the same steps "
+        "in the master before forking."
+    )
+
+    def handle(self, *args, **options):
+        total = 0.0
+        for step, result, seconds in warm_up():
+            total += seconds
+            self.stdout.write(f"{step:<14}{result!s:>8}{seconds * 1000:>10.1f} ms")
+        self.stdout.write(f"{'total':<14}{'':>8}{total * 1000:>10.1f} ms")
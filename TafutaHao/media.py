@@ -0,0 +1,102 @@
+"""
+Serve uploaded media when DEBUG is off.
+
+With MEDIA_SENDFILE set, Django only checks the path and hands the transfer
+to the front-end web server (nginx X-Accel-Redirect / Apache X-Sendfile).
+Otherwise full files go out as a FileResponse, which WSGI servers such as
+gunicorn send with sendfile(), and single byte ranges get a 206 response so
+interrupted image downloads can resume.
+"""
+
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+SENDFILE_HEADERS = {
+    'x-accel-redirect': 'X-Accel-Redirect',
+    'x-sendfile': 'X-Sendfile',
+}
+
+
+def serve_media(request, path):
+    root = Path(settings.MEDIA_ROOT).resolve()
+    full_path = (root / path).resolve()
+    if root not in full_path.parents or not full_path.is_file():
+        raise Http404("File not found")
+
+    stat = full_path.stat()
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, encoding = mimetypes.guess_type(str(full_path))
+    content_type = content_type or 'application/octet-stream'
+
+    sendfile = settings.MEDIA_SENDFILE.lower()
+    if sendfile in SENDFILE_HEADERS:
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            relative = full_path.relative_to(root).as_posix()
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + relative
+        else:
+            response['X-Sendfile'] = str(full_path)
+    else:
+        response = _file_response(request, full_path, stat.st_size, content_type)
+
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def _file_response(request, full_path, size, content_type):
+    byte_range = _parse_range(request.META.get('HTTP_RANGE', ''), size)
+    if byte_range is None:
+        return FileResponse(open(full_path, 'rb'), content_type=content_type)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range
+    f = open(full_path, 'rb')
+    f.seek(start)
+    if end == size - 1:
+        # Open-ended ranges ("bytes=N-") still stream through sendfile
+        response = FileResponse(f, content_type=content_type, status=206)
+    else:
+        with f:
+            response = HttpResponse(f.read(end - start + 1), content_type=content_type, status=206)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
+
+
+def _parse_range(header, size):
+    """
+    Return (start, end) for a satisfiable single range, None when there is
+    no usable Range header (serve everything) and False when unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
@@ -0,0 +1,336 @@
+# TafutaHao/profiling.py
+
+"""
+Sampling profiler for chosen views, safe to leave running in production.
+
+Staff start a profiling session at /admin/profiling/ for one or more URL names
+(e.g. ``landlords:landlord_dashboard``). While a request to one of those
+views is running, a background thread in its process reads the request
+thread's stack every ``interval_ms`` and counts it as a collapsed stack
+(``view;module:function;...``). Nothing runs while no such request is in
+flight, the sampler backs off so it never takes more than MAX_OVERHEAD of
+the process's time, and at most PROFILE_MAX_STACKS distinct stacks are
+kept (the rest are counted as "[other stacks]"). For async views the
+thread sampled is the one their sync_to_async calls run in, not the event
+loop's.
+
+The session lives in the cache and each process publishes its counts
+there every PUBLISH_INTERVAL seconds, under a key of its own (host and
+pid) listed under the session, so with a cache shared by the workers
+(CACHE_BACKEND=file or db) the session reaches every worker and the
+download merges them; with locmem it covers the worker serving
+/admin/profiling/ only. The file and db backends have no atomic
+read-modify-write, so two processes listing themselves at once can drop
+one; each process checks the list again whenever it publishes. The
+download is in the folded format that flamegraph.pl, speedscope and
+inferno read.
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.shortcuts import redirect, render
+from django.urls import NoReverseMatch, reverse
+
+SESSION_KEY = 'profiling:session'
+SESSION_CHECK_INTERVAL = 1  # seconds a process trusts its copy of the session
+PUBLISH_INTERVAL = 5        # seconds between publishing counts to the cache
+RESULT_TTL = 60 * 60 * 24   # published counts are kept a day
+MAX_OVERHEAD = 0.02         # share of time the sampler may spend sampling
+MAX_DEPTH = 100             # innermost frames kept per stack
+OTHER_STACKS = '[other stacks]'
+
+
+def _workers_key(session_id):
+    return f'profiling:{session_id}:workers'
+
+
+def _stacks_key(session_id, worker):
+    return f'profiling:{session_id}:stacks:{worker}'
+
+
+def _worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+_frame_names = {}  # code object -> "module:qualname"
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    name = _frame_names.get(code)
+    if name is None:
+        if len(_frame_names) >= 20000:
+            _frame_names.clear()
+        module = frame.f_globals.get('__name__', '?')
+        name = _frame_names[code] = f'{module}:{code.co_qualname}'.replace(';', ':').replace(' ', '_')
+    return name
+
+
+def collapse_stack(view_name, frame):
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    if frame is not None:
+        names.append('...')
+    names.append(view_name)
+    return ';'.join(reversed(names))
+
+
+# =========================
+# Sessions
+# =========================
+def start_session(view_names, interval_ms):
+    session = {
+        'id': f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:4]}",
+        'views': sorted(set(view_names)),
+        'interval_ms': interval_ms,
+        'started': time.time(),
+    }
+    cache.set(SESSION_KEY, session, timeout=None)
+    return session
+
+
+def stop_session():
+    session = cache.get(SESSION_KEY)
+    if session:
+        cache.set(SESSION_KEY, {**session, 'views': [], 'stopped': time.time()}, timeout=None)
+
+
+def session_stacks(session_id):
+    """Collapsed stack -> sample count, merged over every process that published."""
+    workers = cache.get(_workers_key(session_id), [])
+    stacks = Counter()
+    for counts in cache.get_many([_stacks_key(session_id, worker) for worker in workers]).values():
+        stacks.update(counts)
+    return stacks, len(workers)
+
+
+def _list_worker(session_id, worker):
+    workers = cache.get(_workers_key(session_id), [])
+    if worker not in workers:
+        cache.set(_workers_key(session_id), sorted({*workers, worker}), RESULT_TTL)
+
+
+# =========================
+# Sampler
+# =========================
+class Profiler:
+    """One per process: which threads serve profiled views, and their stack counts."""
+
+    def __init__(self):
+        self.session = None
+        self.active = {}  # thread id -> view name
+        self.stacks = Counter()
+        self._dirty = False
+        self._checked = -SESSION_CHECK_INTERVAL
+        self._pid = None
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def current_session(self):
+        now = time.monotonic()
+        if now - self._checked >= SESSION_CHECK_INTERVAL:
+            self._checked = now
+            session = cache.get(SESSION_KEY)
+            with self._lock:
+                if session and (not self.session or self.session['id'] != session['id']):
+                    self.stacks = Counter()
+                    self._dirty = False
+                self.session = session
+        return self.session
+
+    def profiled_view(self, view_name):
+        session = self.current_session()
+        return bool(session) and view_name in session['views']
+
+    def track(self, view_name):
+        """Sample this thread for ``view_name``; returns its id for untrack."""
+        thread = threading.get_ident()
+        self._ensure_thread()
+        self.active[thread] = view_name
+        self._wake.set()
+        return thread
+
+    def untrack(self, thread):
+        self.active.pop(thread, None)
+
+    def _ensure_thread(self):
+        # Started per process (not inherited by forked workers)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self.active = {}
+                threading.Thread(target=self._run, name='profiler', daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        published = time.monotonic()
+        while True:
+            if not self.active:
+                # Also relists this process while the session runs (see publish)
+                if self._dirty or (self.session and self.session['views']):
+                    self.publish()
+                self._wake.wait(PUBLISH_INTERVAL)
+                self._wake.clear()
+                continue
+            session = self.session
+            start = time.perf_counter()
+            self.sample()
+            cost = time.perf_counter() - start
+            if time.monotonic() - published >= PUBLISH_INTERVAL:
+                self.publish()
+                published = time.monotonic()
+            interval = (session or {}).get('interval_ms', settings.PROFILE_SAMPLE_INTERVAL_MS) / 1000
+            # Sleep at least long enough that sampling stays under MAX_OVERHEAD
+            time.sleep(max(interval, cost / MAX_OVERHEAD))
+
+    def sample(self):
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, view_name in list(self.active.items()):
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = collapse_stack(view_name, frame)
+                if stack not in self.stacks and len(self.stacks) >= settings.PROFILE_MAX_STACKS:
+                    stack = f'{view_name};{OTHER_STACKS}'
+                self.stacks[stack] += 1
+                self._dirty = True
+        del frames
+
+    def publish(self):
+        """Write this process's counts for the current session to the cache."""
+        with self._publish_lock:
+            with self._lock:
+                session = self.session
+                if not session or not self.stacks:
+                    return
+                stacks = dict(self.stacks) if self._dirty else None
+                self._dirty = False
+            worker = _worker_name()
+            if stacks is not None:
+                cache.set(_stacks_key(session['id'], worker), stacks, RESULT_TTL)
+            # Checked on every publish: a concurrent listing may have dropped it
+            _list_worker(session['id'], worker)
+        if threading.current_thread().name == 'profiler':
+            connections.close_all()  # the db cache backend's connection, if any
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self.untrack(request)
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            self.untrack(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Under ASGI this runs through sync_to_async, in the request's
+        # thread-sensitive thread: where a sync view runs and where an async
+        # view's sync_to_async work (queries, rendering) runs
+        match = request.resolver_match
+        if match and profiler.profiled_view(match.view_name):
+            request._profiled_thread = profiler.track(match.view_name)
+
+    def untrack(self, request):
+        if hasattr(request, '_profiled_thread'):
+            profiler.untrack(request._profiled_thread)
+
+
+# =========================
+# Staff views
+# =========================
+def _unknown_views(view_names):
+    unknown = []
+    for name in view_names:
+        try:
+            reverse(name)
+        except NoReverseMatch as exc:
+            # Names of views that take arguments fail to reverse too, differently
+            if 'not a valid view function' in str(exc) or 'not a registered namespace' in str(exc):
+                unknown.append(name)
+    return unknown
+
+
+@staff_member_required
+def profiling_view(request):
+    error = None
+    if request.method == 'POST':
+        if 'stop' in request.POST:
+            stop_session()
+            return redirect('profiling')
+        view_names = request.POST.get('views', '').replace(',', ' ').split()
+        try:
+            interval_ms = max(int(request.POST.get('interval_ms') or settings.PROFILE_SAMPLE_INTERVAL_MS), 1)
+        except ValueError:
+            interval_ms = settings.PROFILE_SAMPLE_INTERVAL_MS
+        unknown = _unknown_views(view_names)
+        if not view_names:
+            error = "Enter at least one URL name."
+        elif unknown:
+            error = f"Unknown URL name: {', '.join(unknown)}"
+        else:
+            start_session(view_names, interval_ms)
+            return redirect('profiling')
+
+    session = cache.get(SESSION_KEY)
+    stacks, workers = session_stacks(session['id']) if session else (Counter(), 0)
+    context = {
+        **admin.site.each_context(request),
+        'title': "Profiling",
+        'session': session,
+        'error': error,
+        'samples': sum(stacks.values()),
+        'workers': workers,
+        'top_stacks': stacks.most_common(10),
+        'default_interval_ms': settings.PROFILE_SAMPLE_INTERVAL_MS,
+    }
+    return render(request, 'admin/profiling.html', context)
+
+
+@staff_member_required
+def profiling_download(request):
+    session = cache.get(SESSION_KEY)
+    if not session:
+        return HttpResponse("No profiling session.", status=404, content_type='text/plain')
+    if profiler.session and profiler.session['id'] == session['id']:
+        profiler.publish()  # this process's latest samples too
+    stacks, _ = session_stacks(session['id'])
+    body = ''.join(f'{stack} {count}\n' for stack, count in sorted(stacks.items()))
+    response = HttpResponse(body, content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="profile-{session["id"]}.folded"'
+    return response
@@ -0,0 +1,207 @@
+# TafutaHao/request_logging.py
+
+"""
+Per-request timings and the slow-query log.
+
+RequestLogMiddleware logs one 'tafutahao.request' record per request:
+method, path, view, status, total time and the number and time of its SQL
+queries. Every database connection gets an execute wrapper that times its
+queries; a query over SLOW_QUERY_MS is handed to a background thread which
+runs EXPLAIN on it over its own connection and logs it, with the view it
+came from, to 'tafutahao.slow_query'. The request only pays for two clock
+reads per query and a queue put. The same statement is explained at most
+once per SLOW_QUERY_EXPLAIN_INTERVAL; when the queue is full, slow queries
+are logged without a plan.
+
+The middleware runs in whichever mode the handler below it runs in, so
+under ASGI it does not push requests to async views into a thread.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+request_logger = logging.getLogger('tafutahao.request')
+slow_query_logger = logging.getLogger('tafutahao.slow_query')
+
+EXPLAIN_QUEUE_SIZE = 100
+
+# Query statistics of the current request ([count, seconds]) and its view
+_query_stats = ContextVar('query_stats', default=None)
+_view_name = ContextVar('view_name', default=None)
+_explaining = threading.local()
+
+
+# =========================
+# Request timings
+# =========================
+class RequestLogMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened before this module was imported (warm-up)
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, tokens = self.start()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self.log(request, 500, start, stats)
+            raise
+        finally:
+            self.finish(tokens)
+        self.log(request, response.status_code, start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats, tokens = self.start()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        except Exception:
+            self.log(request, 500, start, stats)
+            raise
+        finally:
+            self.finish(tokens)
+        self.log(request, response.status_code, start, stats)
+        return response
+
+    def start(self):
+        # Queries run through sync_to_async see the same list: the context is copied, not the list
+        stats = [0, 0.0]
+        return stats, (_query_stats.set(stats), _view_name.set(None))
+
+    def finish(self, tokens):
+        stats_token, view_token = tokens
+        _query_stats.reset(stats_token)
+        _view_name.reset(view_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        _view_name.set(match.view_name if match else None)
+
+    def log(self, request, status, start, stats):
+        match = request.resolver_match
+        request_logger.info(
+            "%s %s %s", request.method, request.path, status,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': status,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+                'db_queries': stats[0],
+                'db_ms': round(stats[1] * 1000, 1),
+            },
+        )
+
+
+# =========================
+# Slow queries
+# =========================
+def time_queries(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        stats = _query_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += duration
+        if duration * 1000 >= settings.SLOW_QUERY_MS and not getattr(_explaining, 'active', False):
+            _explainer.submit(context['connection'].alias, sql, None if many else params, duration, _view_name.get())
+
+
+def install_query_timer(sender, connection, **kwargs):
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+connection_created.connect(install_query_timer)
+
+
+class SlowQueryExplainer:
+    """Background thread that EXPLAINs and logs slow queries."""
+
+    def __init__(self):
+        self.queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._explained = {}  # sql -> when it was last explained
+
+    def _ensure_thread(self):
+        # Started per process (not inherited by forked workers)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self.queue = queue.Queue(EXPLAIN_QUEUE_SIZE)
+                threading.Thread(target=self._run, args=(self.queue,), name='slow-query-explainer', daemon=True).start()
+                self._pid = os.getpid()
+
+    def submit(self, alias, sql, params, duration, view):
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait((alias, sql, params, duration, view))
+        except queue.Full:
+            self.log(alias, sql, duration, view, None)
+
+    def _run(self, jobs):
+        _explaining.active = True
+        while True:
+            job = jobs.get()
+            try:
+                alias, sql, params, duration, view = job
+                self.log(alias, sql, duration, view, self.explain(alias, sql, params))
+            except Exception:
+                slow_query_logger.exception("Could not log a slow query")
+            if jobs.empty():
+                connections.close_all()  # this thread's connections only
+
+    def explain(self, alias, sql, params):
+        now = time.monotonic()
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return None
+        if now - self._explained.get(sql, -float('inf')) < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+            return None
+        if len(self._explained) >= 1000:
+            self._explained.clear()
+        self._explained[sql] = now
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+
+    def log(self, alias, sql, duration, view, plan):
+        # Parameters are left out: they can hold session data and password hashes
+        slow_query_logger.warning(
+            "Slow query (%.0f ms) in %s", duration * 1000, view or '-',
+            extra={
+                'duration_ms': round(duration * 1000, 1),
+                'view': view,
+                'database': alias,
+                'sql': sql,
+                'explain': plan,
+            },
+        )
+
+
+_explainer = SlowQueryExplainer()
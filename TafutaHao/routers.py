@@ -0,0 +1,106 @@
+"""
+Read-replica routing (active when DATABASE_REPLICA_URLS is set).
+
+ReplicaRoutingMiddleware marks requests to the read-only browse/detail
+views; while a request is marked, ReplicaRouter sends its reads to a random
+replica. Everything else, and every write, uses the primary ('default').
+
+A POST (or any other unsafe method) pins the session to the primary for
+REPLICA_PIN_SECONDS, so after toggling a favorite or saving a property the
+user's next pages read their own writes instead of a lagging replica.
+"""
+
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+REPLICA_READ_VIEWS = {
+    'tenants:browse_properties',
+    'properties:property_list',
+    'properties:property_detail',
+    'properties:get_towns_by_county',
+    'properties:property_images',
+}
+
+# Unsafe requests that write nothing the visitor reads back, so they don't
+# pin (or create) a session
+PIN_EXEMPT_VIEWS = {
+    'properties:record_card_views',
+}
+
+PIN_SESSION_KEY = '_db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        return db == 'default'
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_from_replica.set(False)
+        if self.pins_session(request):
+            request.session[PIN_SESSION_KEY] = time.time() + settings.REPLICA_PIN_SECONDS
+        return response
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_from_replica.set(False)
+        if self.pins_session(request):
+            await request.session.aset(PIN_SESSION_KEY, time.time() + settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def pins_session(self, request):
+        match = request.resolver_match
+        return request.method not in SAFE_METHODS and not (match and match.view_name in PIN_EXEMPT_VIEWS)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Under ASGI this runs through sync_to_async (the session read is
+        # blocking I/O), which copies the flag back into the request's context
+        match = request.resolver_match
+        _read_from_replica.set(
+            request.method in SAFE_METHODS
+            and match is not None
+            and match.view_name in REPLICA_READ_VIEWS
+            and not self.pinned_to_primary(request)
+        )
+
+    def pinned_to_primary(self, request):
+        return request.session.get(PIN_SESSION_KEY, 0) > time.time()
@@ -0,0 +1,106 @@
+"""
+Template helpers for production workers: compiling every template up front
+(so the cached loader never parses on a live request) and attributing render
+time to individual {% for %} / {% include %} nodes.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.template import TemplateSyntaxError, engines
+from django.template.defaulttags import ForNode
+from django.template.loader_tags import IncludeNode
+
+PROFILED_NODES = (ForNode, IncludeNode)
+
+
+# =========================
+# Warm-up
+# =========================
+def iter_template_names(engine=None):
+    """Names of every .html template the Django engine can load."""
+    engine = engine or engines['django'].engine
+    names = set()
+    for loader in engine.template_loaders:
+        # The cached loader reports the directories of the loaders it wraps
+        for directory in loader.get_dirs():
+            root = Path(directory)
+            if root.is_dir():
+                names.update(p.relative_to(root).as_posix() for p in root.rglob('*.html'))
+    return sorted(names)
+
+
+def warm_templates(engine=None):
+    """
+    Compile every template through the configured loaders. With the cached
+    loader on, the compiled Template objects stay in memory for the worker's
+    lifetime. Returns (compiled names, {name: error}).
+    """
+    engine = engine or engines['django'].engine
+    compiled, errors = [], {}
+    for name in iter_template_names(engine):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as exc:
+            errors[name] = str(exc)
+        else:
+            compiled.append(name)
+    return compiled, errors
+
+
+# =========================
+# Render profiler
+# =========================
+class NodeTimings:
+    """Inclusive and self time per profiled node, keyed by template and line."""
+
+    def __init__(self):
+        self.stats = defaultdict(lambda: {'calls': 0, 'total': 0.0, 'self': 0.0})
+        self._stack = []
+
+    def record(self, node, render, context):
+        key = (node.origin.template_name if node.origin else '?', node.token.lineno, node.token.contents)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return render(node, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            entry = self.stats[key]
+            entry['calls'] += 1
+            entry['total'] += elapsed
+            entry['self'] += elapsed - children
+
+    def rows(self):
+        """(template, line, tag, calls, total s, self s), slowest first."""
+        rows = [(*key, s['calls'], s['total'], s['self']) for key, s in self.stats.items()]
+        return sorted(rows, key=lambda row: row[4], reverse=True)
+
+
+@contextmanager
+def profile_template_nodes(node_classes=PROFILED_NODES):
+    """
+    Time every render of the given node classes while the block runs.
+    Patches the classes process-wide, so only use it from a command or a
+    single-threaded shell, never inside a serving worker.
+    """
+    timings = NodeTimings()
+    originals = {cls: cls.render for cls in node_classes}
+
+    def wrap(original):
+        def render(node, context):
+            return timings.record(node, original, context)
+        return render
+
+    for cls, original in originals.items():
+        cls.render = wrap(original)
+    try:
+        yield timings
+    finally:
+        for cls, original in originals.items():
+            cls.render = original
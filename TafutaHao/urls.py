@@ -15,11 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.shortcuts import redirect, render
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .media import serve_media
+from .profiling import profiling_download, profiling_view
+
 def home_redirect(request):
     return redirect('tenants:browse_properties')
 
@@ -29,6 +32,10 @@ def no_permission_view(request):
 urlpatterns = [
     path('', home_redirect, name='home'),
 
+    # Staff-only sampling profiler (TafutaHao/profiling.py)
+    path('admin/profiling/', profiling_view, name='profiling'),
+    path('admin/profiling/download/', profiling_download, name='profiling_download'),
+
     path('admin/', admin.site.urls),
 
     # Tenant property browsing & favorites
@@ -49,3 +56,8 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+else:
+    # Range-aware media serving (or X-Accel-Redirect/X-Sendfile hand-off)
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
+    ]
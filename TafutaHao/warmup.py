@@ -0,0 +1,87 @@
+"""
+Pay the cold-start costs once, before gunicorn forks its workers
+(gunicorn.conf.py runs warm_up() with preload_app), instead of on each
+worker's first real request.
+"""
+
+import time
+from importlib import import_module
+
+from django.apps import apps
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from properties.autocomplete import prime_autocomplete_index
+from properties.facets import prime_town_cache
+from .templating import warm_templates
+
+
+def import_views():
+    """Import every app's views modules (sync and async)."""
+    modules = 0
+    for app_config in apps.get_app_configs():
+        for name in ('views', 'async_views'):
+            try:
+                import_module(f'{app_config.name}.{name}')
+            except ModuleNotFoundError as exc:
+                if exc.name != f'{app_config.name}.{name}':
+                    raise
+            else:
+                modules += 1
+    return modules
+
+
+def resolve_url_names(resolver=None):
+    """
+    Build the reverse() lookup tables of the root URLconf and every
+    included (namespaced) URLconf. Returns the number of named patterns.
+    """
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict  # populates lazily on first access
+    names = 0
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            names += resolve_url_names(pattern)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names += 1
+    return names
+
+
+def open_connections():
+    for conn in connections.all():
+        conn.ensure_connection()
+    return len(connections.all())
+
+
+def close_connections():
+    # Sockets must not be shared between forked workers
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+
+
+WARM_UP_STEPS = [
+    ('views', import_views),
+    ('urls', resolve_url_names),
+    ('templates', lambda: len(warm_templates()[0])),
+    ('database', open_connections),
+    ('town facets', prime_town_cache),
+    ('autocomplete index', prime_autocomplete_index),
+]
+
+
+def warm_up(close=True):
+    """
+    Run every warm-up step and return [(step, result, seconds)]. Closes the
+    database connections afterwards unless close=False, so it is safe to call
+    in the gunicorn master before forking.
+    """
+    report = []
+    try:
+        for step, func in WARM_UP_STEPS:
+            start = time.perf_counter()
+            result = func()
+            report.append((step, result, time.perf_counter() - start))
+    finally:
+        if close:
+            close_connections()
+    return report
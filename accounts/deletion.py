@@ -0,0 +1,48 @@
+# accounts/deletion.py
+
+from django.db import transaction
+
+from properties.bulk import DEFAULT_CHUNK_SIZE, delete_media_files, raw_cascade_delete
+from properties.cache import bump_listings_version
+from properties.models import Property, SimilarityRefreshQueue
+from .models import AccountDeletionRequest, CustomUser
+
+
+def request_account_deletion(user):
+    """
+    Deactivate the account and hide its listings right away; the cascade
+    itself is left to purge_account() in the background.
+    """
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        hidden = Property.objects.filter(landlord__user=user, available=True).update(available=False)
+        AccountDeletionRequest.objects.get_or_create(user=user)
+    if hidden:
+        bump_listings_version()
+
+
+def purge_account(user_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Delete a user and everything hanging off it with chunked raw deletes.
+
+    Properties go first, one chunk per transaction, so a landlord with
+    thousands of images and favorites never holds one long transaction and
+    an interrupted purge simply resumes on the next run. Media files are
+    removed after each chunk commits.
+    """
+    property_ids = list(Property.objects.filter(landlord__user_id=user_id).values_list('pk', flat=True))
+    for start in range(0, len(property_ids), chunk_size):
+        chunk = property_ids[start:start + chunk_size]
+        with transaction.atomic():
+            files = raw_cascade_delete(Property, chunk, chunk_size)
+            # No delete signals here, so queue the similar-properties refresh directly
+            SimilarityRefreshQueue.enqueue(chunk)
+            transaction.on_commit(lambda files=files: delete_media_files(files))
+
+    with transaction.atomic():
+        files = raw_cascade_delete(CustomUser, [user_id], chunk_size)
+        transaction.on_commit(lambda: delete_media_files(files))
+
+    if property_ids:
+        bump_listings_version()
@@ -0,0 +1,33 @@
+# accounts/management/commands/process_account_deletions.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.deletion import purge_account
+from accounts.models import AccountDeletionRequest
+from properties.bulk import DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Purge accounts queued for deletion (run from cron, or with --interval as a worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--limit', type=int, default=100, help="Accounts to purge per pass")
+        parser.add_argument('--interval', type=int, default=0, help="Keep polling every N seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            user_ids = list(
+                AccountDeletionRequest.objects.order_by('requested_at')
+                .values_list('user_id', flat=True)[:options['limit']]
+            )
+            for user_id in user_ids:
+                purge_account(user_id, chunk_size=options['chunk_size'])
+            if user_ids:
+                self.stdout.write(f"Purged {len(user_ids)} account(s).")
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,30 @@
+# accounts/management/commands/provision_users.py
+
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import PROFILE_MODELS, ProvisioningError, provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create users and profiles from a CSV file with a header row "
+        "(username, email, phone_number, password; only username is required)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument('--role', choices=sorted(PROFILE_MODELS), default='tenant')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with open(options['csv_file'], newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        try:
+            users = provision_users(rows, role=options['role'], batch_size=options['batch_size'])
+        except (ProvisioningError, KeyError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Created {len(users)} {options['role']} accounts."))
@@ -51,3 +51,16 @@ class CustomUser(AbstractUser):
 
     def is_tenant(self):
         return self.role == 'tenant'
+
+
+class AccountDeletionRequest(models.Model):
+    """
+    Queue entry for an account whose owner asked for deletion. The user is
+    deactivated immediately; process_account_deletions purges the rows and
+    media in the background.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='deletion_request')
+    requested_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Deletion of {self.user.username} requested {self.requested_at:%Y-%m-%d %H:%M}"
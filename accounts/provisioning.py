@@ -0,0 +1,72 @@
+# accounts/provisioning.py
+
+from django.db import transaction
+
+from landlords.models import LandlordProfile
+from tenants.models import TenantProfile
+from .models import CustomUser
+
+PROFILE_MODELS = {
+    'tenant': TenantProfile,
+    'landlord': LandlordProfile,
+}
+
+
+class ProvisioningError(ValueError):
+    pass
+
+
+def provision_users(rows, role='tenant', batch_size=500):
+    """
+    Bulk-create users and their role profiles for onboarding agencies.
+
+    ``rows`` is an iterable of dicts with ``username`` and optional
+    ``email``, ``phone_number`` and ``password`` keys (users without a
+    password get an unusable one and set theirs via password reset).
+
+    Everything goes through bulk_create inside one transaction, so no
+    post_save signals fire: the role is written on the user row up front
+    instead of by assign_tenant_role / assign_landlord_role.
+    """
+    if role not in PROFILE_MODELS:
+        raise ProvisioningError(f"Unknown role: {role}")
+    profile_model = PROFILE_MODELS[role]
+
+    users = []
+    for row in rows:
+        user = CustomUser(
+            username=row['username'].strip(),
+            email=CustomUser.objects.normalize_email(row.get('email') or ''),
+            phone_number=row.get('phone_number') or '',
+            role=role,
+        )
+        if row.get('password'):
+            user.set_password(row['password'])
+        else:
+            user.set_unusable_password()
+        users.append(user)
+
+    usernames = [user.username for user in users]
+    if len(set(usernames)) != len(usernames):
+        raise ProvisioningError("Duplicate usernames in input")
+    taken = list(CustomUser.objects.filter(username__in=usernames).values_list('username', flat=True)[:10])
+    if taken:
+        raise ProvisioningError(f"Usernames already exist: {', '.join(taken)}")
+
+    with transaction.atomic():
+        CustomUser.objects.bulk_create(users, batch_size=batch_size)
+
+        # MySQL does not return primary keys from bulk inserts
+        if any(user.pk is None for user in users):
+            ids = {}
+            for start in range(0, len(usernames), batch_size):
+                chunk = usernames[start:start + batch_size]
+                ids.update(CustomUser.objects.filter(username__in=chunk).values_list('username', 'pk'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        profile_model.objects.bulk_create(
+            [profile_model(user_id=user.pk) for user in users],
+            batch_size=batch_size,
+        )
+    return users
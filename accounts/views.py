@@ -11,6 +11,7 @@ from landlords.models import LandlordProfile
 from django.contrib.auth.views import LoginView, LogoutView
 from tenants.models import TenantProfile
 from django.contrib import messages
+from django.db import transaction
 
 
 # Signs up a new user and creates the corresponding profile
@@ -24,13 +25,14 @@ class TenantSignupView(CreateView):
         user = form.save(commit=False)
         role = form.cleaned_data.get('role')      # role will be 'tenant' or 'landlord'
         user.role = role                         # set role properly
-        user.save()                              # save user
 
-        # create the corresponding profile immediately
-        if role == 'tenant':
-            TenantProfile.objects.get_or_create(user=user)
-        elif role == 'landlord':
-            LandlordProfile.objects.get_or_create(user=user)
+        # one INSERT per row; the profile signal sees the role already set
+        with transaction.atomic():
+            user.save()
+            if role == 'tenant':
+                TenantProfile.objects.create(user=user)
+            elif role == 'landlord':
+                LandlordProfile.objects.create(user=user)
 
         # log the user in so request.user reflects the new role
         login(self.request, user)
@@ -46,11 +48,10 @@ class TenantSignupView(CreateView):
 @login_required
 def landlord_register(request):
     if request.method == "POST":
-        # Create LandlordProfile for the logged-in user
-        LandlordProfile.objects.create(user=request.user)
-        # Update the user's role
-        request.user.role = 'landlord'
-        request.user.save()
+        # Create LandlordProfile for the logged-in user; assign_landlord_role
+        # updates just the role column in the same transaction
+        with transaction.atomic():
+            LandlordProfile.objects.create(user=request.user)
         # Redirect to landlord dashboard or property list
         return redirect('landlords:landlord_property_list')
     
@@ -0,0 +1,39 @@
+# gunicorn.conf.py — `gunicorn TafutaHao.wsgi` picks this file up from the project root.
+
+import multiprocessing
+
+from decouple import config
+
+bind = config('GUNICORN_BIND', default='127.0.0.1:8000')
+workers = config('GUNICORN_WORKERS', default=multiprocessing.cpu_count() * 2 + 1, cast=int)
+timeout = config('GUNICORN_TIMEOUT', default=30, cast=int)
+
+# Load Django once in the master; workers fork from the warmed-up process
+preload_app = config('GUNICORN_PRELOAD', default=True, cast=bool)
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded, before any worker forks
+    if not preload_app:
+        return
+    from TafutaHao.warmup import warm_up
+
+    for step, result, seconds in warm_up():
+        server.log.info("warm-up %s: %s in %.1f ms", step, result, seconds * 1000)
+
+
+def post_fork(server, worker):
+    # Each worker opens its own persistent connection up front (only useful
+    # when CONN_MAX_AGE keeps it open past the first request)
+    from django.db import connections
+
+    for conn in connections.all():
+        if conn.settings_dict['CONN_MAX_AGE'] != 0:
+            conn.ensure_connection()
+
+
+def worker_exit(server, worker):
+    # Write view counts still buffered in this worker (properties/counters.py)
+    from properties.counters import flush
+
+    flush()
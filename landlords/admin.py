@@ -3,9 +3,16 @@
 from django.contrib import admin
 from .models import LandlordProfile
 
+@admin.register(LandlordProfile)
 class LandlordProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'phone_number')  # <-- adjust this
+    search_fields = ('^user__username',)  # also the property landlord autocomplete
+    ordering = ('pk',)
     # if phone is on CustomUser:
     def phone_number(self, obj):
         return obj.user.phone_number
     phone_number.short_description = 'Phone'
+
+    def get_queryset(self, request):
+        # The changelist and autocomplete results print each profile's username
+        return super().get_queryset(request).select_related('user')
@@ -12,11 +12,15 @@ class LandlordProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='landlordprofile')
     # any other fields
 
+    def __str__(self):
+        return self.user.username
+
 @receiver(post_save, sender=LandlordProfile)
 def assign_landlord_role(sender, instance, created, **kwargs):
-    if created:
+    # Signup already saves the role; only touch the user row if it differs
+    if created and instance.user.role != 'landlord':
         instance.user.role = 'landlord'
-        instance.user.save()
+        instance.user.save(update_fields=['role'])
 
 # ---------------- Landlord Favorite Properties ----------------
 
@@ -1,3 +1,164 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from accounts.models import CustomUser
+from properties.models import ImageUpload, Property, PropertyImage
+from properties.tests import UNCOLLECTED_STATIC
+from properties.uploads import UploadError, temp_path, write_chunk
+from tenants.models import TenantProfile, ViewingRequest
+from .models import LandlordProfile
+
+
+def png_bytes(size=(64, 64)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_UPLOAD_CHUNK_SIZE=100, IMAGE_UPLOAD_MAX_SIZE=10000)
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        media_root, temp_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.addCleanup(shutil.rmtree, temp_dir)
+        storage = override_settings(MEDIA_ROOT=media_root, IMAGE_UPLOAD_TEMP_DIR=temp_dir)
+        storage.enable()
+        self.addCleanup(storage.disable)
+
+        user = CustomUser.objects.create_user('landlord', 'l@example.com', 'pw', role='landlord')
+        landlord = LandlordProfile.objects.create(user=user)
+        self.listing = Property.objects.create(
+            landlord=landlord, house_type='1BR', house_number='A1', rent=20000,
+            county='Nairobi', town='Kilimani', location='Argwings Kodhek Road',
+        )
+        self.client.force_login(user)
+        self.photo = png_bytes()
+
+    def start(self, size=None, **data):
+        return self.client.post(reverse('landlords:start_image_upload'), {
+            'filename': 'front.png', 'size': len(self.photo) if size is None else size, **data,
+        })
+
+    def put(self, upload_id, offset, data):
+        return self.client.put(
+            reverse('landlords:image_upload', args=[upload_id]), data,
+            content_type='application/octet-stream', headers={'Upload-Offset': str(offset)},
+        )
+
+    def test_upload_resumes_from_the_server_offset(self):
+        upload_id = self.start(property=self.listing.pk).json()['id']
+        self.assertEqual(self.put(upload_id, 0, self.photo[:100]).json()['offset'], 100)
+
+        # The client lost track after a dropped connection and asks again
+        state = self.client.get(reverse('landlords:image_upload', args=[upload_id])).json()
+        self.assertEqual((state['offset'], state['complete']), (100, False))
+
+        offset = state['offset']
+        while offset < len(self.photo):
+            state = self.put(upload_id, offset, self.photo[offset:offset + 100]).json()
+            offset = state['offset']
+        self.assertTrue(state['complete'])
+        image = PropertyImage.objects.get(property=self.listing)
+        with image.image.open('rb') as stored:
+            self.assertEqual(stored.read(), self.photo)
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_chunk_at_the_wrong_offset_is_refused(self):
+        upload_id = self.start().json()['id']
+        self.put(upload_id, 0, self.photo[:100])
+        for offset in (0, 150):
+            with self.subTest(offset=offset):
+                response = self.put(upload_id, offset, self.photo[offset:offset + 100])
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(response.json()['offset'], 100)
+
+    def test_non_image_is_refused_at_the_first_chunk(self):
+        upload_id = self.start(size=300).json()['id']
+        response = self.put(upload_id, 0, b'%PDF-1.7\n' + b'x' * 91)
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_image_type_must_survive_the_whole_file(self):
+        # PNG signature, then not a PNG
+        fake = self.photo[:16] + b'\0' * 84
+        upload_id = self.start(size=len(fake)).json()['id']
+        self.assertEqual(self.put(upload_id, 0, fake).status_code, 415)
+        self.assertFalse(PropertyImage.objects.exists())
+
+    def test_property_must_be_a_listing_id(self):
+        self.assertEqual(self.start(property='abc').status_code, 400)
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_retried_chunk_cannot_truncate_the_one_that_won(self):
+        upload_id = self.start().json()['id']
+        self.put(upload_id, 0, self.photo[:100])
+        upload = ImageUpload.objects.get(pk=upload_id)
+        # A retry of the first chunk that read the upload before the original landed
+        upload.received = 0
+        with self.assertRaises(UploadError):
+            write_chunk(upload, 0, io.BytesIO(self.photo[:50]), 50)
+        with open(temp_path(upload), 'rb') as part:
+            self.assertEqual(part.read(), self.photo[:100])
+
+    def test_oversized_uploads_are_refused_before_any_byte(self):
+        self.assertEqual(self.start(size=10001).status_code, 413)
+        upload_id = self.start().json()['id']
+        self.assertEqual(self.put(upload_id, 0, self.photo[:101]).status_code, 413)
+
+
+@override_settings(STORAGES=UNCOLLECTED_STATIC)
+class ViewingRequestInboxTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('landlord', 'l@example.com', 'pw', role='landlord')
+        landlord = LandlordProfile.objects.create(user=self.user)
+        other = LandlordProfile.objects.create(
+            user=CustomUser.objects.create_user('other', 'o@example.com', 'pw', role='landlord'),
+        )
+        tenant = TenantProfile.objects.create(user=CustomUser.objects.create_user('tenant', 't@example.com', 'pw'))
+        listing, other_listing = [
+            Property.objects.create(
+                landlord=owner, house_type='1BR', house_number='A1', rent=20000,
+                county='Nairobi', town='Kilimani', location='Argwings Kodhek Road',
+            )
+            for owner in (landlord, other)
+        ]
+        self.requests = [
+            ViewingRequest.objects.create(
+                tenant=tenant, property=listing, landlord=landlord, requested_on=date(2026, 10, day),
+            )
+            for day in range(1, 6)
+        ]
+        self.other_request = ViewingRequest.objects.create(
+            tenant=tenant, property=other_listing, landlord=other, requested_on=date(2026, 10, 1),
+        )
+        self.client.force_login(self.user)
+        self.url = reverse('landlords:viewing_requests')
+
+    def test_pages_follow_the_last_id_seen(self):
+        pages, params = [], {}
+        with mock.patch('landlords.views.INBOX_PAGE_SIZE', 2):
+            while True:
+                context = self.client.get(self.url, params).context
+                pages.append([request.pk for request in context['viewing_requests']])
+                if context['next_before'] is None:
+                    break
+                params = {'before': context['next_before']}
+        ids = [request.pk for request in reversed(self.requests)]
+        self.assertEqual(pages, [ids[:2], ids[2:4], ids[4:]])
+
+    def test_batch_actions_only_touch_the_landlords_own_requests(self):
+        chosen = [self.requests[0].pk, self.requests[1].pk, self.other_request.pk]
+        self.client.post(self.url, {'new_status': ViewingRequest.ACCEPTED, 'ids': chosen})
+        self.assertEqual(
+            set(ViewingRequest.objects.filter(status=ViewingRequest.ACCEPTED).values_list('pk', flat=True)),
+            set(chosen[:2]),
+        )
+        context = self.client.get(self.url, {'status': ViewingRequest.ACCEPTED}).context
+        self.assertEqual([request.pk for request in context['viewing_requests']], chosen[1::-1])
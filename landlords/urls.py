@@ -17,6 +17,14 @@ urlpatterns = [
     path('delete/<int:pk>/', views.LandlordPropertyDeleteView.as_view(), name='landlord_property_delete'),
     path('delete-image/<int:image_id>/', delete_property_image, name='delete_property_image'),
 
+    # Listings moved out by archive_listings, and restoring them
+    path('archived/', views.LandlordArchivedPropertyListView.as_view(), name='landlord_archived_properties'),
+    path('archived/<int:pk>/restore/', views.restore_archived_property, name='restore_archived_property'),
+
+    # Chunked, resumable photo uploads (chunked_upload.js)
+    path('uploads/', views.start_image_upload, name='start_image_upload'),
+    path('uploads/<uuid:upload_id>/', views.image_upload, name='image_upload'),
+
     # Browse All Properties (Landlords view as tenants)
     path('browse/', views.LandlordBrowsePropertiesView.as_view(), name='landlords_browse'),
 
@@ -26,6 +34,9 @@ urlpatterns = [
     # Favorite / Unfavorite Property
     path('favorite/<int:property_id>/', views.LandlordFavoritePropertyView.as_view(), name='favorite_property'),
 
+    # Viewing requests from tenants
+    path('viewing-requests/', views.ViewingRequestInboxView.as_view(), name='viewing_requests'),
+
     # Landlord profile page
     path('account/profile/', views.LandlordProfileView.as_view(), name='landlord_profile'),
 
@@ -1,13 +1,15 @@
 # landlords/views.py
 
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import get_object_or_404, redirect, render
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.urls import reverse_lazy
-from properties.models import Property, PropertyImage
+from django.urls import reverse, reverse_lazy
+from properties.models import Property, PropertyImage, PropertyViewCount
 from .models import LandlordProfile, LandlordFavoriteProperty
+from tenants.models import ViewingRequest
 from .forms import PropertyForm
-from django.db.models import Q
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
 from .mixins import LandlordRequiredMixin
 from accounts.decorators import landlord_required
 from django.utils.decorators import method_decorator
@@ -15,6 +17,7 @@ from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from properties.constants import KENYA_COUNTIES  # same constant used for dropdown 
+from properties.towns import canonical_county, display_town_name, town_ids
 from django.views import View
 from accounts.models import CustomUser
 from django.contrib.auth.mixins import UserPassesTestMixin
@@ -22,6 +25,16 @@ from .forms import LandlordAccountForm
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth import logout
 from django.contrib import messages
+from accounts.deletion import request_account_deletion
+from properties.facets import towns_for_county
+from properties.fragments import ResultsFragmentMixin
+from properties.models import ImageUpload
+from django.conf import settings
+from properties.uploads import UploadError, abort_upload, claim_uploads, start_upload, write_chunk
+from django.views.decorators.http import require_http_methods
+from django.db.models import OuterRef, Subquery
+from properties.archive import restore_property
+from properties.models import ArchivedProperty, ArchivedPropertyImage
 # =========================
 # List properties for landlord
 # =========================
@@ -60,10 +73,10 @@ class LandlordPropertyListView(LoginRequiredMixin, LandlordRequiredMixin, ListVi
             queryset = queryset.filter(rent__lte=max_rent)
 
         if county:
-            queryset = queryset.filter(county__iexact=county)
+            queryset = queryset.filter(county=canonical_county(county))
 
         if town:
-            queryset = queryset.filter(town__iexact=town)
+            queryset = queryset.filter(town_ref__in=town_ids(town, county))
 
         if location:
             queryset = queryset.filter(location__icontains=location)
@@ -104,6 +117,32 @@ class LandlordPropertyListView(LoginRequiredMixin, LandlordRequiredMixin, ListVi
 
         return context
     
+# =========================
+# Archived listings (properties/archive.py)
+# =========================
+class LandlordArchivedPropertyListView(LoginRequiredMixin, LandlordRequiredMixin, ListView):
+    template_name = 'landlords/archived_properties.html'
+    context_object_name = 'archived_properties'
+    paginate_by = 12
+
+    def get_queryset(self):
+        images = ArchivedPropertyImage.objects.filter(property=OuterRef('pk')).order_by('pk')
+        return (
+            ArchivedProperty.objects.filter(landlord__user=self.request.user)
+            .annotate(cover_image=Subquery(images.values('image')[:1]))
+            .order_by('-archived_at')
+        )
+
+
+@landlord_required
+@require_POST
+def restore_archived_property(request, pk):
+    archived = get_object_or_404(ArchivedProperty, pk=pk, landlord__user=request.user)
+    property_obj = restore_property(archived)
+    messages.success(request, f"{property_obj.house_number} is restored. Mark it available to list it again.")
+    return redirect('landlords:landlord_property_update', pk=property_obj.pk)
+
+
 # =========================
 # Add new property
 # =========================
@@ -138,6 +177,8 @@ class LandlordPropertyCreateView(LoginRequiredMixin, LandlordRequiredMixin, Perm
         files = self.request.FILES.getlist('images')
         for f in files:
             PropertyImage.objects.create(property=self.object, image=f)
+        # Photos already sent in chunks by chunked_upload.js
+        claim_uploads(self.request.user, self.object, self.request.POST.getlist('uploads'))
 
         return response
 
@@ -178,6 +219,8 @@ class LandlordPropertyUpdateView(LoginRequiredMixin, PermissionRequiredMixin, Up
         files = self.request.FILES.getlist('images')
         for f in files:
             PropertyImage.objects.create(property=self.object, image=f)
+        # Photos already sent in chunks by chunked_upload.js
+        claim_uploads(self.request.user, self.object, self.request.POST.getlist('uploads'))
 
         return response
 
@@ -209,73 +252,90 @@ class LandlordPropertyDeleteView(LoginRequiredMixin, PermissionRequiredMixin, De
 # Landlord dashboard
 # =========================
 @method_decorator(landlord_required, name='dispatch')
-class LandlordDashboardView(LoginRequiredMixin, LandlordRequiredMixin, TemplateView):
+class LandlordDashboardView(LoginRequiredMixin, LandlordRequiredMixin, ResultsFragmentMixin, TemplateView):
     template_name = 'landlords/dashboard.html'
+    fragment_template_name = 'landlords/dashboard_results.html'
+
+    def get_filtered_properties(self, landlord_profile):
+        # Get all landlord's properties
+        properties_list = landlord_profile.property_set.all()
+
+        # ---- APPLY FILTERS ----
+        q = self.request.GET.get('q', '').strip()
+        min_rent = self.request.GET.get('min_rent')
+        max_rent = self.request.GET.get('max_rent')
+        county = self.request.GET.get('county', '').strip()
+        town = self.request.GET.get('town', '').strip()
+        location = self.request.GET.get('location', '').strip()
+        house_type = self.request.GET.get('house_type', '').strip()
+
+        if q:
+            properties_list = properties_list.filter(
+                Q(description__icontains=q) | Q(house_number__icontains=q)
+            )
+        if min_rent:
+            properties_list = properties_list.filter(rent__gte=min_rent)
+        if max_rent:
+            properties_list = properties_list.filter(rent__lte=max_rent)
+        if county:
+            properties_list = properties_list.filter(county=canonical_county(county))
+        if town:
+            properties_list = properties_list.filter(town_ref__in=town_ids(town, county))
+        if location:
+            properties_list = properties_list.filter(location__icontains=location)
+        if house_type:
+            properties_list = properties_list.filter(house_type=house_type)
+        return properties_list
 
     def get_context_data(self, **kwargs):
+        self.landlord_profile = getattr(self.request.user, 'landlordprofile', None)
+        if self.landlord_profile:
+            self.properties_list = self.get_filtered_properties(self.landlord_profile)
         context = super().get_context_data(**kwargs)
-        landlord_profile = getattr(self.request.user, 'landlordprofile', None)
-
-        if landlord_profile:
-            # Get all landlord's properties
-            properties_list = landlord_profile.property_set.all()
-
-            # ---- APPLY FILTERS ----
-            q = self.request.GET.get('q', '').strip()
-            min_rent = self.request.GET.get('min_rent')
-            max_rent = self.request.GET.get('max_rent')
-            county = self.request.GET.get('county', '').strip()
-            town = self.request.GET.get('town', '').strip()
-            location = self.request.GET.get('location', '').strip()
-            house_type = self.request.GET.get('house_type', '').strip()
-
-            if q:
-                properties_list = properties_list.filter(
-                    Q(description__icontains=q) | Q(house_number__icontains=q)
-                )
-            if min_rent:
-                properties_list = properties_list.filter(rent__gte=min_rent)
-            if max_rent:
-                properties_list = properties_list.filter(rent__lte=max_rent)
-            if county:
-                properties_list = properties_list.filter(county__iexact=county)
-            if town:
-                properties_list = properties_list.filter(town__iexact=town)
-            if location:
-                properties_list = properties_list.filter(location__icontains=location)
-            if house_type:
-                properties_list = properties_list.filter(house_type=house_type)
 
+        if self.landlord_profile:
             # ---- Paginate (6 per page) ----
-            paginator = Paginator(properties_list, 6)
+            paginator = Paginator(self.properties_list.with_cover_image().with_view_counts(), 6)
             page_number = self.request.GET.get('page')
             context['properties'] = paginator.get_page(page_number)
 
-            # ---- Summary info ----
-            context['total_properties'] = landlord_profile.property_set.count()
-            context['available_properties'] = landlord_profile.property_set.filter(available=True).count()
-
             # ---- Persist filter values for form ----
             context.update({
-                'search_query': q,
-                'min_rent': min_rent or '',
-                'max_rent': max_rent or '',
-                'county': county,
-                'town': town,
-                'location': location,
-                'house_type': house_type,
-                'counties': properties_list.values_list('county', flat=True).distinct(),
-                'towns': properties_list.values_list('town', flat=True).distinct(),
+                'search_query': self.request.GET.get('q', '').strip(),
+                'min_rent': self.request.GET.get('min_rent') or '',
+                'max_rent': self.request.GET.get('max_rent') or '',
+                'county': self.request.GET.get('county', '').strip(),
+                'town': self.request.GET.get('town', '').strip(),
+                'location': self.request.GET.get('location', '').strip(),
+                'house_type': self.request.GET.get('house_type', '').strip(),
             })
         else:
-            context['total_properties'] = 0
-            context['available_properties'] = 0
             context['properties'] = []
-            context['counties'] = []
-            context['towns'] = []
 
         return context
 
+    def get_page_context_data(self):
+        # Summary and dropdowns, left alone by filter changes (properties/fragments.py)
+        landlord_profile = self.landlord_profile
+        if not landlord_profile:
+            return {'total_properties': 0, 'available_properties': 0, 'counties': [], 'towns': []}
+        return {
+            # ---- Summary info ----
+            'total_properties': landlord_profile.property_set.count(),
+            'available_properties': landlord_profile.property_set.filter(available=True).count(),
+            'pending_viewing_requests': landlord_profile.viewing_requests.filter(
+                status=ViewingRequest.PENDING
+            ).count(),
+            'view_totals': PropertyViewCount.objects.filter(
+                property__landlord=landlord_profile
+            ).aggregate(
+                detail_views=Coalesce(Sum('detail_views'), 0),
+                card_views=Coalesce(Sum('card_views'), 0),
+            ),
+            'counties': self.properties_list.values_list('county', flat=True).distinct(),
+            'towns': self.properties_list.values_list('town', flat=True).distinct(),
+        }
+
 
 # =========================
 # Delete individual property image (AJAX)
@@ -286,9 +346,65 @@ def delete_property_image(request, image_id):
     image.delete()
     return JsonResponse({'success': True})
 
-class LandlordBrowsePropertiesView(LoginRequiredMixin, ListView):
+# =========================
+# Chunked photo uploads (AJAX, see properties/uploads.py)
+# =========================
+def upload_state(upload, image=None):
+    state = {
+        'id': str(upload.pk),
+        'offset': upload.received,
+        'size': upload.size,
+        'chunk_size': settings.IMAGE_UPLOAD_CHUNK_SIZE,
+        'complete': upload.completed or image is not None,
+    }
+    if image is not None:
+        state['image'] = {'id': image.pk, 'url': image.image.url}
+    return state
+
+
+@landlord_required
+@require_POST
+def start_image_upload(request):
+    property_obj = None
+    if request.POST.get('property'):
+        if not request.POST['property'].isdigit():
+            return JsonResponse({'error': "Property must be a listing id."}, status=400)
+        property_obj = get_object_or_404(Property, pk=request.POST['property'], landlord__user=request.user)
+    try:
+        upload = start_upload(request.user, request.POST.get('filename'), request.POST.get('size'), property_obj)
+    except UploadError as exc:
+        return JsonResponse({'error': str(exc)}, status=exc.status)
+    return JsonResponse(upload_state(upload), status=201)
+
+
+@landlord_required
+@require_http_methods(['GET', 'PUT', 'DELETE'])
+def image_upload(request, upload_id):
+    """GET: progress (to resume); PUT: the chunk at the Upload-Offset header; DELETE: cancel."""
+    upload = get_object_or_404(ImageUpload, pk=upload_id, user=request.user)
+    if request.method == 'GET':
+        return JsonResponse(upload_state(upload))
+    if request.method == 'DELETE':
+        abort_upload(upload)
+        return JsonResponse({'id': str(upload_id), 'deleted': True})
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return JsonResponse({'error': "Upload-Offset and Content-Length are required."}, status=400)
+    try:
+        # The body is read from the request stream, never loaded whole
+        image = write_chunk(upload, offset, request, length)
+    except UploadError as exc:
+        current = ImageUpload.objects.filter(pk=upload.pk).values_list('received', flat=True).first()
+        return JsonResponse({'error': str(exc), 'offset': current}, status=exc.status)
+    return JsonResponse(upload_state(upload, image))
+
+class LandlordBrowsePropertiesView(LoginRequiredMixin, ResultsFragmentMixin, ListView):
     model = Property
     template_name = 'landlords/landlords_browse.html'  # the template we created
+    fragment_template_name = 'landlords/landlords_browse_results.html'
     context_object_name = 'properties'
     paginate_by = 6
 
@@ -300,8 +416,8 @@ class LandlordBrowsePropertiesView(LoginRequiredMixin, ListView):
         q = self.request.GET.get('q', '')
         min_rent = self.request.GET.get('min_rent')
         max_rent = self.request.GET.get('max_rent')
-        county = self.request.GET.get('county', '').strip().title()
-        town = self.request.GET.get('town', '').strip().title()
+        county = canonical_county(self.request.GET.get('county', ''))
+        town = display_town_name(self.request.GET.get('town', ''))
         location = self.request.GET.get('location', '')
         house_type = self.request.GET.get('house_type', '')
 
@@ -318,32 +434,22 @@ class LandlordBrowsePropertiesView(LoginRequiredMixin, ListView):
         if max_rent:
             queryset = queryset.filter(rent__lte=max_rent)
         if county:
-            queryset = queryset.filter(county__iexact=county)
+            queryset = queryset.filter(county=county)
         if town:
-            queryset = queryset.filter(town__iexact=town)
+            queryset = queryset.filter(town_ref__in=town_ids(town, county))
         if location:
             queryset = queryset.filter(location__icontains=location)
         if house_type:
             queryset = queryset.filter(house_type=house_type)
 
-        return queryset.order_by('-created_at')
+        return queryset.with_cover_image().order_by('-created_at')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # ---- Dropdowns ----
-        context['counties'] = KENYA_COUNTIES
-        context['county'] = self.request.GET.get('county', '').strip().title()
-        context['town'] = self.request.GET.get('town', '').strip().title()
-
-        # Populate town dropdown dynamically
-        if context['county']:
-            towns = Property.objects.filter(county__iexact=context['county']).values_list('town', flat=True).distinct()
-        else:
-            towns = Property.objects.values_list('town', flat=True).distinct()
-        context['towns'] = sorted([t.strip().title() for t in towns])
-
         # ---- Keep filter values ----
+        context['county'] = canonical_county(self.request.GET.get('county', ''))
+        context['town'] = display_town_name(self.request.GET.get('town', ''))
         context['search_query'] = self.request.GET.get('q', '')
         context['min_rent'] = self.request.GET.get('min_rent', '')
         context['max_rent'] = self.request.GET.get('max_rent', '')
@@ -363,6 +469,11 @@ class LandlordBrowsePropertiesView(LoginRequiredMixin, ListView):
 
         return context
 
+    def get_page_context_data(self):
+        # ---- Dropdowns (left alone by filter changes, see properties/fragments.py) ----
+        county = canonical_county(self.request.GET.get('county', ''))
+        return {'counties': KENYA_COUNTIES, 'towns': towns_for_county(county)}
+
 class LandlordFavoritePropertyView(LoginRequiredMixin, View):
     """
     Toggle a property as favorite/unfavorite for the landlord.
@@ -404,6 +515,64 @@ class LandlordPropertyDetailView(LoginRequiredMixin, LandlordRequiredMixin, Deta
         # Only allow the landlord to view their own properties
         return Property.objects.filter(landlord__user=self.request.user)
     
+# =========================
+# Viewing request inbox
+# =========================
+INBOX_PAGE_SIZE = 20
+
+@method_decorator(landlord_required, name='dispatch')
+class ViewingRequestInboxView(LoginRequiredMixin, LandlordRequiredMixin, View):
+    """
+    Viewing requests for the landlord's listings, newest first, one status
+    at a time. Pages are keyset-paginated on id (?before=<id>) through the
+    (landlord, status, -id) index, so deep pages cost the same as the first.
+    """
+    template_name = 'landlords/viewing_requests.html'
+
+    def get_status(self, data):
+        status = data.get('status', ViewingRequest.PENDING)
+        return status if status in dict(ViewingRequest.STATUS_CHOICES) else ViewingRequest.PENDING
+
+    def get(self, request):
+        landlord_profile = request.user.landlordprofile
+        status = self.get_status(request.GET)
+
+        viewing_requests = (
+            ViewingRequest.objects.filter(landlord=landlord_profile, status=status)
+            .select_related('tenant__user', 'property')
+            .order_by('-id')
+        )
+        before = request.GET.get('before', '')
+        if before.isdigit():
+            viewing_requests = viewing_requests.filter(id__lt=int(before))
+
+        # One extra row tells whether there is a next page, without a COUNT
+        page = list(viewing_requests[:INBOX_PAGE_SIZE + 1])
+        has_next = len(page) > INBOX_PAGE_SIZE
+        page = page[:INBOX_PAGE_SIZE]
+
+        return render(request, self.template_name, {
+            'viewing_requests': page,
+            'status': status,
+            'status_choices': ViewingRequest.STATUS_CHOICES,
+            'next_before': page[-1].id if has_next else None,
+            'is_first_page': not before,
+        })
+
+    def post(self, request):
+        # Accept or decline every selected request with a single UPDATE
+        new_status = request.POST.get('new_status')
+        ids = [int(pk) for pk in request.POST.getlist('ids') if pk.isdigit()]
+        if new_status in (ViewingRequest.ACCEPTED, ViewingRequest.DECLINED) and ids:
+            updated = ViewingRequest.objects.filter(
+                landlord=request.user.landlordprofile, pk__in=ids,
+            ).update(status=new_status)
+            messages.success(request, f"{updated} viewing request{'s' if updated != 1 else ''} marked {new_status}.")
+        else:
+            messages.error(request, "Select at least one request and an action.")
+        return redirect(f"{reverse('landlords:viewing_requests')}?status={self.get_status(request.POST)}")
+
+
 class LandlordAccountUpdateView(LoginRequiredMixin, UpdateView):
     model = CustomUser
     form_class = LandlordAccountForm
@@ -426,13 +595,14 @@ class LandlordAccountDeleteView(LoginRequiredMixin, View):
     def post(self, request):
         user = request.user
 
+        # Deactivate now and hide listings; process_account_deletions purges
+        # the profile, properties, images, favorites and media later
+        request_account_deletion(user)
+
         # Log out and destroy session
         logout(request)
         request.session.flush()
 
-        # Delete user (cascades to LandlordProfile, properties, images, favorites)
-        user.delete()
-
         messages.success(request, "Your account and all your properties have been deleted successfully.")
         return redirect('home')  # or any page you want
 
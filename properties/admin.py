@@ -1,10 +1,170 @@
 # Django admin configuration for Property model
 
-from django.contrib import admin
-from .models import Property
+from django import forms
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils.functional import cached_property
+from tenants.models import SavedSearch
+from .models import Property, Town, TownAlias
+from .cache import bump_listings_version
+from .constants import KENYA_COUNTIES
+from .towns import canonical_county, merge_towns, town_key
+
+# Below this many rows the exact COUNT(*) is cheap enough
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimated_row_count(model, using):
+    """Row count from the database's table statistics (None if unavailable)."""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'mysql':
+        sql = "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+    elif connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Unfiltered changelists of big tables are paged by the table statistics
+    instead of a COUNT(*) over every row; filtered ones are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class CountyListFilter(admin.SimpleListFilter):
+    title = 'county'
+    parameter_name = 'county'
+
+    def lookups(self, request, model_admin):
+        # The fixed county list, not a DISTINCT over the listings
+        return [(county, county) for county in KENYA_COUNTIES]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(county=self.value())
+        return queryset
+
+
+class TownListFilter(admin.SimpleListFilter):
+    """Towns of the selected county only; hidden until a county is picked."""
+    title = 'town'
+    parameter_name = 'town'
+
+    def lookups(self, request, model_admin):
+        county = request.GET.get(CountyListFilter.parameter_name)
+        if not county:
+            return []
+        return list(Town.objects.filter(county=county).values_list('pk', 'name'))
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(town_ref=self.value())
+        return queryset
+
 
 @admin.register(Property)
 class PropertyAdmin(admin.ModelAdmin):
-    list_display = ('house_type', 'house_number', 'landlord', 'rent', 'location', 'available')
-    list_filter = ('house_type', 'available', 'location')  # Filters in sidebar
-    search_fields = ('house_number', 'landlord__user__username', 'location')
+    list_display = ('house_type', 'house_number', 'landlord', 'rent', 'county', 'town', 'location', 'available')
+    list_filter = ('house_type', 'available', CountyListFilter, TownListFilter)  # Filters in sidebar
+    list_select_related = ('landlord__user',)
+    # Prefix and exact matches can use the indexes; icontains scans the table
+    search_fields = ('^house_number', '=landlord__user__username', '^location')
+    autocomplete_fields = ('landlord',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # no second COUNT(*) for "n total" when filtered
+
+
+class TownAdminForm(forms.ModelForm):
+    class Meta:
+        model = Town
+        fields = ('county', 'name')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        county = canonical_county(cleaned_data.get('county') or self.instance.county or '')
+        name = cleaned_data.get('name')
+        if county and name:
+            # Another town (or another town's alias) already answers to this spelling
+            key = town_key(name)
+            taken = (
+                Town.objects.filter(county=county, key=key).exclude(pk=self.instance.pk).first()
+                or Town.objects.filter(aliases__county=county, aliases__key=key).exclude(pk=self.instance.pk).first()
+            )
+            if taken:
+                raise forms.ValidationError(
+                    f'"{name}" already refers to {taken}. To combine the two, '
+                    f'select both in the town list and use "Merge selected towns".'
+                )
+            if 'county' in cleaned_data:
+                cleaned_data['county'] = county
+        return cleaned_data
+
+
+class TownAliasInline(admin.TabularInline):
+    model = TownAlias
+    extra = 1
+
+
+@admin.register(Town)
+class TownAdmin(admin.ModelAdmin):
+    list_display = ('name', 'county', 'key', 'listing_count')
+    list_filter = ('county',)
+    search_fields = ('name', 'key', 'aliases__key')
+    form = TownAdminForm
+    inlines = [TownAliasInline]
+    actions = ['merge_selected']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(listing_count=Count('properties'))
+
+    @admin.display(ordering='listing_count')
+    def listing_count(self, obj):
+        return obj.listing_count
+
+    def get_readonly_fields(self, request, obj=None):
+        # Moving a town between counties would leave its listings behind
+        return ('county', 'key') if obj else ('key',)
+
+    def save_model(self, request, obj, form, change):
+        renamed = change and 'name' in form.changed_data
+        old_key = Town.objects.get(pk=obj.pk).key if renamed else None
+        obj.key = town_key(obj.name)
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not renamed:
+                return
+            if obj.key != old_key:
+                # Listings still typed the old way keep finding this town
+                obj.aliases.filter(key=obj.key).delete()
+                TownAlias.objects.get_or_create(county=obj.county, key=old_key, defaults={'town': obj})
+            # Listings and saved searches store the display name too
+            obj.properties.update(town=obj.name)
+            for search in SavedSearch.objects.filter(county__in=[obj.county, ''], town=form.initial['name']):
+                search.save()  # re-resolves the old spelling, now an alias
+        bump_listings_version()
+
+    @admin.action(description="Merge selected towns into the one with most listings")
+    def merge_selected(self, request, queryset):
+        towns = sorted(queryset, key=lambda town: (-town.listing_count, town.pk))
+        if len({town.county for town in towns}) > 1:
+            self.message_user(request, "Only towns in the same county can be merged.", messages.ERROR)
+            return
+        moved = merge_towns(towns[0], towns[1:])
+        self.message_user(request, f"Merged {len(towns) - 1} town(s) into {towns[0]}; {moved} listing(s) moved.")
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class PropertiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'properties'
+
+    def ready(self):
+        from django.core.signals import request_finished
+
+        from .counters import flush_if_due
+
+        request_finished.connect(flush_if_due, dispatch_uid='properties.flush_view_counts')
@@ -0,0 +1,179 @@
+# properties/archive.py
+
+"""
+Hot/cold split of listings.
+
+Browse pages only show available listings, yet listings taken off the
+market stay in Property (and its indexes) for good. archive_listings moves
+listings unavailable for ARCHIVE_AFTER_DAYS into ArchivedProperty, in
+batches of one transaction each: their images and favorites go to
+ArchivedPropertyImage and ArchivedFavorite, their view totals and viewing
+requests onto the archived row. Image files are not touched. What is
+derived from the listing (search trigrams, similar properties, pending
+saved-search alerts, unfinished uploads) is dropped and rebuilt on restore.
+
+A landlord restores an archived listing from "Archived listings"; it comes
+back under the same id where possible, still unavailable, so it is only
+listed (and alerted) again when the landlord marks it available.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from landlords.models import LandlordFavoriteProperty
+from tenants.models import FavoriteProperty, TenantProfile, ViewingRequest
+from .bulk import raw_cascade_delete
+from .cache import bump_listings_version
+from .models import (
+    ArchivedFavorite, ArchivedProperty, ArchivedPropertyImage, Property, PropertyImage,
+    PropertyViewCount, SimilarityRefreshQueue,
+)
+
+DEFAULT_BATCH_SIZE = 500
+
+# Copied both ways between Property and ArchivedProperty
+LISTING_FIELDS = (
+    'landlord_id', 'house_type', 'house_number', 'rent', 'county', 'town',
+    'location', 'description', 'created_at',
+)
+
+
+def stamp_unavailable():
+    """Start the clock for listings hidden with .update() (e.g. account deletion)."""
+    return Property.objects.filter(available=False, unavailable_since__isnull=True).update(
+        unavailable_since=timezone.now(),
+    )
+
+
+def archive_candidates(days=None):
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Property.objects.filter(available=False, unavailable_since__lt=cutoff)
+
+
+def viewing_request_row(viewing):
+    return {
+        'tenant_id': viewing.tenant_id,
+        'requested_on': viewing.requested_on.isoformat(),
+        'message': viewing.message,
+        'status': viewing.status,
+        'notified_at': viewing.notified_at.isoformat() if viewing.notified_at else None,
+    }
+
+
+def archive_properties(pks):
+    """
+    Move the listings with these ids that are still unavailable into the
+    archive tables, in one transaction. Returns how many were archived.
+    """
+    with transaction.atomic():
+        # Locked so a landlord re-listing one meanwhile waits, then keeps it
+        listings = list(Property.objects.select_for_update().filter(pk__in=pks, available=False).order_by('pk'))
+        ids = [listing.pk for listing in listings]
+        if not ids:
+            return 0
+
+        view_counts = {
+            row[0]: row[1:]
+            for row in PropertyViewCount.objects.filter(property_id__in=ids)
+            .values_list('property_id', 'detail_views', 'card_views')
+        }
+        viewing_requests = {}
+        for viewing in ViewingRequest.objects.filter(property_id__in=ids).order_by('pk'):
+            viewing_requests.setdefault(viewing.property_id, []).append(viewing_request_row(viewing))
+
+        ArchivedProperty.objects.bulk_create([
+            ArchivedProperty(
+                original_id=listing.pk,
+                unavailable_since=listing.unavailable_since,
+                detail_views=view_counts.get(listing.pk, (0, 0))[0],
+                card_views=view_counts.get(listing.pk, (0, 0))[1],
+                viewing_requests=viewing_requests.get(listing.pk, []),
+                **{name: getattr(listing, name) for name in LISTING_FIELDS},
+            )
+            for listing in listings
+        ])
+        # bulk_create sets no pks on MySQL; an older archived row with a
+        # reused original id sorts first, so the new row wins
+        archived_ids = dict(
+            ArchivedProperty.objects.filter(original_id__in=ids).order_by('pk').values_list('original_id', 'pk')
+        )
+        ArchivedPropertyImage.objects.bulk_create([
+            ArchivedPropertyImage(property_id=archived_ids[property_id], image=image)
+            for property_id, image in PropertyImage.objects.filter(property_id__in=ids)
+            .order_by('pk').values_list('property_id', 'image')
+        ])
+        ArchivedFavorite.objects.bulk_create(
+            [
+                ArchivedFavorite(property_id=archived_ids[property_id], tenant_id=tenant_id)
+                for property_id, tenant_id in FavoriteProperty.objects.filter(property_id__in=ids)
+                .values_list('property_id', 'tenant_id')
+            ] + [
+                ArchivedFavorite(property_id=archived_ids[property_id], landlord_id=landlord_id)
+                for property_id, landlord_id in LandlordFavoriteProperty.objects.filter(property_id__in=ids)
+                .values_list('property_id', 'landlord_id')
+            ]
+        )
+
+        # The image files now belong to the archived rows, so they are kept
+        raw_cascade_delete(Property, ids)
+        # No delete signals here, so drop them from other listings' neighbours directly
+        SimilarityRefreshQueue.enqueue(ids)
+        transaction.on_commit(bump_listings_version)
+    return len(ids)
+
+
+def restore_property(archived):
+    """Move an archived listing back into Property (unavailable); returns it."""
+    with transaction.atomic():
+        archived = ArchivedProperty.objects.select_for_update().get(pk=archived.pk)
+        # Ids are not normally reused, but MySQL may hand out a freed one again
+        reuse_id = not Property.objects.filter(pk=archived.original_id).exists()
+        property_obj = Property(
+            id=archived.original_id if reuse_id else None,
+            available=False,
+            **{name: getattr(archived, name) for name in LISTING_FIELDS},
+        )
+        # Reindexed for search and queued for similar properties by the post_save receivers
+        property_obj.save(force_insert=True)
+        Property.objects.filter(pk=property_obj.pk).update(created_at=archived.created_at)  # not auto_now_add's
+        property_obj.created_at = archived.created_at
+
+        PropertyImage.objects.bulk_create([
+            PropertyImage(property=property_obj, image=image.image.name)
+            for image in archived.images.order_by('pk')
+        ])
+        favorites = list(archived.favorites.all())
+        FavoriteProperty.objects.bulk_create([
+            FavoriteProperty(tenant_id=favorite.tenant_id, property=property_obj)
+            for favorite in favorites if favorite.tenant_id
+        ])
+        LandlordFavoriteProperty.objects.bulk_create([
+            LandlordFavoriteProperty(landlord_id=favorite.landlord_id, property=property_obj)
+            for favorite in favorites if favorite.landlord_id
+        ])
+        if archived.detail_views or archived.card_views:
+            PropertyViewCount.objects.create(
+                property=property_obj, detail_views=archived.detail_views, card_views=archived.card_views,
+            )
+
+        # Tenants deleted since the listing was archived have no requests to restore
+        rows = archived.viewing_requests
+        tenant_ids = set(
+            TenantProfile.objects.filter(pk__in={row['tenant_id'] for row in rows}).values_list('pk', flat=True)
+        )
+        ViewingRequest.objects.bulk_create([
+            ViewingRequest(
+                tenant_id=row['tenant_id'], property=property_obj, landlord_id=archived.landlord_id,
+                requested_on=parse_date(row['requested_on']), message=row['message'], status=row['status'],
+                notified_at=parse_datetime(row['notified_at']) if row['notified_at'] else None,
+            )
+            for row in rows if row['tenant_id'] in tenant_ids
+        ])
+
+        archived.delete()  # its images' files now belong to the PropertyImage rows
+    return property_obj
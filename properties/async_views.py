@@ -0,0 +1,192 @@
+# properties/async_views.py
+
+"""
+Async versions of the read-only browse/detail pages, the towns AJAX
+endpoint and the live listings stream, mounted instead of the sync views
+when ASYNC_VIEWS is on (ASGI deployments).
+
+Filtering is shared with the sync views: each async view builds its
+queryset through the matching sync view's get_queryset(). That can query
+the database itself (the fuzzy search fallback, properties/search.py), so
+it runs through sync_to_async rather than on the event loop. Independent
+queries are started together with asyncio.gather; note that Django runs
+async ORM calls through sync_to_async, so they still share one connection
+and the win is mostly that the event loop keeps serving other
+connections while a request waits on the database.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
+from django.views import View
+
+from tenants.models import FavoriteProperty
+from .cache import AnonymousPageCacheMixin
+from .counters import DetailViewCountMixin
+from .constants import KENYA_COUNTIES
+from . import live
+from .facets import towns_for_county
+from .filters import normalized_filter_spec
+from .fragments import FRAGMENT_HEADER
+from .models import Property, PropertyImage, property_image_url
+from .towns import canonical_county, display_town_name
+from .views import PropertyListView
+
+
+# =========================
+# Shared async queries
+# =========================
+async def atowns_for_county(county):
+    """Distinct, normalized towns for a county (all towns if county is empty)."""
+    # Usually a cache hit; the cache backends are sync-only
+    return await sync_to_async(towns_for_county)(county)
+
+
+async def afavorite_property_ids(user):
+    if not user.is_authenticated:
+        return []
+    favorites = FavoriteProperty.objects.filter(tenant__user=user).values_list('property_id', flat=True)
+    return [property_id async for property_id in favorites.aiterator()]
+
+
+async def asimilar_properties(pk):
+    return [p async for p in Property.objects.similar_to(pk).aiterator()]
+
+
+async def apaginate(queryset, page, per_page):
+    """
+    Async equivalent of MultipleObjectMixin.paginate_queryset(): counts with
+    acount() and fetches only the requested slice.
+    """
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount()
+    try:
+        if page == 'last':
+            page = paginator.num_pages
+        number = paginator.validate_number(page)
+    except InvalidPage:
+        raise Http404("Invalid page.")
+    bottom = (number - 1) * per_page
+    rows = queryset[bottom:bottom + per_page]
+    object_list = [obj async for obj in rows.aiterator(chunk_size=per_page)]
+    return Page(object_list, number, paginator)
+
+
+# =========================
+# Browse / list pages
+# =========================
+class AsyncListingPageView(AnonymousPageCacheMixin, View):
+    """
+    Renders a sync ListView's template with the same context keys, running
+    the page, towns and favorites queries concurrently.
+    """
+    sync_view = None
+    include_favorites = False
+
+    async def get(self, request, *args, **kwargs):
+        view = self.sync_view()
+        view.setup(request, *args, **kwargs)
+        # May run queries itself (fuzzy search fallback), so off the event loop
+        queryset = await sync_to_async(view.get_queryset)()
+
+        county = canonical_county(request.GET.get('county', ''))
+        # Results fragments leave the dropdowns alone (properties/fragments.py)
+        fragment = getattr(view, 'is_fragment', False)
+        user = await request.auser()
+        page_obj, towns, favorite_property_ids = await asyncio.gather(
+            apaginate(queryset, request.GET.get('page') or 1, view.paginate_by),
+            asyncio.sleep(0, result=[]) if fragment else atowns_for_county(county),
+            afavorite_property_ids(user) if self.include_favorites else asyncio.sleep(0, result=[]),
+        )
+
+        context = {
+            'paginator': page_obj.paginator,
+            'page_obj': page_obj,
+            'is_paginated': page_obj.has_other_pages(),
+            'object_list': page_obj.object_list,
+            view.context_object_name: page_obj.object_list,
+            'counties': KENYA_COUNTIES,
+            'county': county,
+            'town': display_town_name(request.GET.get('town', '')),
+            'towns': towns,
+            'search_query': request.GET.get('q', ''),
+            'min_rent': request.GET.get('min_rent', ''),
+            'max_rent': request.GET.get('max_rent', ''),
+            'location': request.GET.get('location', ''),
+            'house_type': request.GET.get('house_type', ''),
+            'fuzzy_search': getattr(view, 'fuzzy_search', False),
+            'live_updates': settings.ASYNC_VIEWS,
+        }
+        if self.include_favorites:
+            context['favorite_property_ids'] = favorite_property_ids
+        # Templates still touch lazy relations (request.user profiles), so
+        # rendering happens off the event loop.
+        template_name = view.fragment_template_name if fragment else view.template_name
+        response = await sync_to_async(render)(request, template_name, context)
+        patch_vary_headers(response, [FRAGMENT_HEADER])
+        return response
+
+
+class AsyncPropertyListView(AsyncListingPageView):
+    sync_view = PropertyListView
+
+
+# =========================
+# Property detail
+# =========================
+class AsyncPropertyDetailView(DetailViewCountMixin, AnonymousPageCacheMixin, View):
+    template_name = 'properties/property_detail.html'
+
+    async def get(self, request, pk):
+        user = await request.auser()
+        property_obj, favorite_property_ids, similar_properties = await asyncio.gather(
+            Property.objects.filter(pk=pk)
+            .select_related('landlord__user')
+            .prefetch_related('images')
+            .afirst(),
+            afavorite_property_ids(user),
+            asimilar_properties(pk),
+        )
+        if property_obj is None:
+            raise Http404("No property found matching the query")
+
+        context = {
+            'object': property_obj,
+            'property': property_obj,
+            'favorite_property_ids': favorite_property_ids,
+            'similar_properties': similar_properties,
+        }
+        return await sync_to_async(render)(request, self.template_name, context)
+
+
+# =========================
+# AJAX: carousel images
+# =========================
+async def property_images(request, pk):
+    images = PropertyImage.objects.filter(property_id=pk).order_by('pk').values_list('pk', 'image')
+    return JsonResponse({'images': [
+        {'id': image_id, 'url': property_image_url(name)} async for image_id, name in images
+    ]})
+
+
+# =========================
+# AJAX: towns for a county
+# =========================
+async def get_towns_by_county(request):
+    county = request.GET.get('county', '').strip()
+    towns_list = await atowns_for_county(county) if county else []
+    return JsonResponse({'towns': towns_list})
+
+
+# =========================
+# SSE: live listing updates
+# =========================
+async def listing_stream(request):
+    spec = await sync_to_async(normalized_filter_spec)(request.GET, resolve_towns=True)
+    last_event_id = live.parse_event_id(request.headers.get('Last-Event-ID'))
+    return live.event_stream_response(live.stream_events(spec, last_event_id))
@@ -0,0 +1,150 @@
+# properties/autocomplete.py
+
+"""
+Typeahead suggestions for the location, town and county filters.
+
+Each process keeps an in-memory PrefixIndex: every word-suffix of every
+distinct value ("Kilimani Road" is found by "kil" and "roa") in one sorted
+list, searched with bisect, suggestions ranked by available-listing count.
+A keystroke never touches the database.
+
+Property saves and deletes bump the listings version (see models.py); the
+next lookup in each process notices and rebuilds the index in a background
+thread while the previous one keeps answering.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+from django.db import connections
+from django.db.models import Count
+
+from .cache import get_listings_version
+from .models import Property
+
+FIELDS = ('location', 'town', 'county')
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# Prefixes matching more entries than this get their ranking precomputed
+# when the index is built; smaller ranges are ranked per lookup
+LARGE_RANGE = 256
+
+
+def normalize(value):
+    return ' '.join(value.split()).lower()
+
+
+class PrefixIndex:
+    def __init__(self, counts, version=None):
+        """``counts`` maps (field, display value) to its listing count."""
+        entries = []
+        for (field, display), count in counts.items():
+            words = normalize(display).split()
+            for i in range(len(words)):
+                entries.append((' '.join(words[i:]), field, display, count))
+        entries.sort()
+        self.version = version
+        self.size = len(counts)
+        self._keys = [entry[0] for entry in entries]
+        self._entries = entries
+        self._top = {}
+        self._precompute(0, len(entries), 0)
+
+    def _range(self, prefix, lo=0, hi=None):
+        # Every key starting with prefix sorts between prefix and prefix + U+FFFF
+        hi = len(self._keys) if hi is None else hi
+        start = bisect_left(self._keys, prefix, lo, hi)
+        return start, bisect_left(self._keys, prefix + '\uffff', start, hi)
+
+    def _rank(self, start, end, field, limit):
+        matches = {
+            (entry_field, display): count
+            for _, entry_field, display, count in self._entries[start:end]
+            if field is None or entry_field == field
+        }
+        results = heapq.nsmallest(limit, matches.items(), key=lambda item: (-item[1], item[0][1]))
+        return [(entry_field, display, count) for (entry_field, display), count in results]
+
+    def _precompute(self, start, end, depth):
+        """Rank every prefix (one character longer per level) matching over LARGE_RANGE entries."""
+        if end - start <= LARGE_RANGE:
+            return
+        if depth:
+            self._top[self._keys[start][:depth]] = {
+                field: self._rank(start, end, field, MAX_LIMIT) for field in (None, *FIELDS)
+            }
+        i = start
+        while i < end:
+            if len(self._keys[i]) <= depth:
+                i += 1
+                continue
+            _, j = self._range(self._keys[i][:depth + 1], i, end)
+            self._precompute(i, j, depth + 1)
+            i = j
+
+    def search(self, prefix, field=None, limit=DEFAULT_LIMIT):
+        """Top ``limit`` (field, display, count) whose words start with ``prefix``."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if prefix in self._top:
+            return self._top[prefix][field][:limit]
+        return self._rank(*self._range(prefix), field, limit)
+
+
+def build_index(version=None):
+    """Count available listings per distinct location, town and county (one query per field)."""
+    counts = Counter()
+    available = Property.objects.filter(available=True).order_by()
+    for field in FIELDS:
+        for value, count in available.values_list(field).annotate(n=Count('pk')):
+            # Counties and towns are stored canonical (properties/towns.py)
+            display = ' '.join(value.split()).title() if field == 'location' else value
+            if display:
+                counts[field, display] += count
+    return PrefixIndex(counts, version)
+
+
+_index = None
+_lock = threading.Lock()
+_rebuilding = False
+
+
+def _rebuild(version):
+    global _index, _rebuilding
+    try:
+        _index = build_index(version)
+    finally:
+        _rebuilding = False
+        connections.close_all()  # this thread's connections only
+
+
+def get_index():
+    """
+    The current process's index. Built synchronously the first time (or
+    by warm_up() before workers fork); afterwards a stale index is served
+    while a background thread rebuilds it.
+    """
+    global _index, _rebuilding
+    version = get_listings_version()
+    index = _index
+    if index is None:
+        with _lock:
+            if _index is None:
+                _index = build_index(version)
+            return _index
+    if index.version != version and not _rebuilding:
+        with _lock:
+            if not _rebuilding:
+                _rebuilding = True
+                threading.Thread(target=_rebuild, args=(version,), daemon=True).start()
+    return index
+
+
+def prime_autocomplete_index():
+    """Build the index now (warm-up step). Returns the number of distinct values."""
+    global _index
+    _index = build_index(get_listings_version())
+    return _index.size
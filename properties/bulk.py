@@ -0,0 +1,67 @@
+# properties/bulk.py
+
+from django.core.files.storage import default_storage
+from django.db import models
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _cascade_relations(model):
+    # Same candidates Django's deletion Collector considers, including the
+    # hidden FKs of auto-created many-to-many through tables.
+    return [
+        f for f in model._meta.get_fields(include_hidden=True)
+        if f.auto_created and not f.concrete and (f.one_to_one or f.one_to_many)
+    ]
+
+
+def raw_cascade_delete(model, pks, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Delete ``model`` rows with the given primary keys and everything that
+    cascades from them, children first, in chunked raw DELETE statements.
+
+    Unlike QuerySet.delete() this never loads model instances and sends no
+    pre/post_delete signals, so callers handle cache invalidation. Returns
+    the names of files referenced by FileFields of the deleted rows so they
+    can be removed once the transaction commits.
+    """
+    pks = list(pks)
+    files = []
+    for start in range(0, len(pks), chunk_size):
+        files += _delete_chunk(model, pks[start:start + chunk_size], chunk_size)
+    return files
+
+
+def _delete_chunk(model, pks, chunk_size):
+    files = []
+    for relation in _cascade_relations(model):
+        related_model = relation.related_model
+        field_name = relation.field.name
+        related = related_model._base_manager.filter(**{f'{field_name}__in': pks})
+
+        if relation.on_delete is models.DO_NOTHING:
+            continue
+        if relation.on_delete is models.SET_NULL:
+            related.update(**{field_name: None})
+        elif relation.on_delete is models.CASCADE:
+            child_pks = list(related.values_list('pk', flat=True))
+            if child_pks:
+                files += raw_cascade_delete(related_model, child_pks, chunk_size)
+        else:
+            # PROTECT / SET_DEFAULT / SET(): let the regular collector enforce them
+            related.delete()
+
+    queryset = model._base_manager.filter(pk__in=pks)
+    file_fields = [f.attname for f in model._meta.concrete_fields if isinstance(f, models.FileField)]
+    if file_fields:
+        for row in queryset.values_list(*file_fields):
+            files += [name for name in row if name]
+    # Same single DELETE ... WHERE pk IN (...) the collector uses for fast deletes
+    queryset._raw_delete(queryset.db)
+    return files
+
+
+def delete_media_files(names, storage=default_storage):
+    """Remove stored files in one pass (missing files are ignored by storage)."""
+    for name in set(names):
+        storage.delete(name)
@@ -0,0 +1,173 @@
+# properties/cache.py
+
+import hashlib
+import re
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from .filters import normalized_filter_spec
+from .fragments import is_fragment_request
+
+LISTINGS_VERSION_KEY = 'listings:version'
+STATS_KEY_PREFIX = 'pagecache:stats:'
+STATS_OUTCOMES = ('hit', 'stale', 'miss')
+
+# Only one request may rebuild a stale entry; the lock expires on its own
+# if that request dies half-way.
+REBUILD_LOCK_TIMEOUT = 30
+
+# Cached pages are shared between visitors, so the CSRF token baked into
+# their forms is swapped for the current visitor's token on every hit.
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+# =========================
+# Global listings version
+# =========================
+def get_listings_version():
+    version = cache.get(LISTINGS_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted counter never restarts below a
+        # version that cached pages were rendered under.
+        cache.add(LISTINGS_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(LISTINGS_VERSION_KEY)
+    return version
+
+
+def bump_listings_version():
+    """Mark every cached listing page as stale (called from model signals)."""
+    try:
+        cache.incr(LISTINGS_VERSION_KEY)
+    except ValueError:
+        cache.set(LISTINGS_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+# =========================
+# Hit/miss counters
+# =========================
+def _count(outcome):
+    key = STATS_KEY_PREFIX + outcome
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def page_cache_stats():
+    stats = {outcome: cache.get(STATS_KEY_PREFIX + outcome, 0) for outcome in STATS_OUTCOMES}
+    total = sum(stats.values())
+    stats['hit_ratio'] = round((stats['hit'] + stats['stale']) / total, 4) if total else 0.0
+    stats['listings_version'] = get_listings_version()
+    return stats
+
+
+def reset_page_cache_stats():
+    cache.delete_many([STATS_KEY_PREFIX + outcome for outcome in STATS_OUTCOMES])
+
+
+# =========================
+# Per-view page cache
+# =========================
+class AnonymousPageCacheMixin:
+    """
+    Serve anonymous GET requests from the cache, keyed on the view, its URL
+    kwargs and the normalized filter spec.
+
+    Each entry records the listings version it was rendered under. An entry
+    is stale once Property/PropertyImage changes bump the version or it
+    outlives PAGE_CACHE_TIMEOUT; a stale entry is still served for up to
+    PAGE_CACHE_STALE_TIMEOUT seconds while a single request re-renders it.
+    """
+    page_cache_timeout = None  # defaults to settings.PAGE_CACHE_TIMEOUT
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._page_cache_adispatch(request, *args, **kwargs)
+        if not self.page_cache_applies(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = self.get_page_cache_key(request, *args, **kwargs)
+        cached = self.page_cache_lookup(request, key)
+        if cached is not None:
+            return cached
+        version = get_listings_version()
+        response = super().dispatch(request, *args, **kwargs)
+        return self.page_cache_store(key, version, response)
+
+    async def _page_cache_adispatch(self, request, *args, **kwargs):
+        # Same flow for async views; cache and session access stay sync
+        if not await sync_to_async(self.page_cache_applies)(request):
+            return await super().dispatch(request, *args, **kwargs)
+
+        key = self.get_page_cache_key(request, *args, **kwargs)
+        cached = await sync_to_async(self.page_cache_lookup)(request, key)
+        if cached is not None:
+            return cached
+        version = await sync_to_async(get_listings_version)()
+        response = await super().dispatch(request, *args, **kwargs)
+        return await sync_to_async(self.page_cache_store)(key, version, response)
+
+    def page_cache_lookup(self, request, key):
+        """Return a cached response, or None when this request must render."""
+        entry = cache.get(key)
+        if entry is not None:
+            if entry['version'] == get_listings_version() and entry['expires'] > time.time():
+                return self.page_cache_response(request, entry, 'hit')
+            # Stale: whoever takes the lock rebuilds, everyone else reuses it
+            if not cache.add(f'{key}:lock', 1, timeout=REBUILD_LOCK_TIMEOUT):
+                return self.page_cache_response(request, entry, 'stale')
+        _count('miss')
+        return None
+
+    def page_cache_store(self, key, version, response):
+        if hasattr(response, 'render'):
+            response = response.render()
+
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            timeout = self.page_cache_timeout or settings.PAGE_CACHE_TIMEOUT
+            cache.set(key, {
+                'version': version,
+                'expires': time.time() + timeout,
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'vary': response.get('Vary'),
+            }, timeout + settings.PAGE_CACHE_STALE_TIMEOUT)
+        cache.delete(f'{key}:lock')
+
+        response['X-Page-Cache'] = 'MISS'
+        return response
+
+    def page_cache_applies(self, request):
+        # Pending flash messages are rendered by base.html, so those pages
+        # are never shared. PAGE_CACHE_TIMEOUT=0 switches the cache off.
+        return (
+            settings.PAGE_CACHE_TIMEOUT > 0
+            and request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+            and not len(get_messages(request))
+        )
+
+    def get_page_cache_key(self, request, *args, **kwargs):
+        spec = normalized_filter_spec(request.GET) + (('page', request.GET.get('page', '')),)
+        # Results fragments (properties/fragments.py) are cached apart from full pages
+        fragment = is_fragment_request(request)
+        raw = repr((request.resolver_match.view_name, args, sorted(kwargs.items()), spec, fragment))
+        return 'pagecache:' + hashlib.sha1(raw.encode()).hexdigest()
+
+    def page_cache_response(self, request, entry, outcome):
+        _count(outcome)
+        content = entry['content']
+        if b'csrfmiddlewaretoken' in content:
+            token = get_token(request).encode()
+            content = CSRF_INPUT_RE.sub(lambda m: m.group(1) + token + m.group(2), content)
+        response = HttpResponse(content, content_type=entry['content_type'])
+        if entry.get('vary'):
+            response['Vary'] = entry['vary']
+        response['X-Page-Cache'] = outcome.upper()
+        return response
@@ -0,0 +1,130 @@
+# properties/counters.py
+
+"""
+Buffered listing view counters.
+
+Views are tallied in memory and written to PropertyViewCount in batches (one
+upsert plus one UPDATE ... CASE per chunk of listings) instead of an UPDATE
+on the hot Property table per page view. A flush runs after a request
+finishes once VIEW_COUNTS_FLUSH_INTERVAL has passed or
+VIEW_COUNTS_MAX_PENDING listings are waiting, and once more at process exit.
+Counts buffered in a worker that is killed outright are lost, which is
+acceptable for view statistics.
+
+Browse card views are posted by the visitor's browser, so each visitor (by
+CSRF cookie) counts once per listing per CARD_VIEW_DEDUPE_TIMEOUT.
+"""
+
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Property, PropertyViewCount
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('detail_views', 'card_views')
+FLUSH_CHUNK_SIZE = 500
+CARD_VIEW_DEDUPE_TIMEOUT = 30 * 60
+
+_lock = threading.Lock()
+_pending = {kind: Counter() for kind in KINDS}
+_last_flush = time.monotonic()
+
+
+def record_views(property_ids, kind='detail_views'):
+    with _lock:
+        _pending[kind].update(property_ids)
+
+
+def unseen_card_views(visitor, property_ids):
+    """The listings not counted for ``visitor`` lately, now marked as counted."""
+    visitor = hashlib.sha1(visitor.encode()).hexdigest()
+    keys = {f'cardview:{visitor}:{pk}': pk for pk in property_ids}
+    unseen = {key: 1 for key in keys.keys() - cache.get_many(list(keys)).keys()}
+    cache.set_many(unseen, CARD_VIEW_DEDUPE_TIMEOUT)
+    return {keys[key] for key in unseen}
+
+
+def _pending_ids(pending):
+    return set().union(*pending.values())
+
+
+def flush():
+    """Write all buffered views; returns the number of listings updated."""
+    global _pending, _last_flush
+    with _lock:
+        pending, _pending = _pending, {kind: Counter() for kind in KINDS}
+        _last_flush = time.monotonic()
+    if not _pending_ids(pending):
+        return 0
+    try:
+        return _write(pending)
+    except Exception:
+        # Keep the counts for the next flush
+        with _lock:
+            for kind in KINDS:
+                _pending[kind].update(pending[kind])
+        raise
+
+
+def _write(pending):
+    # Listings deleted since they were viewed are dropped; sorted ids keep
+    # concurrent flushes from different workers locking rows in one order
+    ids = sorted(Property.objects.filter(pk__in=_pending_ids(pending)).values_list('pk', flat=True))
+    for start in range(0, len(ids), FLUSH_CHUNK_SIZE):
+        chunk = ids[start:start + FLUSH_CHUNK_SIZE]
+        increments = {
+            kind: F(kind) + Case(
+                *[When(property_id=pk, then=Value(pending[kind][pk])) for pk in chunk if pending[kind][pk]],
+                default=Value(0),
+            )
+            for kind in KINDS
+            if any(pending[kind][pk] for pk in chunk)
+        }
+        with transaction.atomic():
+            PropertyViewCount.objects.bulk_create(
+                [PropertyViewCount(property_id=pk) for pk in chunk], ignore_conflicts=True,
+            )
+            PropertyViewCount.objects.filter(property_id__in=chunk).update(updated_at=timezone.now(), **increments)
+    return len(ids)
+
+
+def flush_if_due(**kwargs):
+    """request_finished receiver: flush when the interval or buffer size is reached."""
+    with _lock:
+        due = (
+            time.monotonic() - _last_flush >= settings.VIEW_COUNTS_FLUSH_INTERVAL
+            or len(_pending_ids(_pending)) >= settings.VIEW_COUNTS_MAX_PENDING
+        )
+    if due:
+        _flush_logging_errors()
+
+
+def _flush_logging_errors():
+    # A failed flush must not break the response; the counts stay buffered
+    try:
+        flush()
+    except DatabaseError:
+        logger.exception("Could not write listing view counts")
+
+
+atexit.register(_flush_logging_errors)
+
+
+class DetailViewCountMixin:
+    """Count GETs of a listing's detail page, including page-cache hits."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'GET':
+            record_views([kwargs['pk']])
+        return super().dispatch(request, *args, **kwargs)
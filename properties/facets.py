@@ -0,0 +1,54 @@
+# properties/facets.py
+
+"""
+Town dropdown options, cached per listings version so any Property change
+(which bumps the version) invalidates them along with the page cache.
+With the default locmem cache each worker keeps its own copy and never
+sees another worker's version bump, so entries only live as long as a
+cached page does there.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import get_listings_version
+from .models import Town
+from .towns import canonical_county
+
+TOWNS_CACHE_TIMEOUT = 60 * 60  # shared cache backends only
+
+
+def towns_cache_timeout():
+    return settings.PAGE_CACHE_TIMEOUT if settings.CACHE_BACKEND == 'locmem' else TOWNS_CACHE_TIMEOUT
+
+
+def _towns_key(county, version):
+    return f'facets:towns:{version}:{canonical_county(county).lower()}'
+
+
+def towns_for_county(county=''):
+    """Sorted canonical towns with listings in a county (all towns when county is empty)."""
+    key = _towns_key(county, get_listings_version())
+    towns = cache.get(key)
+    if towns is None:
+        queryset = Town.objects.filter(properties__isnull=False)
+        if county:
+            queryset = queryset.filter(county=canonical_county(county))
+        towns = sorted(set(queryset.values_list('name', flat=True)))
+        cache.set(key, towns, towns_cache_timeout())
+    return towns
+
+
+def prime_town_cache():
+    """Cache the towns of every county with listings, in one query. Returns the county count."""
+    version = get_listings_version()
+    by_county = defaultdict(set)
+    for county, town in Town.objects.filter(properties__isnull=False).values_list('county', 'name').distinct():
+        by_county[county.lower()].add(town)
+
+    entries = {_towns_key(county, version): sorted(towns) for county, towns in by_county.items()}
+    entries[_towns_key('', version)] = sorted(set().union(*by_county.values()))
+    cache.set_many(entries, towns_cache_timeout())
+    return len(by_county)
@@ -0,0 +1,71 @@
+# properties/filters.py
+from .towns import canonical_county, canonical_town_name, display_town_name
+
+# GET parameters understood by every browse/list view
+FILTER_PARAMS = ('q', 'min_rent', 'max_rent', 'county', 'town', 'location', 'house_type')
+
+
+def normalized_filter_spec(params, resolve_towns=False):
+    """
+    Reduce the browse filter GET parameters to a canonical, hashable spec:
+    a sorted tuple of (name, value) pairs with empty values dropped.
+
+    County and town are spelled the way Property.save stores them (see
+    properties/towns.py), so "nairobi cbd" and " Nairobi CBD " describe
+    the same search. Specs matched against listings by name (spec_matches:
+    saved searches, live streams) pass resolve_towns to also turn aliases
+    such as "Nrb Cbd" into the town's name, at the cost of a query.
+    """
+    spec = {}
+    for name in FILTER_PARAMS:
+        value = params.get(name, '').strip()
+        if not value:
+            continue
+        if name == 'county':
+            value = canonical_county(value)
+        elif name == 'town':
+            if resolve_towns:
+                value = canonical_town_name(value, spec.get('county', ''))
+            else:
+                value = display_town_name(value)
+        spec[name] = value
+    return tuple(sorted(spec.items()))
+
+
+def spec_matches(spec, property_obj):
+    """
+    Whether a property passes a normalized filter spec, with the same rules
+    as BrowsePropertiesView.get_queryset (availability is checked by callers).
+    """
+    spec = dict(spec)
+    q = spec.get('q', '').lower()
+    if q and not any(q in value.lower() for value in (
+        property_obj.description, property_obj.location, property_obj.house_type,
+    )):
+        return False
+    if spec.get('county') and spec['county'] != property_obj.county:
+        return False
+    if spec.get('town') and spec['town'] != property_obj.town:
+        return False
+    if spec.get('location') and spec['location'].lower() not in property_obj.location.lower():
+        return False
+    if spec.get('house_type') and spec['house_type'] != property_obj.house_type:
+        return False
+    min_rent, max_rent = spec_rent_range(spec)
+    if min_rent is not None and property_obj.rent < min_rent:
+        return False
+    if max_rent is not None and property_obj.rent > max_rent:
+        return False
+    return True
+
+
+def spec_rent_range(spec):
+    """(min_rent, max_rent) as ints, None where absent or not a number."""
+    spec = dict(spec)
+    bounds = []
+    for name in ('min_rent', 'max_rent'):
+        try:
+            bounds.append(int(spec[name]))
+        except (KeyError, ValueError):
+            bounds.append(None)
+    return tuple(bounds)
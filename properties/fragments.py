@@ -0,0 +1,52 @@
+# properties/fragments.py
+
+"""
+Partial-page responses for the browse and dashboard results.
+
+static/js/fragments.js sends filter changes and pagination clicks with an
+``X-Fragment: results`` header; views then render only their
+``fragment_template_name`` (the cards and pagination) and skip the
+page-only context such as dropdown options and dashboard totals. Other
+requests get the full page, which includes the same fragment template.
+"""
+
+from django.utils.cache import patch_vary_headers
+
+FRAGMENT_HEADER = 'X-Fragment'
+RESULTS_FRAGMENT = 'results'
+
+
+def is_fragment_request(request):
+    return request.headers.get(FRAGMENT_HEADER) == RESULTS_FRAGMENT
+
+
+class ResultsFragmentMixin:
+    """
+    For template views: ``get_page_context_data()`` supplies context only
+    the full page needs; fragment requests render ``fragment_template_name``
+    without it.
+    """
+    fragment_template_name = None
+
+    @property
+    def is_fragment(self):
+        return self.fragment_template_name is not None and is_fragment_request(self.request)
+
+    def get_template_names(self):
+        if self.is_fragment:
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def get_page_context_data(self):
+        return {}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if not self.is_fragment:
+            context.update(self.get_page_context_data())
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        patch_vary_headers(response, [FRAGMENT_HEADER])
+        return response
@@ -0,0 +1,220 @@
+# properties/live.py
+
+"""
+Live listing updates over Server-Sent Events.
+
+New listings, and listings back on the market, are published after commit
+(from the Property post_save receiver in models.py) to a broker: the
+LiveEvent table, whose auto-increment ids number the events across every
+worker, kept LIVE_EVENTS_TTL seconds. In each event loop one poller task
+reads new events every LIVE_EVENTS_POLL_INTERVAL seconds (one indexed range
+query) and hands them to the streams open there; each stream forwards only
+the listings matching its filter spec (spec_matches, as saved-search alerts
+use). So one query per interval serves every open stream, instead of every
+browser polling the browse page. Clients reconnecting with Last-Event-ID
+get the events they missed that are still in the table.
+
+Streams are served by async views only (ASYNC_VIEWS); under WSGI each one
+would hold a worker.
+"""
+
+import asyncio
+import json
+import weakref
+from types import SimpleNamespace
+
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+
+from .filters import spec_matches
+from .models import LiveEvent
+
+HEARTBEAT_INTERVAL = 15  # seconds between keep-alive comments
+RETRY_MS = 3000          # EventSource reconnect delay
+MAX_BACKLOG = 500        # events replayed to a reconnecting client at most
+QUEUE_SIZE = 100         # undelivered events per stream before it is closed
+GAP_TIMEOUT = 5          # seconds a missing event id is waited for
+
+
+def listing_event(property_obj):
+    return {
+        'id': property_obj.pk,
+        'house_type': property_obj.house_type,
+        'house_type_display': property_obj.get_house_type_display(),
+        'rent': property_obj.rent,
+        'county': property_obj.county,
+        'town': property_obj.town,
+        'location': property_obj.location,
+        'description': property_obj.description,
+        'url': reverse('properties:property_detail', args=[property_obj.pk]),
+    }
+
+
+def event_matches(spec, event):
+    return spec_matches(spec, SimpleNamespace(**event))
+
+
+# =========================
+# Broker (LiveEvent table)
+# =========================
+def _expiry():
+    return timezone.now() - timedelta(seconds=settings.LIVE_EVENTS_TTL)
+
+
+def publish(event):
+    """Append an event to the log; returns its id."""
+    LiveEvent.objects.filter(created_at__lt=_expiry()).delete()
+    return LiveEvent.objects.create(payload=event).pk
+
+
+def publish_listing(property_obj):
+    return publish(listing_event(property_obj))
+
+
+def latest_event_id():
+    return LiveEvent.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+def events_after(event_id):
+    """
+    [(id, event)] logged after ``event_id``, oldest first. An id is taken
+    before its row commits, so a concurrent publish can leave a gap that
+    fills in a moment later: the list stops at the gap until the events
+    after it are GAP_TIMEOUT old (the missing one was rolled back or expired).
+    """
+    now = timezone.now()
+    rows = (
+        LiveEvent.objects.filter(pk__gt=event_id, created_at__gte=_expiry())
+        .order_by('pk').values_list('pk', 'payload', 'created_at')[:MAX_BACKLOG]
+    )
+    events = []
+    expected = event_id + 1
+    for pk, payload, created_at in rows:
+        if pk != expected and now - created_at < timedelta(seconds=GAP_TIMEOUT):
+            break
+        events.append((pk, payload))
+        expected = pk + 1
+    return events
+
+
+# =========================
+# In-process fan-out
+# =========================
+class Subscription:
+    def __init__(self, spec):
+        self.spec = spec
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, event_id, event):
+        if not event_matches(self.spec, event):
+            return
+        try:
+            self.queue.put_nowait((event_id, event))
+        except asyncio.QueueFull:
+            # Too slow a reader: end the stream, it resumes from Last-Event-ID
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class Hub:
+    """The streams of one event loop and the task polling the broker for them."""
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.poller = None
+
+    def subscribe(self, spec):
+        subscription = Subscription(spec)
+        self.subscriptions.add(subscription)
+        if self.poller is None or self.poller.done():
+            self.poller = asyncio.get_running_loop().create_task(self.poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    async def poll(self):
+        last = await sync_to_async(latest_event_id)()
+        while self.subscriptions:
+            await asyncio.sleep(settings.LIVE_EVENTS_POLL_INTERVAL)
+            events = await sync_to_async(events_after)(last)
+            for event_id, event in events:
+                for subscription in list(self.subscriptions):
+                    subscription.deliver(event_id, event)
+            if events:
+                last = events[-1][0]
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = Hub()
+    return _hubs[loop]
+
+
+# =========================
+# SSE formatting and streams
+# =========================
+def format_event(event_id, event):
+    data = {key: value for key, value in event.items() if key != 'description'}
+    return f'id: {event_id}\nevent: listing\ndata: {json.dumps(data)}\n\n'
+
+
+def start_message(event_id):
+    # An id without data dispatches nothing but sets the browser's
+    # Last-Event-ID, so a reconnect resumes here even if no listing came
+    return f'retry: {RETRY_MS}\nid: {event_id}\n\n'
+
+
+def parse_event_id(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+async def stream_events(spec, last_event_id=None):
+    """Async SSE body: matching listings as they are published, for up to LIVE_STREAM_MAX_AGE."""
+    hub = get_hub()
+    subscription = hub.subscribe(spec)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.LIVE_STREAM_MAX_AGE
+    try:
+        if last_event_id is None:
+            sent = await sync_to_async(latest_event_id)()
+        else:
+            sent = last_event_id
+            for event_id, event in await sync_to_async(events_after)(last_event_id):
+                if event_matches(spec, event):
+                    yield format_event(event_id, event)
+                sent = event_id
+        yield start_message(sent)
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                item = await asyncio.wait_for(subscription.queue.get(), min(HEARTBEAT_INTERVAL, remaining))
+            except TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if item is None:
+                break
+            event_id, event = item
+            if event_id > sent:  # already replayed otherwise
+                yield format_event(event_id, event)
+                sent = event_id
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: pass events through unbuffered
+    return response
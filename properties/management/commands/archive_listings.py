@@ -0,0 +1,44 @@
+# properties/management/commands/archive_listings.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from properties.archive import DEFAULT_BATCH_SIZE, archive_candidates, archive_properties, stamp_unavailable
+
+
+class Command(BaseCommand):
+    help = (
+        "Move listings that have been unavailable for ARCHIVE_AFTER_DAYS out of the "
+        "Property table into the archive tables, one transaction per batch. Run daily; "
+        "an interrupted run simply continues on the next one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help="Archive listings unavailable for at least this many days")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Listings per transaction")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the listings due")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        stamped = stamp_unavailable()
+        if stamped:
+            self.stdout.write(f"Started the clock for {stamped} unavailable listing(s).")
+
+        candidates = archive_candidates(options['days']).order_by('pk').values_list('pk', flat=True)
+        if options['dry_run']:
+            self.stdout.write(f"{candidates.count()} listing(s) are due for archiving.")
+            return
+
+        archived = 0
+        last_pk = 0
+        while True:
+            # Keyset batches over the (available, unavailable_since) index
+            batch = list(candidates.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            archived += archive_properties(batch)
+            last_pk = batch[-1]
+        self.stdout.write(f"Archived {archived} listing(s) in {time.perf_counter() - start:.2f}s.")
@@ -0,0 +1,29 @@
+# properties/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+
+from properties.models import SEARCH_TEXT_FIELDS, Property
+from properties.search import index_properties
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the fuzzy-search trigram index for every listing, in chunks. "
+        "Needed once after installing; saves keep it current afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Listings per transaction")
+
+    def handle(self, *args, **options):
+        listings = Property.objects.only('pk', *SEARCH_TEXT_FIELDS).order_by('pk')
+        last_pk = 0
+        indexed = rows = 0
+        while True:
+            chunk = list(listings.filter(pk__gt=last_pk)[:options['chunk_size']])
+            if not chunk:
+                break
+            rows += index_properties(chunk)
+            indexed += len(chunk)
+            last_pk = chunk[-1].pk
+        self.stdout.write(f"Indexed {indexed} listing(s) ({rows} trigram rows).")
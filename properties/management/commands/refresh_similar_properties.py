@@ -0,0 +1,36 @@
+# properties/management/commands/refresh_similar_properties.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from properties.recommendations import BATCH_SIZE, DEFAULT_K, refresh_similar_properties
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the 'Similar properties' shown on detail pages. By default only "
+        "listings affected by changes since the last run are refreshed; run with "
+        "--full nightly (or after bulk imports), and with --interval as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recompute every listing")
+        parser.add_argument('--k', type=int, default=DEFAULT_K, help="Neighbours stored per listing")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Listings per matrix product")
+        parser.add_argument('--interval', type=int, default=0, help="Keep polling every N seconds")
+
+    def handle(self, *args, **options):
+        full = options['full']
+        while True:
+            start = time.perf_counter()
+            refreshed = refresh_similar_properties(full=full, k=options['k'], batch_size=options['batch_size'])
+            if refreshed or full:
+                self.stdout.write(
+                    f"Refreshed neighbours of {refreshed} listing(s) in {time.perf_counter() - start:.2f}s."
+                )
+
+            if not options['interval']:
+                break
+            full = False
+            time.sleep(options['interval'])
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_similarproperty'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyViewCount',
+            fields=[
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='view_count', serialize=False, to='properties.property')),
+                ('detail_views', models.PositiveBigIntegerField(default=0)),
+                ('card_views', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_propertyviewcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('field', models.CharField(choices=[('t', 'Description and house type'), ('l', 'Location')], max_length=1)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('trigram', 'field', 'property'), name='unique_property_trigram')],
+            },
+        ),
+    ]
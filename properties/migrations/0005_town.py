@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0004_propertytrigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Town',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('county', models.CharField(max_length=255)),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=255)),
+            ],
+            options={
+                'ordering': ['county', 'name'],
+                'constraints': [models.UniqueConstraint(fields=('county', 'key'), name='unique_town_per_county')],
+            },
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='town_ref',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='properties', to='properties.town'),
+        ),
+        migrations.CreateModel(
+            name='TownAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('county', models.CharField(editable=False, max_length=255)),
+                ('key', models.CharField(max_length=255)),
+                ('town', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='properties.town')),
+            ],
+            options={
+                'verbose_name_plural': 'town aliases',
+                'constraints': [models.UniqueConstraint(fields=('county', 'key'), name='unique_town_alias_per_county')],
+            },
+        ),
+    ]
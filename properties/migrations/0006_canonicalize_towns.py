@@ -0,0 +1,130 @@
+import re
+
+from django.db import migrations
+from django.db.models import Count
+
+CHUNK_SIZE = 1000
+
+# Frozen copies of properties.constants / properties.towns / properties.filters
+# as of this migration, so later changes to them cannot change what it does
+
+KENYA_COUNTIES = [
+    "Baringo", "Bomet", "Bungoma", "Busia", "Elgeyo-Marakwet", "Embu",
+    "Garissa", "Homa Bay", "Isiolo", "Kajiado", "Kakamega", "Kericho",
+    "Kiambu", "Kilifi", "Kirinyaga", "Kisii", "Kisumu", "Kitui", "Kwale",
+    "Laikipia", "Lamu", "Machakos", "Makueni", "Mandera", "Marsabit",
+    "Meru", "Migori", "Mombasa", "Murang'a", "Nairobi", "Nakuru", "Nandi",
+    "Narok", "Nyamira", "Nyandarua", "Nyeri", "Samburu", "Siaya",
+    "Taita-Taveta", "Tana River", "Tharaka-Nithi", "Trans-Nzoia", "Turkana",
+    "Uasin Gishu", "Vihiga", "Wajir", "West Pokot",
+]
+COUNTIES = {county.lower(): county for county in KENYA_COUNTIES}
+NON_WORD_RE = re.compile(r'[^\w]+')
+ACRONYMS = {'cbd'}
+FILTER_PARAMS = ('q', 'min_rent', 'max_rent', 'county', 'town', 'location', 'house_type')
+
+# Common spellings folded into one town when that town has listings
+SEED_ALIASES = {
+    ('Nairobi', 'nairobi cbd'): ('nrb cbd', 'cbd', 'nairobi town', 'town centre'),
+}
+
+
+def town_key(name):
+    return NON_WORD_RE.sub(' ', name.lower()).strip()
+
+
+def display_part(part):
+    return part.upper() if part.lower() in ACRONYMS else part[:1].upper() + part[1:].lower()
+
+
+def display_town_name(name):
+    return ' '.join('-'.join(map(display_part, word.split('-'))) for word in name.split())
+
+
+def canonical_county(name):
+    name = ' '.join(name.split())
+    return COUNTIES.get(name.lower(), name.title())
+
+
+def canonical_town_name(name, county, town_names):
+    """The name of the town (in ``county``, or in any county) a spelling refers to."""
+    names_by_county = town_names.get(town_key(name), {})
+    if county:
+        names = {names_by_county[county]} if county in names_by_county else set()
+    else:
+        names = set(names_by_county.values())
+    return names.pop() if len(names) == 1 else display_town_name(name)
+
+
+def canonicalize_towns(apps, schema_editor):
+    Property = apps.get_model('properties', 'Property')
+    Town = apps.get_model('properties', 'Town')
+    TownAlias = apps.get_model('properties', 'TownAlias')
+    SavedSearch = apps.get_model('tenants', 'SavedSearch')
+
+    # One town per (county, key); the most used spelling names it
+    spellings = {}
+    rows = Property.objects.values_list('county', 'town').annotate(n=Count('pk')).order_by('-n')
+    for county, town, _ in rows:
+        county = canonical_county(county)
+        spellings.setdefault((county, town_key(town)), town)
+
+    alias_of = {}
+    for (county, key), alias_keys in SEED_ALIASES.items():
+        if (county, key) in spellings:
+            for alias_key in alias_keys:
+                alias_of[county, alias_key] = key
+
+    towns = {}
+    for (county, key), spelling in spellings.items():
+        if (county, key) not in alias_of:
+            towns[county, key] = Town.objects.create(county=county, key=key, name=display_town_name(spelling))
+    for (county, alias_key), key in alias_of.items():
+        TownAlias.objects.create(town=towns[county, key], county=county, key=alias_key)
+
+    last_pk = 0
+    while True:
+        chunk = list(Property.objects.filter(pk__gt=last_pk).order_by('pk').only('county', 'town')[:CHUNK_SIZE])
+        if not chunk:
+            break
+        for property_obj in chunk:
+            county = canonical_county(property_obj.county)
+            key = town_key(property_obj.town)
+            town = towns[county, alias_of.get((county, key), key)]
+            property_obj.county, property_obj.town, property_obj.town_ref = county, town.name, town
+        Property.objects.bulk_update(chunk, ['county', 'town', 'town_ref'])
+        last_pk = chunk[-1].pk
+
+    # Saved searches compare against the canonical spellings, aliases included
+    town_names = {}
+    for (county, key), town in towns.items():
+        town_names.setdefault(key, {})[county] = town.name
+    for (county, alias_key), key in alias_of.items():
+        town_names.setdefault(alias_key, {})[county] = towns[county, key].name
+    for search in SavedSearch.objects.all():
+        spec = {}
+        for name in FILTER_PARAMS:
+            value = search.spec.get(name, '').strip()
+            if not value:
+                continue
+            if name == 'county':
+                value = canonical_county(value)
+            elif name == 'town':
+                value = canonical_town_name(value, spec.get('county', ''), town_names)
+            spec[name] = value
+        search.spec = spec
+        search.county = search.spec.get('county', '')
+        search.town = search.spec.get('town', '')
+        search.save(update_fields=['spec', 'county', 'town'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_town'),
+        ('tenants', '0002_savedsearch'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_towns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landlords', '0002_initial'),
+        ('properties', '0008_imageupload'),
+        ('tenants', '0003_viewingrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedFavorite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedProperty',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('house_type', models.CharField(choices=[('single', 'Single Room'), ('bedsitter', 'Bedsitter'), ('1BR', 'One Bedroom'), ('2BR', 'Two Bedroom'), ('3BR', 'Three Bedroom'), ('shared', 'Shared Unit')], max_length=50)),
+                ('house_number', models.CharField(max_length=20)),
+                ('rent', models.IntegerField()),
+                ('county', models.CharField(max_length=255)),
+                ('town', models.CharField(max_length=255)),
+                ('location', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('unavailable_since', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('detail_views', models.PositiveBigIntegerField(default=0)),
+                ('card_views', models.PositiveBigIntegerField(default=0)),
+                ('viewing_requests', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'verbose_name_plural': 'archived properties',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPropertyImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(upload_to='property_photos/')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='unavailable_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['available', 'unavailable_since'], name='property_unavailable_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedfavorite',
+            name='landlord',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='landlords.landlordprofile'),
+        ),
+        migrations.AddField(
+            model_name='archivedfavorite',
+            name='tenant',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tenants.tenantprofile'),
+        ),
+        migrations.AddField(
+            model_name='archivedproperty',
+            name='landlord',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_properties', to='landlords.landlordprofile'),
+        ),
+        migrations.AddField(
+            model_name='archivedfavorite',
+            name='property',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorites', to='properties.archivedproperty'),
+        ),
+        migrations.AddField(
+            model_name='archivedpropertyimage',
+            name='property',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='properties.archivedproperty'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedproperty',
+            index=models.Index(fields=['landlord', '-archived_at'], name='archived_property_landlord_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_original_ids(apps, schema_editor):
+    ArchivedProperty = apps.get_model('properties', 'ArchivedProperty')
+    ArchivedProperty.objects.update(original_id=F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_liveevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedproperty',
+            name='original_id',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(copy_original_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archivedproperty',
+            name='original_id',
+            field=models.BigIntegerField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedproperty',
+            name='id',
+            field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID'),
+        ),
+    ]
@@ -1,5 +1,91 @@
 # properties/models.py
-from django.db import models
+import uuid
+
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .cache import bump_listings_version
+from .towns import canonical_county, get_or_create_town, town_key
+
+# Fields indexed for fuzzy search (properties/search.py)
+SEARCH_TEXT_FIELDS = ('description', 'house_type', 'location')
+
+
+class PropertyQuerySet(models.QuerySet):
+    def with_cover_image(self):
+        """
+        Annotate each property with its first image (cover_image) and
+        image_count, so card pages need neither the images rows nor a
+        per-card COUNT. The remaining images are fetched on demand.
+        """
+        images = PropertyImage.objects.filter(property=OuterRef('pk'))
+        return self.annotate(
+            cover_image=Subquery(images.order_by('pk').values('image')[:1]),
+            image_count=Coalesce(
+                Subquery(images.order_by().values('property').annotate(n=Count('pk')).values('n')),
+                0,
+            ),
+        )
+
+    def similar_to(self, property_obj):
+        """
+        Available precomputed neighbours of a listing, best first, in one
+        query through the (property, rank) index of SimilarProperty.
+        """
+        return (
+            self.filter(similar_to__property=property_obj, available=True)
+            .with_cover_image()
+            .order_by('similar_to__rank')
+        )
+
+    def with_view_counts(self):
+        """Annotate detail_views and card_views (0 for never-viewed listings)."""
+        return self.annotate(
+            detail_views=Coalesce('view_count__detail_views', 0),
+            card_views=Coalesce('view_count__card_views', 0),
+        )
+
+
+class Town(models.Model):
+    """A canonical town within a county (see properties/towns.py)."""
+    county = models.CharField(max_length=255)
+    name = models.CharField(max_length=255)  # display name
+    key = models.CharField(max_length=255)   # town_key(name): what spellings are matched on
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['county', 'key'], name='unique_town_per_county'),
+        ]
+        ordering = ['county', 'name']
+
+    def __str__(self):
+        return f"{self.name}, {self.county}"
+
+
+class TownAlias(models.Model):
+    """Another spelling of a town, e.g. "Nrb Cbd" for Nairobi CBD."""
+    town = models.ForeignKey(Town, on_delete=models.CASCADE, related_name='aliases')
+    county = models.CharField(max_length=255, editable=False)  # copied from town, scopes the key
+    key = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['county', 'key'], name='unique_town_alias_per_county'),
+        ]
+        verbose_name_plural = 'town aliases'
+
+    def __str__(self):
+        return f"{self.key} → {self.town}"
+
+    def save(self, *args, **kwargs):
+        self.county = self.town.county
+        self.key = town_key(self.key)
+        super().save(*args, **kwargs)
+
 
 class Property(models.Model):
     HOUSE_TYPE = [
@@ -17,16 +103,39 @@ class Property(models.Model):
     rent = models.IntegerField()
 
     county = models.CharField(max_length=255)
-    town = models.CharField(max_length=255)
+    town = models.CharField(max_length=255)  # canonical name, kept in step with town_ref
+    town_ref = models.ForeignKey(Town, on_delete=models.PROTECT, null=True, editable=False, related_name='properties')
     location = models.CharField(max_length=255)
 
     description = models.TextField(blank=True)
     available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # When the listing last went off the market; archive_listings moves it
+    # out of this table ARCHIVE_AFTER_DAYS later (properties/archive.py)
+    unavailable_since = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = PropertyQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Availability as loaded, so post_save receivers can tell when a
+        # listing comes back on the market (None if the field was deferred)
+        instance._loaded_available = instance.__dict__.get('available')
+        # Searchable text as loaded, so unchanged listings are not reindexed
+        instance._loaded_search_text = tuple(instance.__dict__.get(name) for name in SEARCH_TEXT_FIELDS)
+        return instance
 
     def save(self, *args, **kwargs):
-        self.county = self.county.strip().title()  # e.g., " nairobi " → "Nairobi"
-        self.town = self.town.strip().title()
+        self.county = canonical_county(self.county)  # e.g., " nairobi " → "Nairobi"
+        # "Nairobi Cbd", "nrb cbd" (alias) → Nairobi CBD
+        if self.town_ref is None or (self.town_ref.county, self.town_ref.name) != (self.county, self.town):
+            self.town_ref = get_or_create_town(self.county, self.town)
+        self.town = self.town_ref.name
+        if self.available:
+            self.unavailable_since = None
+        elif self.unavailable_since is None:
+            self.unavailable_since = timezone.now()
         super().save(*args, **kwargs)
     class Meta:
         permissions = [
@@ -34,10 +143,23 @@ class Property(models.Model):
             ("can_edit_property", "Can edit any property"),
             ("can_delete_property", "Can delete property"),
         ]
+        # Prefix searches and the county filter of the admin changelist
+        indexes = [
+            models.Index(fields=['house_number'], name='property_house_number_idx'),
+            models.Index(fields=['location'], name='property_location_idx'),
+            models.Index(fields=['county'], name='property_county_idx'),
+            # Listings due for archiving
+            models.Index(fields=['available', 'unavailable_since'], name='property_unavailable_idx'),
+        ]
         
     def __str__(self):
         return f"{self.house_type} - {self.house_number}"
 
+    @property
+    def cover_image_url(self):
+        # Only set on querysets built with with_cover_image()
+        return property_image_url(getattr(self, 'cover_image', None))
+
 # New model for images
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, 
@@ -46,4 +168,193 @@ class PropertyImage(models.Model):
     image = models.ImageField(upload_to='property_photos/')
     
     def __str__(self):
-        return f"Image for {self.property.house_number}"
\ No newline at end of file
+        return f"Image for {self.property.house_number}"
+
+
+class ImageUpload(models.Model):
+    """A photo being uploaded in chunks (properties/uploads.py)."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    # Attached on completion if set, else when the property form is submitted
+    property = models.ForeignKey(Property, null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=50, blank=True)  # sniffed from the first chunk
+    size = models.PositiveIntegerField()
+    received = models.PositiveIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+class SimilarProperty(models.Model):
+    """Precomputed nearest neighbours of a listing (properties/recommendations.py)."""
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='similar_entries')
+    similar = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='similar_to')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'rank'], name='unique_similar_property_rank'),
+        ]
+
+
+class PropertyViewCount(models.Model):
+    """
+    View totals kept off the hot Property table; written in batches by
+    properties/counters.py, so they lag by up to VIEW_COUNTS_FLUSH_INTERVAL.
+    """
+    property = models.OneToOneField(Property, on_delete=models.CASCADE, primary_key=True, related_name='view_count')
+    detail_views = models.PositiveBigIntegerField(default=0)  # detail page loads
+    card_views = models.PositiveBigIntegerField(default=0)    # cards seen on the browse page
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class PropertyTrigram(models.Model):
+    """Inverted trigram -> listing index for fuzzy search (properties/search.py)."""
+    TEXT = 't'
+    LOCATION = 'l'
+    FIELD_CHOICES = [
+        (TEXT, 'Description and house type'),
+        (LOCATION, 'Location'),
+    ]
+
+    trigram = models.CharField(max_length=3)
+    field = models.CharField(max_length=1, choices=FIELD_CHOICES)
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        constraints = [
+            # Also the lookup index: trigram -> field -> listings
+            models.UniqueConstraint(fields=['trigram', 'field', 'property'], name='unique_property_trigram'),
+        ]
+
+
+class LiveEvent(models.Model):
+    """
+    A published listing for live streams (properties/live.py). The table's
+    auto-increment numbers events across every worker; rows older than
+    LIVE_EVENTS_TTL are deleted as new ones are published.
+    """
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class SimilarityRefreshQueue(models.Model):
+    """Listings whose neighbours must be recomputed by refresh_similar_properties."""
+    # Not a foreign key: deleted listings stay queued so they are dropped
+    # from other listings' neighbours
+    property_id = models.BigIntegerField(unique=True)
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def enqueue(cls, property_ids):
+        """
+        Queue listings for a refresh. Listings already queued get a new
+        queued_at, so a refresh that read them before this keeps them queued.
+        """
+        features = connections[router.db_for_write(cls)].features
+        cls.objects.bulk_create(
+            [cls(property_id=pk) for pk in property_ids],
+            update_conflicts=True, update_fields=['queued_at'],
+            # MySQL upserts on any unique key and takes no conflict target
+            unique_fields=['property_id'] if features.supports_update_conflicts_with_target else None,
+        )
+
+
+# =========================
+# Archived listings (properties/archive.py)
+# =========================
+class ArchivedProperty(models.Model):
+    """
+    A listing moved out of Property by archive_listings after being off the
+    market for ARCHIVE_AFTER_DAYS. Keeps the listing's id, fields, view
+    totals and viewing requests so its landlord can restore it as it was.
+    """
+    # The listing's id in Property. Not the primary key: MySQL may hand a
+    # freed id out again, and that listing can be archived in turn.
+    original_id = models.BigIntegerField(db_index=True)
+    landlord = models.ForeignKey('landlords.LandlordProfile', on_delete=models.CASCADE, related_name='archived_properties')
+    house_type = models.CharField(max_length=50, choices=Property.HOUSE_TYPE)
+    house_number = models.CharField(max_length=20)
+    rent = models.IntegerField()
+    county = models.CharField(max_length=255)
+    town = models.CharField(max_length=255)
+    location = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    unavailable_since = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    detail_views = models.PositiveBigIntegerField(default=0)
+    card_views = models.PositiveBigIntegerField(default=0)
+    # Rows of tenants.ViewingRequest, as dicts (see archive.viewing_request_row)
+    viewing_requests = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['landlord', '-archived_at'], name='archived_property_landlord_idx'),
+        ]
+        verbose_name_plural = 'archived properties'
+
+    def __str__(self):
+        return f"{self.house_type} - {self.house_number} (archived)"
+
+    @property
+    def cover_image_url(self):
+        # Only set on querysets annotated with cover_image
+        return property_image_url(getattr(self, 'cover_image', None))
+
+
+class ArchivedPropertyImage(models.Model):
+    """A PropertyImage of an archived listing; the file stays where it was."""
+    property = models.ForeignKey(ArchivedProperty, on_delete=models.CASCADE, related_name='images')
+    image = models.ImageField(upload_to='property_photos/')
+
+
+class ArchivedFavorite(models.Model):
+    """A tenant's or landlord's favorite of an archived listing."""
+    property = models.ForeignKey(ArchivedProperty, on_delete=models.CASCADE, related_name='favorites')
+    tenant = models.ForeignKey('tenants.TenantProfile', null=True, on_delete=models.CASCADE, related_name='+')
+    landlord = models.ForeignKey('landlords.LandlordProfile', null=True, on_delete=models.CASCADE, related_name='+')
+
+
+def property_image_url(name):
+    """URL for a stored image name (e.g. from values_list) without loading the row."""
+    return PropertyImage._meta.get_field('image').storage.url(name) if name else ''
+
+# Any listing change invalidates the cached anonymous browse/detail pages
+@receiver([post_save, post_delete], sender=Property)
+@receiver([post_save, post_delete], sender=PropertyImage)
+def bump_listings_cache_version(sender, **kwargs):
+    bump_listings_version()
+
+
+# Saved or deleted listings get their "similar properties" recomputed
+@receiver([post_save, post_delete], sender=Property)
+def queue_similarity_refresh(sender, instance, raw=False, **kwargs):
+    if not raw:
+        SimilarityRefreshQueue.enqueue([instance.pk])
+
+
+# New or edited listing text is reindexed for fuzzy search
+@receiver(post_save, sender=Property)
+def index_search_trigrams(sender, instance, created, raw=False, **kwargs):
+    text = tuple(getattr(instance, name) for name in SEARCH_TEXT_FIELDS)
+    if not raw and (created or getattr(instance, '_loaded_search_text', None) != text):
+        from .search import index_properties
+
+        transaction.on_commit(lambda: index_properties([instance]))
+    instance._loaded_search_text = text
+
+
+# New listings, and listings back on the market, go out to live streams.
+# Runs before tenants.models.match_new_listing, which resets _loaded_available.
+@receiver(post_save, sender=Property)
+def publish_live_listing(sender, instance, created, raw=False, **kwargs):
+    came_back = getattr(instance, '_loaded_available', None) is False
+    if instance.available and not raw and (created or came_back):
+        from .live import publish_listing
+
+        transaction.on_commit(lambda: publish_listing(instance))
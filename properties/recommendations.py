@@ -0,0 +1,196 @@
+# properties/recommendations.py
+
+"""
+"Similar properties" for the detail page.
+
+Every available listing is encoded as one dense float32 row made of
+L2-normalized blocks, each scaled by the square root of its weight, so a
+single dot product between two rows is the weighted sum of the per-block
+cosine similarities:
+
+- house type: one-hot
+- rent: log(rent) spread over fixed Gaussian bins, so nearby rents overlap
+- county and town: hashed one-hot (town hashed together with its county)
+- description: TF-IDF over a hashed vocabulary
+
+Hashing keeps the feature layout fixed as new towns and words appear, so
+neighbours can be refreshed incrementally. Top-K neighbours come from
+batched matrix products and are stored in SimilarProperty; the detail page
+reads them with one indexed query (PropertyQuerySet.similar_to).
+"""
+
+import math
+import re
+import zlib
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Min
+
+from .cache import bump_listings_version
+from .models import Property, SimilarityRefreshQueue, SimilarProperty
+
+DEFAULT_K = 6
+BATCH_SIZE = 512  # rows per matrix product, bounds memory at BATCH_SIZE x listings
+
+COUNTY_DIMS = 64
+TOWN_DIMS = 128
+TEXT_DIMS = 512
+RENT_CENTERS = np.linspace(math.log(1_000), math.log(500_000), 16)
+RENT_SIGMA = RENT_CENTERS[1] - RENT_CENTERS[0]
+
+WEIGHTS = {
+    'house_type': 0.25,
+    'rent': 0.25,
+    'county': 0.10,
+    'town': 0.20,
+    'text': 0.20,
+}
+
+HOUSE_TYPES = [code for code, _ in Property.HOUSE_TYPE]
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+FEATURE_FIELDS = ('pk', 'house_type', 'rent', 'county', 'town', 'description')
+
+
+def _bucket(value, dims):
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(value.encode()) % dims
+
+
+def _normalize_rows(block):
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return np.divide(block, norms, out=np.zeros_like(block), where=norms > 0)
+
+
+def encode(rows):
+    """
+    Encode (pk, house_type, rent, county, town, description) rows.
+    Returns (pk array, float32 matrix with one row per listing).
+    """
+    n = len(rows)
+    house = np.zeros((n, len(HOUSE_TYPES)), np.float32)
+    county = np.zeros((n, COUNTY_DIMS), np.float32)
+    town = np.zeros((n, TOWN_DIMS), np.float32)
+    text = np.zeros((n, TEXT_DIMS), np.float32)
+    log_rent = np.zeros(n, np.float32)
+
+    for i, (_, house_type, rent, county_name, town_name, description) in enumerate(rows):
+        if house_type in HOUSE_TYPES:
+            house[i, HOUSE_TYPES.index(house_type)] = 1
+        log_rent[i] = math.log1p(max(rent, 0))
+        county[i, _bucket(county_name.lower(), COUNTY_DIMS)] = 1
+        town[i, _bucket(f'{county_name}/{town_name}'.lower(), TOWN_DIMS)] = 1
+        for token in TOKEN_RE.findall(description.lower()):
+            text[i, _bucket(token, TEXT_DIMS)] += 1
+
+    rent = np.exp(-((log_rent[:, None] - RENT_CENTERS[None, :]) ** 2) / (2 * RENT_SIGMA ** 2))
+    document_frequency = np.count_nonzero(text, axis=0)
+    text *= np.log((1 + n) / (1 + document_frequency)) + 1
+
+    blocks = {'house_type': house, 'rent': rent, 'county': county, 'town': town, 'text': text}
+    matrix = np.hstack([
+        _normalize_rows(block.astype(np.float32)) * np.float32(math.sqrt(WEIGHTS[name]))
+        for name, block in blocks.items()
+    ])
+    return np.array([row[0] for row in rows], dtype=np.int64), matrix
+
+
+def top_neighbours(matrix, rows, k):
+    """
+    For each row index in ``rows``, the indices and scores of its k most
+    similar other rows, best first, from one (len(rows) x n) product.
+    """
+    rows = np.asarray(rows)
+    k = min(k, matrix.shape[0] - 1)
+    if k <= 0 or not len(rows):
+        return np.empty((len(rows), 0), np.int64), np.empty((len(rows), 0), np.float32)
+
+    scores = matrix[rows] @ matrix.T
+    scores[np.arange(len(rows)), rows] = -np.inf  # never recommend a listing to itself
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def _rows_to_refresh(ids, matrix, queued, k, batch_size=BATCH_SIZE):
+    """
+    Row indices whose stored neighbours may have changed because of the
+    queued listings: the queued listings themselves, listings that list a
+    queued one, and listings a queued one now beats the weakest stored
+    neighbour of.
+    """
+    index = {pk: i for i, pk in enumerate(ids.tolist())}
+    dirty = [index[pk] for pk in queued if pk in index]
+    targets = set(dirty)
+    listing_queued = SimilarProperty.objects.filter(similar_id__in=queued).values_list('property_id', flat=True)
+    targets.update(index[pk] for pk in listing_queued.distinct() if pk in index)
+
+    if dirty:
+        # Best score any queued listing gets against each row, a batch at a time
+        best = np.full(len(ids), -np.inf, np.float32)
+        for start in range(0, len(dirty), batch_size):
+            batch = dirty[start:start + batch_size]
+            scores = matrix[batch] @ matrix.T
+            scores[np.arange(len(batch)), batch] = -np.inf
+            np.maximum(best, scores.max(axis=0), out=best)
+        # Listings with fewer than k stored neighbours take any newcomer
+        weakest = np.full(len(ids), -np.inf, np.float32)
+        for property_id, score in (
+            SimilarProperty.objects.values('property_id')
+            .annotate(weakest=Min('score'), stored=Count('pk'))
+            .filter(stored__gte=k)
+            .values_list('property_id', 'weakest')
+        ):
+            if property_id in index:
+                weakest[index[property_id]] = score
+        targets.update(np.flatnonzero(best > weakest).tolist())
+
+    return sorted(targets)
+
+
+def refresh_similar_properties(full=False, k=DEFAULT_K, batch_size=BATCH_SIZE):
+    """
+    Recompute stored neighbours: every listing when ``full``, otherwise
+    only those affected by SimilarityRefreshQueue entries. IDF weights drift
+    slightly as listings change, so run a full refresh now and then.
+    Returns the number of listings whose neighbours were rewritten.
+    """
+    entries = list(SimilarityRefreshQueue.objects.values_list('pk', 'property_id', 'queued_at'))
+    queued = {property_id for _, property_id, _ in entries}
+    if not full and not queued:
+        return 0
+
+    rows = list(Property.objects.filter(available=True).order_by('pk').values_list(*FEATURE_FIELDS))
+    ids, matrix = encode(rows)
+    targets = list(range(len(ids))) if full else _rows_to_refresh(ids, matrix, queued, k, batch_size)
+
+    with transaction.atomic():
+        if full:
+            SimilarProperty.objects.all().delete()
+        else:
+            # Rewritten lists, and lists of queued listings no longer available
+            stale = set(ids[targets].tolist()) | queued
+            SimilarProperty.objects.filter(property_id__in=stale).delete()
+
+        for start in range(0, len(targets), batch_size):
+            batch = targets[start:start + batch_size]
+            neighbours, scores = top_neighbours(matrix, batch, k)
+            SimilarProperty.objects.bulk_create([
+                SimilarProperty(property_id=int(ids[row]), similar_id=int(ids[n]), rank=rank, score=float(s))
+                for row, row_neighbours, row_scores in zip(batch, neighbours, scores)
+                for rank, (n, s) in enumerate(zip(row_neighbours, row_scores))
+            ], batch_size=1000)
+
+        # Entries queued again since they were read carry a later queued_at
+        # and wait for the next run
+        if entries:
+            read_up_to = max(queued_at for _, _, queued_at in entries)
+            pks = [pk for pk, _, _ in entries]
+            for start in range(0, len(pks), 1000):
+                SimilarityRefreshQueue.objects.filter(
+                    pk__in=pks[start:start + 1000], queued_at__lte=read_up_to,
+                ).delete()
+
+    bump_listings_version()  # cached detail pages render the neighbours
+    return len(targets)
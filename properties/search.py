@@ -0,0 +1,170 @@
+# properties/search.py
+
+"""
+Typo-tolerant listing search ("Kilimni" finds Kilimani, "Westland" finds
+Westlands).
+
+Listing text is split into words and each word into padded trigrams
+("kil" -> $$k, $ki, kil, il$), stored in PropertyTrigram as an inverted
+trigram -> listing index, maintained from the Property post_save signal.
+
+A fuzzy lookup first asks the database for listings sharing enough of the
+query's trigrams (an index range scan per trigram plus GROUP BY), which
+prunes millions of listings to the CANDIDATE_LIMIT best candidates, then
+scores only those exactly: the best trigram similarity between the query
+and any run of as many consecutive words in the listing, as pg_trgm's
+word_similarity does.
+
+Words are case- and accent-folded ("Café" -> cafe) before they are split,
+as MySQL's default utf8mb4_0900_ai_ci collation compares them: otherwise
+"afe" and "afé" would be two trigrams to Python but one to the unique
+constraint.
+"""
+
+import math
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from .models import PropertyTrigram
+
+# q searches description, house type and location; location only location
+TEXT_FIELDS = {
+    PropertyTrigram.TEXT: ('description', 'house_type'),
+    PropertyTrigram.LOCATION: ('location',),
+}
+Q_FIELDS = (PropertyTrigram.TEXT, PropertyTrigram.LOCATION)
+LOCATION_FIELDS = (PropertyTrigram.LOCATION,)
+
+SIMILARITY_THRESHOLD = 0.4
+CANDIDATE_LIMIT = 300
+FILTER_CHUNK_SIZE = 5000  # ids per IN list when filtering candidates
+PAD = '$'  # never part of a word, and unlike spaces not ignored by MySQL comparisons
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def fold(text):
+    """Case- and accent-folded text: "Café" -> "cafe"."""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def words(text):
+    return WORD_RE.findall(fold(text))
+
+
+@lru_cache(maxsize=100_000)
+def word_trigrams(word):
+    padded = f'{PAD}{PAD}{word}{PAD}'
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def trigrams(text):
+    return frozenset().union(*map(word_trigrams, words(text)))
+
+
+def similarity(a, b):
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+def word_similarity(query, text):
+    """Best similarity between the query and any run of len(query words) words of text."""
+    query_words = words(query)
+    text_words = words(text)
+    if not query_words or not text_words:
+        return 0.0
+    query_trigrams = trigrams(query)
+    size = len(query_words)
+    return max(
+        similarity(query_trigrams, frozenset().union(*map(word_trigrams, text_words[i:i + size])))
+        for i in range(max(1, len(text_words) - size + 1))
+    )
+
+
+# =========================
+# Index maintenance
+# =========================
+def field_text(property_obj, field):
+    return ' '.join(getattr(property_obj, name) or '' for name in TEXT_FIELDS[field])
+
+
+def index_properties(properties):
+    """(Re)write the trigram rows of the given listings."""
+    properties = list(properties)
+    rows = [
+        PropertyTrigram(trigram=trigram, field=field, property_id=property_obj.pk)
+        for property_obj in properties
+        for field in TEXT_FIELDS
+        for trigram in trigrams(field_text(property_obj, field))
+    ]
+    with transaction.atomic():
+        PropertyTrigram.objects.filter(property_id__in=[p.pk for p in properties]).delete()
+        # Folding covers accents and case; any other collation equivalence is
+        # one trigram to the database and needs storing only once
+        PropertyTrigram.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return len(rows)
+
+
+# =========================
+# Fuzzy lookup
+# =========================
+def fuzzy_matches(query, fields, queryset, threshold=SIMILARITY_THRESHOLD):
+    """
+    [(property_id, score)] best first for listings in ``queryset`` whose
+    ``fields`` text resembles ``query``.
+    """
+    query_trigrams = trigrams(query)
+    if not query_trigrams:
+        return []
+
+    # A run of words scoring >= threshold shares at least threshold * |query|
+    # trigrams with the query, so listings sharing fewer are never scored.
+    # Pruning reads the trigram index alone (joining the browse filters in
+    # makes the database drive it from the listings instead); the filters are
+    # applied to the ranked candidates a window at a time, widening until
+    # CANDIDATE_LIMIT listings pass them, so filtered-out listings never
+    # crowd out the ones the visitor can see.
+    min_shared = max(1, math.ceil(threshold * len(query_trigrams)))
+    ranked_ids = (
+        PropertyTrigram.objects.filter(field__in=fields, trigram__in=query_trigrams)
+        .values('property_id')
+        .annotate(shared=Count('trigram', distinct=True))
+        .filter(shared__gte=min_shared)
+        .order_by('-shared', 'property_id')
+        .values_list('property_id', flat=True)
+    )
+
+    names = [name for field in fields for name in TEXT_FIELDS[field]]
+    candidates = []
+    start, window = 0, CANDIDATE_LIMIT
+    while len(candidates) < CANDIDATE_LIMIT:
+        window_ids = list(ranked_ids[start:start + window])
+        for i in range(0, len(window_ids), FILTER_CHUNK_SIZE):
+            chunk = window_ids[i:i + FILTER_CHUNK_SIZE]
+            rows = {row['pk']: row for row in queryset.filter(pk__in=chunk).values('pk', *names)}
+            candidates += [rows[pk] for pk in chunk if pk in rows]
+        if len(window_ids) < window:
+            break
+        start, window = start + window, window * 10
+    del candidates[CANDIDATE_LIMIT:]
+
+    scored = []
+    for row in candidates:
+        score = max(word_similarity(query, row[name] or '') for name in names)
+        if score >= threshold:
+            scored.append((row['pk'], score))
+    return sorted(scored, key=lambda item: (-item[1], item[0]))
+
+
+def fuzzy_filter(queryset, query, fields):
+    """``queryset`` narrowed to fuzzy matches of ``query``, best match first."""
+    matches = fuzzy_matches(query, fields, queryset)
+    if not matches:
+        return queryset.none()
+    return queryset.filter(pk__in=[pk for pk, _ in matches]).order_by(
+        Case(*[When(pk=pk, then=Value(rank)) for rank, (pk, _) in enumerate(matches)], output_field=IntegerField())
+    )
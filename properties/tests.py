@@ -1,3 +1,375 @@
-from django.test import TestCase
+from datetime import date
+import re
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from landlords.models import LandlordProfile
+from tenants.models import FavoriteProperty, SavedSearch, TenantProfile, ViewingRequest
+from . import autocomplete, counters, recommendations
+from .archive import archive_properties, restore_property
+from .autocomplete import PrefixIndex
+from .recommendations import refresh_similar_properties
+from .models import (
+    ArchivedProperty, Property, PropertyImage, PropertyTrigram, PropertyViewCount, SimilarityRefreshQueue,
+    SimilarProperty, Town, TownAlias,
+)
+from .search import fuzzy_matches
+from .towns import display_town_name, get_or_create_town, town_key
+
+# Pages link static files, which are not collected for the tests
+UNCOLLECTED_STATIC = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+class TownNameTests(SimpleTestCase):
+    def test_display_name_keeps_apostrophes_and_hyphens(self):
+        for typed, expected in [
+            ("Kang'undo", "Kang'undo"),
+            ("murang'a", "Murang'a"),
+            ("MURANG'A", "Murang'a"),
+            ("Mlolongo-Syokimau", "Mlolongo-Syokimau"),
+            ("mlolongo-syokimau", "Mlolongo-Syokimau"),
+            ("  nairobi   cbd ", "Nairobi CBD"),
+            ("nairobi-cbd", "Nairobi-CBD"),
+            ("Kilimani", "Kilimani"),
+        ]:
+            with self.subTest(typed=typed):
+                self.assertEqual(display_town_name(typed), expected)
+
+    def test_key_folds_punctuation(self):
+        self.assertEqual(town_key("Kang'undo"), 'kang undo')
+        self.assertEqual(town_key("Nairobi-CBD"), town_key("nairobi  cbd"))
+
+
+class TownTests(TestCase):
+    def test_spellings_share_a_town_named_as_first_typed(self):
+        town = get_or_create_town('nairobi', "Murang'a Road")
+        self.assertEqual(town.name, "Murang'a Road")
+        self.assertEqual(get_or_create_town('Nairobi', "murang a road"), town)
+        self.assertEqual(Town.objects.count(), 1)
+
+
+
+@override_settings(STORAGES=UNCOLLECTED_STATIC)
+class TownAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', 'a@example.com', 'pw'))
+        landlord = LandlordProfile.objects.create(
+            user=CustomUser.objects.create_user('landlord', 'l@example.com', 'pw', role='landlord'),
+        )
+        self.listing = Property.objects.create(
+            landlord=landlord, house_type='1BR', house_number='A1', rent=20000,
+            county='Nairobi', town='Kilimni', location='Argwings Kodhek Road',
+        )
+        self.town = self.listing.town_ref
+        self.url = reverse('admin:properties_town_change', args=[self.town.pk])
+
+    def rename(self, name):
+        return self.client.post(self.url, {
+            'name': name,
+            'aliases-TOTAL_FORMS': 0, 'aliases-INITIAL_FORMS': 0,
+            'aliases-MIN_NUM_FORMS': 0, 'aliases-MAX_NUM_FORMS': 1000,
+        })
+
+    def test_rename_keeps_the_old_spelling_as_an_alias(self):
+        tenant = TenantProfile.objects.create(user=CustomUser.objects.create_user('tenant', 't@example.com', 'pw'))
+        search = SavedSearch.objects.create(tenant=tenant, spec={'county': 'Nairobi', 'town': 'kilimni'})
+        self.assertEqual(self.rename('Kilimani').status_code, 302)
+
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.town, 'Kilimani')
+        self.assertEqual(list(self.town.aliases.values_list('key', flat=True)), ['kilimni'])
+        search.refresh_from_db()
+        self.assertEqual(search.town, 'Kilimani')
+        # A later listing typed the old way joins the renamed town
+        later = Property.objects.create(
+            landlord=self.listing.landlord, house_type='1BR', house_number='A2', rent=20000,
+            county='Nairobi', town='kilimni', location='Wood Avenue',
+        )
+        self.assertEqual((later.town_ref, later.town), (self.town, 'Kilimani'))
+        self.assertEqual(Town.objects.count(), 1)
+
+    def test_rename_onto_another_town_is_refused(self):
+        other = Town.objects.create(county='Nairobi', key='kilimani', name='Kilimani')
+        TownAlias.objects.create(town=other, key='kili')
+        for name in ('kilimani', 'Kili'):
+            with self.subTest(name=name):
+                response = self.rename(name)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Merge selected towns')
+        self.town.refresh_from_db()
+        self.assertEqual(self.town.name, 'Kilimni')
+
+class FuzzySearchTests(TestCase):
+    def setUp(self):
+        landlord = LandlordProfile.objects.create(
+            user=CustomUser.objects.create_user('landlord', 'l@example.com', 'pw', role='landlord'),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            # Closer matches than the one listing left available
+            self.hidden = [
+                Property.objects.create(
+                    landlord=landlord, house_type='1BR', house_number=f'H{n}', rent=20000,
+                    county='Nairobi', town='Kilimani', location='Kilimani', available=False,
+                )
+                for n in range(3)
+            ]
+            self.listing = Property.objects.create(
+                landlord=landlord, house_type='1BR', house_number='A1', rent=20000,
+                county='Nairobi', town='Kilimani', location='Kilimani Road, near Yaya',
+            )
+
+    def test_filtered_out_listings_do_not_use_up_the_candidates(self):
+        fields = (PropertyTrigram.LOCATION,)
+        with mock.patch('properties.search.CANDIDATE_LIMIT', 2):
+            self.assertEqual(len(fuzzy_matches('kilimni', fields, Property.objects.all())), 2)
+            matches = fuzzy_matches('kilimni', fields, Property.objects.filter(available=True))
+        self.assertEqual([pk for pk, _ in matches], [self.listing.pk])
+
+    def test_accented_text_matches_plain_queries(self):
+        self.listing.description = 'Above the Café Deli'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.listing.save()
+        self.assertFalse(PropertyTrigram.objects.filter(trigram__in=['afé', 'fé$']).exists())
+        matches = fuzzy_matches('cafe deli', (PropertyTrigram.TEXT,), Property.objects.all())
+        self.assertEqual([pk for pk, _ in matches], [self.listing.pk])
+
+
+class PrefixIndexTests(SimpleTestCase):
+    counts = {
+        ('location', 'Kilimani Road'): 3,
+        ('location', 'Kileleshwa'): 5,
+        ('town', 'Kilimani'): 9,
+        ('town', 'Kitengela'): 5,
+        ('county', 'Kiambu'): 2,
+        ('location', 'Ngong Road'): 4,
+    }
+
+    def test_suggestions_are_ranked_by_listing_count(self):
+        index = PrefixIndex(self.counts)
+        self.assertEqual(index.search('Ki'), [
+            ('town', 'Kilimani', 9), ('location', 'Kileleshwa', 5), ('town', 'Kitengela', 5),
+            ('location', 'Kilimani Road', 3), ('county', 'Kiambu', 2),
+        ])
+        self.assertEqual(index.search('ki', field='location', limit=1), [('location', 'Kileleshwa', 5)])
+        # Any word of a value matches, not only the first
+        self.assertEqual(index.search('  ROA'), [('location', 'Ngong Road', 4), ('location', 'Kilimani Road', 3)])
+        self.assertEqual(index.search('x'), [])
+
+    def test_precomputed_prefixes_rank_as_lookups_do(self):
+        counts = {('location', f'Block {n} Kilimani'): n % 7 for n in range(40)}
+        counts.update(self.counts)
+        with mock.patch('properties.autocomplete.LARGE_RANGE', 4):
+            precomputed = PrefixIndex(counts)
+        plain = PrefixIndex(counts)
+        self.assertIn('kil', precomputed._top)
+        self.assertFalse(plain._top)
+        for prefix in ('b', 'bl', 'block 1', 'k', 'kil', 'kilimani', 'r'):
+            for field in (None, *autocomplete.FIELDS):
+                with self.subTest(prefix=prefix, field=field):
+                    self.assertEqual(
+                        precomputed.search(prefix, field, limit=autocomplete.MAX_LIMIT),
+                        plain.search(prefix, field, limit=autocomplete.MAX_LIMIT),
+                    )
+
+
+@override_settings(STORAGES=UNCOLLECTED_STATIC)
+class CardViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        landlord = LandlordProfile.objects.create(
+            user=CustomUser.objects.create_user('landlord', 'l@example.com', 'pw', role='landlord'),
+        )
+        self.listing = Property.objects.create(
+            landlord=landlord, house_type='1BR', house_number='A1', rent=20000,
+            county='Nairobi', town='Kilimani', location='Argwings Kodhek Road',
+        )
+        self.client = Client(enforce_csrf_checks=True)
+        self.url = reverse('properties:record_card_views')
+
+    def card_views(self):
+        counters.flush()
+        return PropertyViewCount.objects.filter(property=self.listing).values_list('card_views', flat=True).first()
+
+    def test_needs_the_page_csrf_token(self):
+        self.assertEqual(self.client.post(self.url, {'ids': [self.listing.pk]}).status_code, 403)
+
+    def test_counts_each_visitor_once_per_listing(self):
+        response = self.client.get(reverse('tenants:browse_properties'))
+        token = re.search(r'data-views-url="[^"]*">\s*<input type="hidden" name="csrfmiddlewaretoken" value="([^"]+)"',
+                          response.content.decode()).group(1)
+        for _ in range(2):
+            response = self.client.post(self.url, {'ids': [self.listing.pk], 'csrfmiddlewaretoken': token})
+            self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.card_views(), 1)
+
+        other = Client(enforce_csrf_checks=True)
+        response = other.get(reverse('tenants:browse_properties'))
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+        other.post(self.url, {'ids': [self.listing.pk], 'csrfmiddlewaretoken': token})
+        self.assertEqual(self.card_views(), 2)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.landlord = LandlordProfile.objects.create(
+            user=CustomUser.objects.create_user('landlord', 'l@example.com', 'pw', role='landlord'),
+        )
+        self.tenant = TenantProfile.objects.create(user=CustomUser.objects.create_user('tenant', 't@example.com', 'pw'))
+
+    def unavailable_listing(self, house_number, **kwargs):
+        listing = Property.objects.create(
+            landlord=self.landlord, house_type='1BR', house_number=house_number, rent=20000,
+            county='Nairobi', town='Kilimani', location='Argwings Kodhek Road', available=False, **kwargs,
+        )
+        PropertyImage.objects.create(property=listing, image=f'property_photos/{house_number}.jpg')
+        return listing
+
+    def test_round_trip(self):
+        listing = self.unavailable_listing('A1')
+        FavoriteProperty.objects.create(tenant=self.tenant, property=listing)
+        PropertyViewCount.objects.create(property=listing, detail_views=7, card_views=40)
+        ViewingRequest.objects.create(
+            tenant=self.tenant, property=listing, landlord=self.landlord, requested_on=date(2026, 10, 1), message='Saturday?',
+        )
+
+        self.assertEqual(archive_properties([listing.pk]), 1)
+        self.assertFalse(Property.objects.filter(pk=listing.pk).exists())
+        archived = ArchivedProperty.objects.get(original_id=listing.pk)
+        self.assertEqual((archived.detail_views, archived.card_views), (7, 40))
+
+        restored = restore_property(archived)
+        self.assertEqual(restored.pk, listing.pk)
+        self.assertFalse(restored.available)
+        self.assertEqual(restored.created_at, listing.created_at)
+        self.assertEqual(list(restored.images.values_list('image', flat=True)), ['property_photos/A1.jpg'])
+        self.assertTrue(FavoriteProperty.objects.filter(tenant=self.tenant, property=restored).exists())
+        self.assertEqual(PropertyViewCount.objects.get(property=restored).card_views, 40)
+        self.assertEqual(ViewingRequest.objects.get(property=restored).message, 'Saturday?')
+        self.assertFalse(ArchivedProperty.objects.exists())
+
+    def test_reused_listing_id(self):
+        first = self.unavailable_listing('A1')
+        archive_properties([first.pk])
+        # As MySQL may do after a restart: the freed id goes to a new listing
+        second = self.unavailable_listing('B2', id=first.pk)
+        self.assertEqual(archive_properties([second.pk]), 1)
+
+        older, newer = ArchivedProperty.objects.filter(original_id=first.pk).order_by('pk')
+        self.assertEqual(list(newer.images.values_list('image', flat=True)), ['property_photos/B2.jpg'])
+        self.assertEqual(restore_property(newer).pk, first.pk)
+        # The id is taken again, so the older listing comes back under a new one
+        restored = restore_property(older)
+        self.assertNotEqual(restored.pk, first.pk)
+        self.assertEqual(list(restored.images.values_list('image', flat=True)), ['property_photos/A1.jpg'])
+
+
+class SimilarPropertiesTests(TestCase):
+    def setUp(self):
+        self.landlord = LandlordProfile.objects.create(
+            user=CustomUser.objects.create_user('landlord', 'l@example.com', 'pw', role='landlord'),
+        )
+        for n in range(12):
+            self.listing(n)
+
+    def listing(self, n, **kwargs):
+        return Property.objects.create(**{
+            'landlord': self.landlord, 'house_type': ['1BR', '2BR', 'bedsitter'][n % 3],
+            'house_number': f'A{n}', 'rent': 10000 + 2500 * n, 'county': 'Nairobi',
+            'town': ['Kilimani', 'Westlands'][n % 2], 'location': 'Somewhere',
+            'description': ['quiet with parking', 'near the mall', 'borehole water'][n % 3], **kwargs,
+        })
+
+    def stored(self):
+        return set(SimilarProperty.objects.values_list('property_id', 'similar_id', 'rank'))
+
+    def test_incremental_refresh_matches_a_full_one(self):
+        refresh_similar_properties(full=True, k=3)
+        self.listing(12, rent=12500)
+        Property.objects.filter(house_number='A4').first().delete()
+        Property.objects.filter(house_number='A7').update(rent=40000)  # no signal
+        SimilarityRefreshQueue.enqueue(Property.objects.filter(house_number='A7').values_list('pk', flat=True))
+
+        refresh_similar_properties(k=3, batch_size=2)
+        incremental = self.stored()
+        self.assertFalse(SimilarityRefreshQueue.objects.exists())
+        refresh_similar_properties(full=True, k=3)
+        self.assertEqual(incremental, self.stored())
+
+    def test_listing_saved_during_a_refresh_stays_queued(self):
+        listing = self.listing(12)
+        real_encode = recommendations.encode
+
+        def encode_while_saved(rows):
+            listing.save()
+            return real_encode(rows)
+
+        with mock.patch('properties.recommendations.encode', encode_while_saved):
+            refresh_similar_properties(k=3)
+        self.assertEqual(list(SimilarityRefreshQueue.objects.values_list('property_id', flat=True)), [listing.pk])
+
+
+class CanonicalizeTownsMigrationTests(TransactionTestCase):
+    migrate_from = [('properties', '0005_town'), ('tenants', '0002_savedsearch')]
+    models_from = migrate_from + [('landlords', '0002_initial')]
+    migrate_to = [('properties', '0006_canonicalize_towns')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes()
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.models_from).apps
+
+        user = apps.get_model('accounts', 'CustomUser').objects.create(username='landlord', role='landlord')
+        landlord = apps.get_model('landlords', 'LandlordProfile').objects.create(user=user)
+        Property = apps.get_model('properties', 'Property')
+        for n, (county, town) in enumerate([
+            ('nairobi', "kang'undo road"), ('Nairobi', "Kang'undo Road"), ('Nairobi', "Kang'undo Road"),
+            ("murang'a", 'Mlolongo-Syokimau'), ('Nairobi', 'nairobi cbd'), ('Nairobi', 'Nrb  CBD'),
+        ]):
+            Property.objects.create(
+                landlord=landlord, house_type='1BR', house_number=f'A{n}', rent=20000,
+                county=county, town=town, location='Somewhere',
+            )
+        tenant_user = apps.get_model('accounts', 'CustomUser').objects.create(username='tenant')
+        tenant = apps.get_model('tenants', 'TenantProfile').objects.create(user=tenant_user)
+        SavedSearch = apps.get_model('tenants', 'SavedSearch')
+        self.searches = [
+            SavedSearch.objects.create(tenant=tenant, spec={'county': 'nairobi', 'town': 'nrb cbd'}).pk,
+            SavedSearch.objects.create(tenant=tenant, spec={'town': "KANG'UNDO road", 'q': ' '}).pk,
+        ]
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        self.apps = executor.loader.project_state(self.migrate_to).apps
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.latest)
+
+    def test_listings_point_at_one_town_per_spelling(self):
+        Property = self.apps.get_model('properties', 'Property')
+        self.assertEqual(
+            sorted(set(Property.objects.values_list('county', 'town', 'town_ref__name'))),
+            [
+                ("Murang'a", 'Mlolongo-Syokimau', 'Mlolongo-Syokimau'),
+                ('Nairobi', "Kang'undo Road", "Kang'undo Road"),
+                ('Nairobi', 'Nairobi CBD', 'Nairobi CBD'),
+            ],
+        )
+        TownAlias = self.apps.get_model('properties', 'TownAlias')
+        self.assertEqual(TownAlias.objects.get(key='nrb cbd').town.name, 'Nairobi CBD')
+
+    def test_saved_searches_use_the_town_names(self):
+        SavedSearch = self.apps.get_model('tenants', 'SavedSearch')
+        by_alias, by_spelling = (SavedSearch.objects.get(pk=pk) for pk in self.searches)
+        self.assertEqual(by_alias.spec, {'county': 'Nairobi', 'town': 'Nairobi CBD'})
+        self.assertEqual((by_alias.county, by_alias.town), ('Nairobi', 'Nairobi CBD'))
+        self.assertEqual(by_spelling.spec, {'town': "Kang'undo Road"})
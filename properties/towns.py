@@ -0,0 +1,109 @@
+# properties/towns.py
+
+"""
+Canonical county and town names.
+
+Every listing points at a Town row (Property.town_ref), unique per county
+by its match key: lower case, punctuation dropped, spaces collapsed, so
+"Nairobi Cbd", "nairobi  CBD" and "Nairobi-CBD" are one town. Only the key
+drops punctuation; display names keep the apostrophes and hyphens of
+"Murang'a" or "Mlolongo-Syokimau". TownAlias
+maps other spellings ("Nrb Cbd") onto a town. Filters resolve the town
+parameter to Town ids once and compare integer foreign keys.
+"""
+
+import re
+
+from django.db import transaction
+from django.db.models import Q
+
+from .constants import KENYA_COUNTIES
+
+NON_WORD_RE = re.compile(r'[^\w]+')
+
+# Kept upper case in display names
+ACRONYMS = {'cbd'}
+
+_COUNTIES = {county.lower(): county for county in KENYA_COUNTIES}
+
+
+def town_key(name):
+    return NON_WORD_RE.sub(' ', name.lower()).strip()
+
+
+def _display_part(part):
+    # Only the first letter is raised: "kang'undo" -> "Kang'undo", not "Kang'Undo"
+    return part.upper() if part.lower() in ACRONYMS else part[:1].upper() + part[1:].lower()
+
+
+def display_town_name(name):
+    """The spelling as typed, whitespace collapsed and each word (or hyphenated part) capitalized."""
+    return ' '.join('-'.join(map(_display_part, word.split('-'))) for word in name.split())
+
+
+def canonical_county(name):
+    """Official spelling for known counties ("murang'a" -> "Murang'a"), else title case."""
+    name = ' '.join(name.split())
+    return _COUNTIES.get(name.lower(), name.title())
+
+
+def get_or_create_town(county, name):
+    """The Town for a county and any known spelling of its name."""
+    from .models import Town, TownAlias
+
+    county = canonical_county(county)
+    key = town_key(name)
+    alias = TownAlias.objects.filter(county=county, key=key).select_related('town').first()
+    if alias:
+        return alias.town
+    town, _ = Town.objects.get_or_create(county=county, key=key, defaults={'name': display_town_name(name)})
+    return town
+
+
+def town_ids(name, county=''):
+    """Ids of the towns (in ``county``, or in any county) a spelling refers to."""
+    from .models import Town
+
+    key = town_key(name)
+    towns = Town.objects.filter(Q(key=key) | Q(aliases__key=key))
+    if county:
+        towns = towns.filter(county=canonical_county(county))
+    return list(towns.order_by().values_list('pk', flat=True).distinct())
+
+
+def canonical_town_name(name, county=''):
+    """
+    The stored name of the town a spelling or alias refers to ("Nrb Cbd" ->
+    "Nairobi CBD"), so it compares equal to Property.town; the display
+    spelling when no town (or more than one differently named) matches.
+    """
+    from .models import Town
+
+    key = town_key(name)
+    towns = Town.objects.filter(Q(key=key) | Q(aliases__key=key))
+    if county:
+        towns = towns.filter(county=canonical_county(county))
+    names = set(towns.values_list('name', flat=True)[:10])
+    return names.pop() if len(names) == 1 else display_town_name(name)
+
+
+def merge_towns(target, towns):
+    """
+    Fold ``towns`` into ``target``: their listings move over and their
+    names become aliases of it. Returns the number of listings moved.
+    """
+    from .cache import bump_listings_version
+    from .models import Property, TownAlias
+
+    towns = [town for town in towns if town.pk != target.pk]
+    with transaction.atomic():
+        moved = Property.objects.filter(town_ref__in=towns).update(
+            town_ref=target, town=target.name, county=target.county,
+        )
+        TownAlias.objects.filter(town__in=towns).update(town=target, county=target.county)
+        for town in towns:
+            town.delete()
+            if town.key != target.key:
+                TownAlias.objects.get_or_create(county=target.county, key=town.key, defaults={'town': target})
+    bump_listings_version()
+    return moved
@@ -0,0 +1,216 @@
+# properties/uploads.py
+
+"""
+Resumable chunked photo uploads.
+
+The property form (static/js/chunked_upload.js) starts an upload per photo
+with its name and size, then sends it in chunks of at most
+IMAGE_UPLOAD_CHUNK_SIZE bytes, each saying the offset it starts at. Chunks
+are streamed from the request straight into a file under
+IMAGE_UPLOAD_TEMP_DIR, so a worker holds one read buffer in memory however
+large the photo is. The declared size is checked against
+IMAGE_UPLOAD_MAX_SIZE before any byte is sent and the type is sniffed from
+the first bytes of the first chunk, so an oversized or non-image file is
+refused without the rest of it being uploaded. After a dropped connection
+the client asks for the offset the server has and carries on from there.
+
+When the last byte arrives the file is checked with Pillow. It becomes a
+PropertyImage at once if the upload named a property; otherwise it waits
+until the property form is submitted with its id (claim_uploads).
+Unfinished or unclaimed uploads are removed after IMAGE_UPLOAD_EXPIRY.
+"""
+
+import os
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from PIL import Image
+
+from .models import ImageUpload, PropertyImage
+
+READ_SIZE = 64 * 1024
+SNIFF_SIZE = 12
+
+# Accepted types -> (file extension, Pillow format)
+IMAGE_TYPES = {
+    'image/jpeg': ('.jpg', 'JPEG'),
+    'image/png': ('.png', 'PNG'),
+    'image/gif': ('.gif', 'GIF'),
+    'image/webp': ('.webp', 'WEBP'),
+}
+
+
+class UploadError(ValueError):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def sniff_image_type(head):
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def temp_path(upload):
+    return Path(settings.IMAGE_UPLOAD_TEMP_DIR) / f'{upload.pk}.part'
+
+
+def start_upload(user, filename, size, property_obj=None):
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("Size must be a number of bytes.")
+    if size <= 0:
+        raise UploadError("The file is empty.")
+    if size > settings.IMAGE_UPLOAD_MAX_SIZE:
+        raise UploadError(
+            f"Photos may be at most {settings.IMAGE_UPLOAD_MAX_SIZE // (1024 * 1024)} MB.", status=413,
+        )
+    purge_stale_uploads()
+    pending = ImageUpload.objects.filter(user=user).count()
+    if pending >= settings.IMAGE_UPLOAD_MAX_PENDING:
+        raise UploadError("Too many uploads in progress; finish or cancel some first.", status=429)
+
+    upload = ImageUpload.objects.create(
+        user=user, property=property_obj, size=size,
+        filename=get_valid_filename(os.path.basename(str(filename or 'photo')))[:200] or 'photo',
+    )
+    path = temp_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def write_chunk(upload, offset, stream, length):
+    """
+    Append ``length`` bytes read from ``stream`` at ``offset``; returns the
+    PropertyImage if this completed an upload with a property, else None.
+    """
+    if length > settings.IMAGE_UPLOAD_CHUNK_SIZE:
+        raise UploadError("The chunk is too large.", status=413)
+    if offset + length > upload.size:
+        raise UploadError("The chunk goes past the declared size.", status=413)
+
+    with transaction.atomic():
+        # Claim the offset before touching the file: a retry of the same
+        # chunk waits here, then finds the offset moved on instead of
+        # truncating the bytes the first request wrote
+        state = ImageUpload.objects.select_for_update().filter(pk=upload.pk).values('received', 'completed').first()
+        if state is None:
+            raise UploadError("The upload was cancelled.", status=404)
+        if state['completed']:
+            raise UploadError("The upload is already complete.", status=409)
+        if offset != state['received']:
+            raise UploadError("The offset does not match the bytes received.", status=409)
+
+        written, content_type = 0, upload.content_type
+        with open(temp_path(upload), 'r+b') as part:
+            part.seek(offset)
+            while written < length:
+                data = stream.read(min(READ_SIZE, length - written))
+                if not data:
+                    break  # client went away; it resumes from what arrived
+                if offset == 0 and written == 0:
+                    data, content_type = _read_first_bytes(data, stream, length)
+                    if content_type is None:
+                        break
+                part.write(data)
+                written += len(data)
+            part.truncate(offset + written)
+        if content_type is not None:
+            upload.received, upload.content_type = offset + written, content_type
+            ImageUpload.objects.filter(pk=upload.pk).update(received=upload.received, content_type=content_type)
+
+    if content_type is None:
+        abort_upload(upload)
+        raise UploadError("Only JPEG, PNG, GIF and WebP photos can be uploaded.", status=415)
+    if upload.received == upload.size:
+        return finish_upload(upload)
+    return None
+
+
+def _read_first_bytes(data, stream, length):
+    """The first bytes topped up to SNIFF_SIZE, and the image type they show."""
+    while len(data) < min(SNIFF_SIZE, length):
+        more = stream.read(min(SNIFF_SIZE, length) - len(data))
+        if not more:
+            break
+        data += more
+    return data, sniff_image_type(data[:SNIFF_SIZE])
+
+
+def finish_upload(upload):
+    expected_format = IMAGE_TYPES[upload.content_type][1]
+    try:
+        with Image.open(temp_path(upload)) as image:
+            image_format = image.format
+            image.verify()
+    except Exception:
+        image_format = None
+    if image_format != expected_format:
+        abort_upload(upload)
+        raise UploadError("The file is not a valid image.", status=415)
+
+    upload.completed = True
+    upload.save(update_fields=['completed'])
+    if upload.property_id:
+        return attach_upload(upload, upload.property)
+    return None
+
+
+def attach_upload(upload, property_obj):
+    """Move a completed upload into MEDIA_ROOT as a PropertyImage."""
+    stem = os.path.splitext(upload.filename)[0] or 'photo'
+    name = stem + IMAGE_TYPES[upload.content_type][0]
+    image = PropertyImage(property=property_obj)
+    with open(temp_path(upload), 'rb') as part:
+        image.image.save(name, File(part), save=True)
+    abort_upload(upload)
+    return image
+
+
+def claim_uploads(user, property_obj, upload_ids):
+    """Attach the user's completed, unattached uploads named in ``upload_ids``."""
+    ids = []
+    for value in upload_ids:
+        try:
+            ids.append(uuid.UUID(value))
+        except ValueError:
+            continue
+    uploads = ImageUpload.objects.filter(pk__in=ids, user=user, completed=True, property__isnull=True)
+    return [attach_upload(upload, property_obj) for upload in uploads]
+
+
+def abort_upload(upload):
+    temp_path(upload).unlink(missing_ok=True)
+    ImageUpload.objects.filter(pk=upload.pk).delete()
+
+
+def purge_stale_uploads():
+    expiry = settings.IMAGE_UPLOAD_EXPIRY
+    for upload in ImageUpload.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=expiry))[:100]:
+        abort_upload(upload)
+    # Parts whose rows went with a deleted account or property
+    directory = Path(settings.IMAGE_UPLOAD_TEMP_DIR)
+    if directory.is_dir():
+        cutoff = time.time() - expiry
+        for part in directory.glob('*.part'):
+            try:
+                if part.stat().st_mtime < cutoff:
+                    part.unlink()
+            except FileNotFoundError:
+                pass
@@ -1,12 +1,32 @@
 # properties/urls.py
 
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
 
 app_name = 'properties'
 
+# ASGI deployments serve the read-only pages from async views
+if settings.ASYNC_VIEWS:
+    property_list_view = async_views.AsyncPropertyListView.as_view()
+    property_detail_view = async_views.AsyncPropertyDetailView.as_view()
+    towns_by_county_view = async_views.get_towns_by_county
+    property_images_view = async_views.property_images
+    listing_stream_view = async_views.listing_stream
+else:
+    property_list_view = views.PropertyListView.as_view()
+    property_detail_view = views.PropertyDetailView.as_view()
+    towns_by_county_view = views.get_towns_by_county
+    property_images_view = views.property_images
+    listing_stream_view = views.listing_stream
+
 urlpatterns = [
-    path('', views.PropertyListView.as_view(), name='property_list'),  # List all properties
-    path('<int:pk>/', views.PropertyDetailView.as_view(), name='property_detail'),  # Property detail
-    path('ajax/get-towns/', views.get_towns_by_county, name='get_towns_by_county'),
-]
\ No newline at end of file
+    path('', property_list_view, name='property_list'),  # List all properties
+    path('<int:pk>/', property_detail_view, name='property_detail'),  # Property detail
+    path('<int:pk>/images/', property_images_view, name='property_images'),  # Carousel images (JSON)
+    path('ajax/get-towns/', towns_by_county_view, name='get_towns_by_county'),
+    path('ajax/autocomplete/', views.autocomplete_suggestions, name='autocomplete'),  # Location/town typeahead
+    path('card-views/', views.record_card_views, name='record_card_views'),  # Browse card impressions (beacon)
+    path('stream/', listing_stream_view, name='listing_stream'),  # New matching listings (Server-Sent Events)
+    path('cache-stats/', views.page_cache_stats_view, name='page_cache_stats'),
+]
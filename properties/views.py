@@ -1,15 +1,25 @@
 # properties/views.py
 
+import logging
 from django.views.generic import ListView, DetailView
-from .models import Property
+from .models import Property, PropertyImage, property_image_url
 from django.db.models import Q, F, Func, Value
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from .constants import KENYA_COUNTIES
 from tenants.models import FavoriteProperty
 from django.shortcuts import get_object_or_404
 from tenants.models import TenantProfile
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.http import require_POST
+from .cache import AnonymousPageCacheMixin, page_cache_stats
+from .counters import DetailViewCountMixin, record_views, unseen_card_views
+from .facets import towns_for_county
+from .towns import canonical_county, display_town_name, town_ids
+from . import autocomplete
 
-class PropertyListView(ListView):
+logger = logging.getLogger(__name__)
+
+class PropertyListView(AnonymousPageCacheMixin, ListView):
     model = Property
     template_name = 'properties/property_list.html'
     context_object_name = 'properties'
@@ -41,13 +51,13 @@ class PropertyListView(ListView):
         if location:
             queryset = queryset.filter(location__icontains=location)
 
-        # Filter by town
+        # Filter by town (any spelling or alias, within the county if given)
         if town:
-            queryset = queryset.filter(town__icontains=town.strip())
+            queryset = queryset.filter(town_ref__in=town_ids(town, county))
 
         # Filter by county
         if county:
-            queryset = queryset.filter(county__icontains=county.strip())
+            queryset = queryset.filter(county=canonical_county(county))
 
         # Apply rent range filter
         if min_rent:
@@ -76,23 +86,17 @@ class PropertyListView(ListView):
         context['max_rent'] = self.request.GET.get('max_rent', '')
         
         context['location'] = self.request.GET.get('location', '')
-        context['county'] = self.request.GET.get('county', '').strip().title()
-        context['town'] = self.request.GET.get('town', '').strip().title()
+        context['county'] = canonical_county(self.request.GET.get('county', ''))
+        context['town'] = display_town_name(self.request.GET.get('town', ''))
         
         # County dropdown: always all 47 counties A-Z
         context['counties'] = KENYA_COUNTIES
 
-        # Town dropdown: dynamic based on selected county
-        if context['county']:
-            towns = Property.objects.filter(county__iexact=context['county']) \
-                                    .values_list('town', flat=True).distinct()
-        else:
-            towns = Property.objects.values_list('town', flat=True).distinct()
-
-        context['towns'] = sorted([t.strip().title() for t in towns])  # alphabetical
+        # Town dropdown: dynamic based on selected county (alphabetical)
+        context['towns'] = towns_for_county(context['county'])
         return context
 
-class PropertyDetailView(DetailView):
+class PropertyDetailView(DetailViewCountMixin, AnonymousPageCacheMixin, DetailView):
     model = Property
     template_name = 'properties/property_detail.html'
     context_object_name = 'property'
@@ -113,21 +117,64 @@ class PropertyDetailView(DetailView):
                 ).values_list('property_id', flat=True)
 
         context['favorite_property_ids'] = favorite_property_ids
+        # Precomputed by refresh_similar_properties
+        context['similar_properties'] = Property.objects.similar_to(self.object)
         return context
 
 
 
 def get_towns_by_county(request):
     county = request.GET.get('county', '').strip()
-    print("Requested county:", county)  # Debug
 
     if county:
-        # Use case-insensitive filter and remove extra spaces
-        towns = Property.objects.filter(county__iexact=county).values_list('town', flat=True).distinct()
-        # Clean up town names too
-        towns_list = sorted([t.strip().title() for t in towns])  # Normalize towns
+        # Any spelling of the county, canonical town names
+        towns_list = towns_for_county(county)
     else:
         towns_list = []
-        
-    print("AJAX towns returned:", towns_list)  # Debug
-    return JsonResponse({'towns': towns_list})
\ No newline at end of file
+
+    logger.debug("Towns for county %r: %d", county, len(towns_list))
+    return JsonResponse({'towns': towns_list})
+
+# Carousel images for one property, fetched by property_cards.js when a
+# visitor first browses past the cover image
+def property_images(request, pk):
+    images = PropertyImage.objects.filter(property_id=pk).order_by('pk').values_list('pk', 'image')
+    return JsonResponse({'images': [{'id': image_id, 'url': property_image_url(name)} for image_id, name in images]})
+
+# Typeahead for the location/town/county filters, answered from the
+# in-memory prefix index (no database query per keystroke)
+def autocomplete_suggestions(request):
+    field = request.GET.get('field')
+    if field not in autocomplete.FIELDS:
+        field = None
+    try:
+        limit = max(1, min(int(request.GET.get('limit', autocomplete.DEFAULT_LIMIT)), autocomplete.MAX_LIMIT))
+    except ValueError:
+        limit = autocomplete.DEFAULT_LIMIT
+
+    results = autocomplete.get_index().search(request.GET.get('q', ''), field, limit)
+    return JsonResponse({'suggestions': [
+        {'value': value, 'field': result_field, 'count': count} for result_field, value, count in results
+    ]})
+
+# Cards the visitor actually scrolled past on the browse page, sent in
+# batches by view_tracking.js with the page's CSRF token (cached pages get
+# the visitor's own). Each visitor counts once per listing for a while.
+MAX_CARD_VIEWS_PER_REQUEST = 50
+
+@require_POST
+def record_card_views(request):
+    ids = {int(pk) for pk in request.POST.getlist('ids')[:MAX_CARD_VIEWS_PER_REQUEST] if pk.isdigit()}
+    record_views(unseen_card_views(request.META['CSRF_COOKIE'], ids), 'card_views')
+    return HttpResponse(status=204)
+
+# Live listing updates need ASGI (async_views.listing_stream): under WSGI an
+# open stream would hold a worker for as long as the tab is open. 204 tells
+# an EventSource left over from an ASGI deployment to stop reconnecting.
+def listing_stream(request):
+    return HttpResponse(status=204)
+
+# Page cache hit/miss counters for monitoring
+@staff_member_required
+def page_cache_stats_view(request):
+    return JsonResponse(page_cache_stats())
@@ -0,0 +1,42 @@
+// static/js/autocomplete.js — typeahead for filter inputs. An input with
+// data-autocomplete-url (and optionally data-autocomplete-field) gets a
+// <datalist> refilled from the endpoint as the visitor types.
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('input[data-autocomplete-url]').forEach(input => {
+        const datalist = document.createElement('datalist');
+        datalist.id = `${input.name}-suggestions`;
+        input.setAttribute('list', datalist.id);
+        input.setAttribute('autocomplete', 'off');
+        input.after(datalist);
+
+        let timer = null;
+        let controller = null;
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (!query) { datalist.innerHTML = ''; return; }
+
+            timer = setTimeout(() => {
+                if (controller) controller.abort();  // only the latest keystroke matters
+                controller = new AbortController();
+                const params = new URLSearchParams({ q: query });
+                if (input.dataset.autocompleteField) params.set('field', input.dataset.autocompleteField);
+
+                fetch(`${input.dataset.autocompleteUrl}?${params}`, { signal: controller.signal })
+                    .then(res => res.json())
+                    .then(data => {
+                        datalist.innerHTML = '';
+                        data.suggestions.forEach(suggestion => {
+                            const option = document.createElement('option');
+                            option.value = suggestion.value;
+                            option.label = `${suggestion.value} (${suggestion.count})`;
+                            datalist.appendChild(option);
+                        });
+                    })
+                    .catch(() => {});
+            }, 100);
+        });
+    });
+});
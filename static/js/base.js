@@ -0,0 +1,45 @@
+// static/js/base.js — shared by every page (loaded from base.html)
+
+// Makes CSRF available to all JS
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let cookie of cookies) {
+            cookie = cookie.trim();
+            if (cookie.startsWith(name + '=')) {
+                cookieValue = decodeURIComponent(cookie.slice(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    // ===== Flash message popup =====
+    const popup = document.getElementById('popup-messages');
+    if (popup && popup.innerText.trim() !== '') {
+        popup.style.display = 'block';
+    }
+    const popupClose = popup && popup.querySelector('.close-btn');
+    if (popupClose) {
+        popupClose.addEventListener('click', () => { popup.style.display = 'none'; });
+    }
+
+    // ===== Account dropdown =====
+    const circle = document.getElementById('account-circle');
+    const dropdown = document.getElementById('account-dropdown');
+
+    if (circle && dropdown) {
+        circle.addEventListener('click', () => {
+            dropdown.style.display = dropdown.style.display === 'none' ? 'block' : 'none';
+        });
+
+        document.addEventListener('click', function(e) {
+            if (!circle.contains(e.target) && !dropdown.contains(e.target)) {
+                dropdown.style.display = 'none';
+            }
+        });
+    }
+});
@@ -0,0 +1,118 @@
+// static/js/chunked_upload.js — the property form's photos (the file input
+// with data-chunked-upload) are uploaded in chunks as soon as they are
+// picked, instead of in one multipart request with the form. After a
+// network error the upload carries on from the offset the server reports
+// (see properties/uploads.py). Each finished photo adds a hidden "uploads"
+// input with its id, which the form submission attaches to the listing;
+// submitting waits until every photo is in.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const input = document.querySelector('input[type="file"][data-chunked-upload]');
+    if (!input || !window.fetch || !window.Blob || !Blob.prototype.slice) return;
+    const form = input.form;
+    const list = form.querySelector('[data-upload-list]');
+    const startUrl = input.dataset.startUrl;
+    const MAX_FAILURES = 8;
+    let pending = 0;
+    let waitNote = null;
+
+    input.removeAttribute('name');  // the photos no longer travel with the form
+
+    class UploadRefused extends Error {}
+
+    const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+    async function request(url, options) {
+        const headers = { 'X-CSRFToken': getCookie('csrftoken'), ...(options.headers || {}) };
+        const res = await fetch(url, { credentials: 'same-origin', ...options, headers });
+        const data = await res.json().catch(() => ({}));
+        return { res, data };
+    }
+
+    async function send(file, progress) {
+        const start = await request(startUrl, {
+            method: 'POST',
+            body: new URLSearchParams({ filename: file.name, size: file.size }),
+        });
+        if (!start.res.ok) throw new UploadRefused(start.data.error || 'Upload refused');
+        const url = `${startUrl}${start.data.id}/`;
+        let offset = start.data.offset;
+        let failures = 0;
+
+        while (offset < file.size) {
+            const chunk = file.slice(offset, Math.min(offset + start.data.chunk_size, file.size));
+            try {
+                const { res, data } = await request(url, {
+                    method: 'PUT',
+                    body: chunk,
+                    headers: { 'Upload-Offset': String(offset), 'Content-Type': 'application/offset+octet-stream' },
+                });
+                if (res.ok || (res.status === 409 && Number.isInteger(data.offset))) {
+                    offset = data.offset;  // on 409 the server has more (or less) than we thought
+                    failures = 0;
+                } else {
+                    throw new UploadRefused(data.error || `Upload failed (${res.status})`);
+                }
+            } catch (err) {
+                if (err instanceof UploadRefused || ++failures > MAX_FAILURES) throw err;
+                await sleep(Math.min(1000 * 2 ** failures, 30000));
+                // Resume from what actually arrived
+                const status = await request(url, { method: 'GET' }).catch(() => null);
+                if (status && status.res.ok) offset = status.data.offset;
+            }
+            progress.value = offset / file.size;
+        }
+        return start.data.id;
+    }
+
+    function track(file) {
+        const item = document.createElement('li');
+        const progress = document.createElement('progress');
+        const label = document.createElement('span');
+        progress.max = 1;
+        progress.value = 0;
+        label.textContent = ` ${file.name}`;
+        item.append(progress, label);
+        list.appendChild(item);
+
+        pending += 1;
+        send(file, progress)
+            .then(id => {
+                const hidden = document.createElement('input');
+                hidden.type = 'hidden';
+                hidden.name = 'uploads';
+                hidden.value = id;
+                form.appendChild(hidden);
+                label.textContent = ` ${file.name} ✓`;
+            })
+            .catch(err => {
+                progress.remove();
+                label.textContent = `${file.name}: ${err.message}`;
+                item.classList.add('upload-error');
+            })
+            .finally(() => {
+                pending -= 1;
+                if (!pending && waitNote) {
+                    waitNote.remove();
+                    waitNote = null;
+                }
+            });
+    }
+
+    input.addEventListener('change', () => {
+        Array.from(input.files).forEach(track);
+        input.value = '';  // the same photos can be picked again after an error
+    });
+
+    form.addEventListener('submit', e => {
+        if (pending) {
+            e.preventDefault();
+            if (!waitNote) {
+                waitNote = document.createElement('p');
+                waitNote.textContent = 'Please wait until your photos have finished uploading.';
+                list.after(waitNote);
+            }
+            waitNote.scrollIntoView({ behavior: 'smooth', block: 'center' });
+        }
+    });
+});
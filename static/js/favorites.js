@@ -0,0 +1,43 @@
+// static/js/favorites.js — confirmation modal before a favorite form submits
+
+document.addEventListener('DOMContentLoaded', function() {
+    let modal = document.getElementById('confirm-modal');
+    if (!modal) {
+        modal = document.createElement('div');
+        modal.id = 'confirm-modal';
+        modal.style.cssText = 'display:none; position:fixed; top:0; left:0; width:100%; height:100%; background:rgba(0,0,0,0.5); align-items:center; justify-content:center; z-index:9999;';
+        modal.innerHTML = `
+            <div style="background:white; padding:20px; border-radius:8px; max-width:400px; width:90%; text-align:center;">
+                <p id="confirm-message" style="margin-bottom:20px;">Are you sure?</p>
+                <button id="confirm-yes" style="padding:6px 12px; margin-right:10px; background:#007bff; color:white; border:none; border-radius:4px;">Yes</button>
+                <button id="confirm-no" style="padding:6px 12px; background:#dc3545; color:white; border:none; border-radius:4px;">No</button>
+            </div>`;
+        document.body.appendChild(modal);
+    }
+
+    const message = document.getElementById('confirm-message');
+    const yesBtn = document.getElementById('confirm-yes');
+    const noBtn = document.getElementById('confirm-no');
+    let currentForm = null;
+
+    function bindButtons(root) {
+        root.querySelectorAll('.favorite-form button').forEach(button => {
+            button.addEventListener('click', function(e) {
+                e.preventDefault();
+                currentForm = this.closest('form');
+                const action = this.dataset.action;
+                message.textContent = action === 'favorite'
+                    ? 'Are you sure you want to add this property to your favorites?'
+                    : 'Are you sure you want to remove this property from your favorites?';
+                modal.style.display = 'flex';
+            });
+        });
+    }
+
+    bindButtons(document);
+    document.addEventListener('results:replaced', e => bindButtons(e.detail.root));  // fragments.js
+
+    yesBtn.addEventListener('click', function() { if (currentForm) currentForm.submit(); modal.style.display = 'none'; });
+    noBtn.addEventListener('click', function() { modal.style.display = 'none'; currentForm = null; });
+    modal.addEventListener('click', e => { if (e.target === modal) { modal.style.display = 'none'; currentForm = null; } });
+});
@@ -0,0 +1,74 @@
+// static/js/fragments.js — filter changes and pagination replace only the
+// results (the element with data-fragment-results) instead of reloading the
+// page. The filter form (data-fragment-form) and pagination links
+// (data-fragment-link) are fetched with an "X-Fragment: results" header, to
+// which the view answers with just the cards. Scripts that bind to cards
+// listen for the "results:replaced" event, whose detail.root is the results
+// element.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const results = document.querySelector('[data-fragment-results]');
+    const form = document.querySelector('form[data-fragment-form]');
+    if (!results || !window.fetch || !window.history.pushState) return;
+
+    let controller = null;
+
+    function load(url, push) {
+        if (controller) controller.abort();  // only the latest filter change matters
+        controller = new AbortController();
+        results.setAttribute('aria-busy', 'true');
+
+        fetch(url, { headers: { 'X-Fragment': 'results' }, signal: controller.signal })
+            .then(res => {
+                if (!res.ok) throw new Error(res.status);
+                return res.text();
+            })
+            .then(html => {
+                results.innerHTML = html;
+                results.removeAttribute('aria-busy');
+                if (push) history.pushState({ fragment: true }, '', url);
+                document.dispatchEvent(new CustomEvent('results:replaced', { detail: { root: results } }));
+            })
+            .catch(err => {
+                if (err.name !== 'AbortError') window.location.href = url;  // fall back to the full page
+            });
+    }
+
+    // The form's GET URL, without its empty filters
+    function formUrl() {
+        const params = new URLSearchParams();
+        new FormData(form).forEach((value, name) => { if (value !== '') params.append(name, value); });
+        const query = params.toString();
+        return (form.getAttribute('action') || window.location.pathname) + (query ? `?${query}` : '');
+    }
+
+    if (form) {
+        form.addEventListener('submit', e => {
+            e.preventDefault();
+            load(formUrl(), true);
+        });
+        // Dropdowns apply as soon as they change; text and rent inputs on submit
+        form.querySelectorAll('select').forEach(select => {
+            select.addEventListener('change', () => load(formUrl(), true));
+        });
+    }
+
+    results.addEventListener('click', e => {
+        const link = e.target.closest('a[data-fragment-link]');
+        if (!link || e.ctrlKey || e.metaKey || e.shiftKey) return;
+        e.preventDefault();
+        load(link.href, true);
+        results.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    });
+
+    // Back/forward: restore the form and results of that URL
+    window.addEventListener('popstate', () => {
+        const params = new URLSearchParams(window.location.search);
+        if (form) {
+            Array.from(form.elements).forEach(field => {
+                if (field.name && field.type !== 'submit') field.value = params.get(field.name) || '';
+            });
+        }
+        load(window.location.href, false);
+    });
+});
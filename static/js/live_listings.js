@@ -0,0 +1,59 @@
+// static/js/live_listings.js — listens on the stream named in
+// data-stream-url (Server-Sent Events) for new listings matching the current
+// filters and announces them in the #live-listings banner. Filter changes
+// made through fragments.js reopen the stream with the new filters.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const banner = document.getElementById('live-listings');
+    if (!banner || !window.EventSource) return;
+    const message = banner.querySelector('[data-live-message]');
+    const showLink = banner.querySelector('[data-live-show]');
+
+    let source = null;
+    let query = null;       // filters the stream was opened with
+    let fresh = new Map();  // id -> listing, announced but not yet shown
+
+    function render() {
+        if (!fresh.size) { banner.style.display = 'none'; return; }
+        const listings = Array.from(fresh.values());
+        const latest = listings[listings.length - 1];
+        message.textContent = fresh.size === 1
+            ? `New: ${latest.house_type_display} in ${latest.location}, ${latest.town} — KES ${latest.rent}`
+            : `${fresh.size} new listings match your search`;
+        banner.style.display = 'block';
+    }
+
+    function filtersQuery() {
+        const params = new URLSearchParams(window.location.search);
+        params.delete('page');
+        return params.toString();
+    }
+
+    function open() {
+        if (source) source.close();
+        query = filtersQuery();
+        source = new EventSource(`${banner.dataset.streamUrl}?${query}`);
+        source.addEventListener('listing', e => {
+            const listing = JSON.parse(e.data);
+            fresh.set(listing.id, listing);
+            render();
+        });
+    }
+
+    // The first page of the current search, now including the new listings
+    showLink.addEventListener('click', e => {
+        e.preventDefault();
+        const filters = filtersQuery();
+        window.location.href = window.location.pathname + (filters ? `?${filters}` : '');
+    });
+
+    // Only a filter change needs another stream; paging keeps this one
+    document.addEventListener('results:replaced', () => {
+        if (filtersQuery() === query) return;
+        fresh = new Map();
+        render();
+        open();
+    });
+
+    open();
+});
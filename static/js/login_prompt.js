@@ -0,0 +1,34 @@
+// static/js/login_prompt.js — anonymous visitors get a login/signup prompt
+// instead of favoriting or opening details. Loaded only for anonymous users;
+// #login-signup-modal carries the target URLs in data-login-url/data-signup-url.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const modal = document.getElementById('login-signup-modal');
+    if (!modal) return;
+    const loginBtn = document.getElementById('modal-login');
+    const signupBtn = document.getElementById('modal-signup');
+    const cancelBtn = document.getElementById('modal-cancel');
+
+    // Attach click events for all favorite forms and "View Details" links
+    function bindCards(root) {
+        root.querySelectorAll('.favorite-form button, .view-details-btn').forEach(el => {
+            el.addEventListener('click', function(e) {
+                e.preventDefault();
+                modal.style.display = 'flex';
+            });
+        });
+    }
+
+    bindCards(document);
+    document.addEventListener('results:replaced', e => bindCards(e.detail.root));  // fragments.js
+
+    // Modal button actions
+    loginBtn.addEventListener('click', () => { window.location.href = modal.dataset.loginUrl; });
+    signupBtn.addEventListener('click', () => { window.location.href = modal.dataset.signupUrl; });
+    cancelBtn.addEventListener('click', () => { modal.style.display = 'none'; });
+
+    // Close modal if click outside inner box
+    modal.addEventListener('click', e => {
+        if (e.target === modal) modal.style.display = 'none';
+    });
+});
@@ -0,0 +1,171 @@
+// static/js/property_cards.js — image carousel, swipe and lightbox for
+// property cards. Cards only ship their cover image; the full image list is
+// fetched from data-images-url the first time a visitor browses past it.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const propertyImages = {};
+    const propertyImageIndex = {};
+    const pendingImages = {};
+
+
+    // Resolves once every image URL of the property is known
+    function loadImages(propertyId) {
+        const carousel = document.querySelector(`.property-carousel[data-property-id="${propertyId}"]`);
+        const expected = parseInt(carousel.dataset.imageCount, 10) || 0;
+        if (propertyImages[propertyId].length >= expected) return Promise.resolve(propertyImages[propertyId]);
+        if (!pendingImages[propertyId]) {
+            pendingImages[propertyId] = fetch(carousel.dataset.imagesUrl)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.images.length) propertyImages[propertyId] = data.images.map(img => img.url);
+                    return propertyImages[propertyId];
+                })
+                .catch(() => {
+                    delete pendingImages[propertyId];  // retry on the next click
+                    return propertyImages[propertyId];
+                });
+        }
+        return pendingImages[propertyId];
+    }
+
+    // ===== Property images carousel =====
+    function showImage(propertyId, index) {
+        const imgs = propertyImages[propertyId];
+        if (!imgs || imgs.length === 0) return;
+        document.getElementById(`property-img-${propertyId}`).src = imgs[index];
+        propertyImageIndex[propertyId] = index;
+    }
+
+    function nextImage(propertyId) {
+        loadImages(propertyId).then(imgs => {
+            if (imgs.length <= 1) return;
+            let idx = (propertyImageIndex[propertyId] || 0) + 1;
+            if (idx >= imgs.length) idx = 0;
+            showImage(propertyId, idx);
+        });
+    }
+
+    function prevImage(propertyId) {
+        loadImages(propertyId).then(imgs => {
+            if (imgs.length <= 1) return;
+            let idx = (propertyImageIndex[propertyId] || 0) - 1;
+            if (idx < 0) idx = imgs.length - 1;
+            showImage(propertyId, idx);
+        });
+    }
+
+    // ===== Card bindings (again for results swapped in by fragments.js) =====
+    function bindCards(root) {
+        root.querySelectorAll('.property-carousel').forEach(carousel => {
+            const cover = carousel.querySelector('img');
+            if (!propertyImages[carousel.dataset.propertyId]) {
+                propertyImages[carousel.dataset.propertyId] = cover ? [cover.src] : [];
+            }
+            delete propertyImageIndex[carousel.dataset.propertyId];  // a fresh card shows its cover
+            bindCarousel(carousel);
+        });
+        root.querySelectorAll('.property-carousel img').forEach(bindLightbox);
+    }
+
+    function bindCarousel(carousel) {
+        const propertyId = carousel.dataset.propertyId;
+        const prevBtn = carousel.querySelector('.prev-btn');
+        const nextBtn = carousel.querySelector('.next-btn');
+        if (prevBtn) prevBtn.addEventListener('click', () => prevImage(propertyId));
+        if (nextBtn) nextBtn.addEventListener('click', () => nextImage(propertyId));
+
+        // Touch events for mobile swipe
+        let startX = 0;
+        carousel.addEventListener('touchstart', e => { startX = e.touches[0].clientX; });
+        carousel.addEventListener('touchend', e => {
+            const diff = e.changedTouches[0].clientX - startX;
+            if (Math.abs(diff) > 30) { if (diff < 0) nextImage(propertyId); else prevImage(propertyId); }
+        });
+    }
+
+    // ===== Lightbox =====
+    // Create modal elements dynamically
+    const lightboxModal = document.createElement('div');
+    lightboxModal.id = 'lightbox-modal';
+    lightboxModal.style.cssText = 'display:none;position:fixed;top:0;left:0;width:100%;height:100%;background:rgba(0,0,0,0.9);align-items:center;justify-content:center;z-index:10000;';
+    lightboxModal.innerHTML = `
+        <span id="lightbox-close" style="position:absolute;top:20px;right:30px;font-size:40px;color:white;cursor:pointer;">&times;</span>
+        <img id="lightbox-img" src="" style="max-width:90%; max-height:90%; cursor:grab;">
+        <button id="lightbox-prev" style="position:absolute;top:50%;left:20px;font-size:40px;color:white;background:none;border:none;cursor:pointer;">‹</button>
+        <button id="lightbox-next" style="position:absolute;top:50%;right:20px;font-size:40px;color:white;background:none;border:none;cursor:pointer;">›</button>
+    `;
+    document.body.appendChild(lightboxModal);
+
+    const lightboxImg = document.getElementById('lightbox-img');
+    const lightboxClose = document.getElementById('lightbox-close');
+    const lightboxNext = document.getElementById('lightbox-next');
+    const lightboxPrev = document.getElementById('lightbox-prev');
+
+    let currentPropertyId = null;
+    let currentImageIndex = 0;
+
+    function resetLightboxImage() {
+        lightboxImg.style.transform = 'scale(1)';
+        lightboxImg.style.left = '0px';
+        lightboxImg.style.top = '0px';
+    }
+
+    function bindLightbox(img) {
+        img.addEventListener('click', function() {
+            currentPropertyId = this.closest('.property-carousel').dataset.propertyId;
+            currentImageIndex = propertyImageIndex[currentPropertyId] || 0;
+            lightboxImg.src = propertyImages[currentPropertyId][currentImageIndex];
+            resetLightboxImage();
+            lightboxModal.style.display = 'flex';
+        });
+    }
+
+    bindCards(document);
+    document.addEventListener('results:replaced', e => bindCards(e.detail.root));
+
+    lightboxClose.addEventListener('click', () => lightboxModal.style.display = 'none');
+
+    lightboxNext.addEventListener('click', () => {
+        if (!currentPropertyId) return;
+        loadImages(currentPropertyId).then(imgs => {
+            currentImageIndex = (currentImageIndex + 1) % imgs.length;
+            lightboxImg.src = imgs[currentImageIndex];
+            resetLightboxImage();
+        });
+    });
+
+    lightboxPrev.addEventListener('click', () => {
+        if (!currentPropertyId) return;
+        loadImages(currentPropertyId).then(imgs => {
+            currentImageIndex = (currentImageIndex - 1 + imgs.length) % imgs.length;
+            lightboxImg.src = imgs[currentImageIndex];
+            resetLightboxImage();
+        });
+    });
+
+    lightboxModal.addEventListener('click', e => { if (e.target === lightboxModal) lightboxModal.style.display = 'none'; });
+
+    // Zoom with wheel
+    lightboxImg.addEventListener('wheel', e => {
+        e.preventDefault();
+        let scale = lightboxImg.style.transform.replace(/[^0-9.]/g, '') || 1;
+        scale = parseFloat(scale);
+        if (e.deltaY < 0) scale += 0.1; else scale = Math.max(1, scale - 0.1);
+        lightboxImg.style.transform = `scale(${scale})`;
+    });
+
+    // Drag image
+    let isDragging = false, startX, startY, initialX = 0, initialY = 0;
+    lightboxImg.addEventListener('mousedown', e => {
+        isDragging = true; startX = e.clientX; startY = e.clientY;
+        initialX = parseInt(lightboxImg.style.left) || 0; initialY = parseInt(lightboxImg.style.top) || 0;
+    });
+    document.addEventListener('mouseup', () => { isDragging = false; });
+    document.addEventListener('mousemove', e => {
+        if (!isDragging) return;
+        const dx = e.clientX - startX, dy = e.clientY - startY;
+        lightboxImg.style.position = 'relative';
+        lightboxImg.style.left = (initialX + dx) + 'px';
+        lightboxImg.style.top = (initialY + dy) + 'px';
+    });
+});
@@ -0,0 +1,26 @@
+// static/js/towns.js — county select refills the town select via AJAX.
+// The county <select id="county-select"> carries the endpoint in data-towns-url.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const countySelect = document.getElementById('county-select');
+    const townSelect = document.getElementById('town-select');
+    if (!countySelect || !townSelect) return;
+    const ajaxTownsUrl = countySelect.dataset.townsUrl;
+
+    countySelect.addEventListener('change', function() {
+        const selectedCounty = this.value.trim();
+        townSelect.innerHTML = '<option value="">Town/City (Any)</option>';
+        if (!selectedCounty) return;
+
+        fetch(`${ajaxTownsUrl}?county=${encodeURIComponent(selectedCounty)}`)
+            .then(res => res.json())
+            .then(data => {
+                data.towns.forEach(town => {
+                    const option = document.createElement('option');
+                    option.value = town;
+                    option.textContent = town;
+                    townSelect.appendChild(option);
+                });
+            });
+    });
+});
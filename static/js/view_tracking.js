@@ -0,0 +1,51 @@
+// static/js/view_tracking.js — reports browse cards the visitor actually
+// scrolled past (at least half visible) to data-views-url, in batches, for
+// the landlord's view statistics. Each card is reported once per page load,
+// including cards of results swapped in by fragments.js. The CSRF token is
+// read from the grid's hidden input (the cookie is HttpOnly).
+
+document.addEventListener('DOMContentLoaded', function() {
+    const grid = document.querySelector('[data-views-url]');
+    if (!grid || !('IntersectionObserver' in window) || !navigator.sendBeacon) return;
+    const viewsUrl = grid.dataset.viewsUrl;
+
+    const seen = new Set();
+    let queued = [];
+
+    function send() {
+        if (!queued.length) return;
+        const data = new FormData();
+        const token = document.querySelector('[data-views-url] [name=csrfmiddlewaretoken]');
+        if (token) data.append('csrfmiddlewaretoken', token.value);
+        queued.forEach(id => data.append('ids', id));
+        navigator.sendBeacon(viewsUrl, data);
+        queued = [];
+    }
+
+    const observer = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            const id = entry.target.dataset.propertyId;
+            if (!entry.isIntersecting || seen.has(id)) return;
+            seen.add(id);
+            queued.push(id);
+            observer.unobserve(entry.target);
+        });
+    }, { threshold: 0.5 });
+
+    function observeCards(root) {
+        root.querySelectorAll('[data-views-url] .property-carousel[data-property-id]').forEach(card => {
+            if (!seen.has(card.dataset.propertyId)) observer.observe(card);
+        });
+    }
+
+    observeCards(document);
+    // Cards swapped in by fragments.js; the replaced ones are gone from the DOM
+    document.addEventListener('results:replaced', e => {
+        observer.disconnect();
+        observeCards(e.detail.root);
+    });
+
+    setInterval(send, 10000);
+    document.addEventListener('visibilitychange', () => { if (document.visibilityState === 'hidden') send(); });
+    window.addEventListener('pagehide', send);
+});
@@ -1,7 +1,7 @@
 # tenants/admin.py
 
 from django.contrib import admin
-from .models import TenantProfile, FavoriteProperty
+from .models import TenantProfile, FavoriteProperty, SavedSearch, ViewingRequest
 from django.db import models
 
 @admin.register(TenantProfile)
@@ -13,4 +13,16 @@ class TenantProfileAdmin(admin.ModelAdmin):
 class FavoritePropertyAdmin(admin.ModelAdmin):
     list_display = ('tenant', 'property', 'saved_at')
     search_fields = ('tenant__user__username', 'property__house_number')
-    saved_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    saved_at = models.DateTimeField(auto_now_add=True)
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('tenant', '__str__', 'created_at')
+    search_fields = ('tenant__user__username', 'name')
+
+@admin.register(ViewingRequest)
+class ViewingRequestAdmin(admin.ModelAdmin):
+    list_display = ('tenant', 'property', 'requested_on', 'status', 'notified_at')
+    list_filter = ('status',)
+    search_fields = ('tenant__user__username', 'property__house_number')
+    raw_id_fields = ('tenant', 'property', 'landlord')
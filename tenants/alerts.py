@@ -0,0 +1,112 @@
+# tenants/alerts.py
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from landlords.models import LandlordProfile
+from properties.models import Property
+from .models import SavedSearchMatch, ViewingRequest
+
+
+def pending_tenant_ids(limit):
+    return list(
+        SavedSearchMatch.objects.filter(sent_at__isnull=True)
+        .values_list('saved_search__tenant_id', flat=True)
+        .distinct()
+        .order_by('saved_search__tenant_id')[:limit]
+    )
+
+
+def send_digest_batch(batch_size=100, connection=None):
+    """
+    Email one digest per tenant for up to ``batch_size`` tenants with queued
+    matches, over a single mail connection, then mark those matches sent
+    with one UPDATE. Listings taken down since they matched are dropped.
+    Returns (emails sent, matches processed); (0, 0) when the queue is empty.
+    """
+    tenant_ids = pending_tenant_ids(batch_size)
+    if not tenant_ids:
+        return 0, 0
+
+    matches = list(
+        SavedSearchMatch.objects.filter(sent_at__isnull=True, saved_search__tenant_id__in=tenant_ids)
+        .select_related('saved_search__tenant__user', 'property')
+        .order_by('saved_search_id', 'property_id')
+    )
+    by_tenant = defaultdict(lambda: defaultdict(list))
+    for match in matches:
+        if match.property.available:
+            by_tenant[match.saved_search.tenant][match.saved_search].append(match.property)
+
+    messages = []
+    for tenant, searches in by_tenant.items():
+        if not tenant.user.email:
+            continue
+        body = render_to_string('tenants/emails/saved_search_digest.txt', {
+            'user': tenant.user,
+            'searches': [(search, properties) for search, properties in searches.items()],
+            'site_url': settings.SITE_URL,
+        })
+        count = sum(len(properties) for properties in searches.values())
+        subject = f"{count} new listing{'s' if count != 1 else ''} match your saved searches"
+        messages.append(EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [tenant.user.email]))
+
+    connection = connection or get_connection()
+    sent = (connection.send_messages(messages) or 0) if messages else 0
+    SavedSearchMatch.objects.filter(pk__in=[m.pk for m in matches]).update(sent_at=timezone.now())
+    return sent, len(matches)
+
+
+def send_viewing_notification_batch(batch_size=100, connection=None):
+    """
+    Email up to ``batch_size`` landlords one summary each of their
+    unnotified viewing requests, counted per listing in the database, so a
+    listing with thousands of requests still costs one aggregate query and
+    one email. The summarized requests are marked with one UPDATE.
+    Returns (emails sent, requests processed); (0, 0) when nothing is queued.
+    """
+    queued = ViewingRequest.objects.filter(notified_at__isnull=True)
+    landlord_ids = list(
+        queued.values_list('landlord_id', flat=True).distinct().order_by('landlord_id')[:batch_size]
+    )
+    if not landlord_ids:
+        return 0, 0
+
+    # Requests arriving while this batch is sent wait for the next batch
+    last_id = queued.filter(landlord_id__in=landlord_ids).aggregate(last=Max('id'))['last']
+    batch = queued.filter(landlord_id__in=landlord_ids, id__lte=last_id)
+
+    counts = list(
+        batch.values('landlord_id', 'property_id')
+        .annotate(requests=Count('id'))
+        .order_by('landlord_id', '-requests', 'property_id')
+    )
+    properties = Property.objects.in_bulk({row['property_id'] for row in counts})
+    landlords = LandlordProfile.objects.select_related('user').in_bulk(landlord_ids)
+    by_landlord = defaultdict(list)
+    for row in counts:
+        by_landlord[row['landlord_id']].append((properties[row['property_id']], row['requests']))
+
+    messages = []
+    for landlord_id, listings in by_landlord.items():
+        user = landlords[landlord_id].user
+        if not user.email:
+            continue
+        total = sum(requests for _, requests in listings)
+        body = render_to_string('landlords/emails/viewing_requests_digest.txt', {
+            'user': user,
+            'listings': listings,
+            'site_url': settings.SITE_URL,
+        })
+        subject = f"{total} new viewing request{'s' if total != 1 else ''} for your properties"
+        messages.append(EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [user.email]))
+
+    connection = connection or get_connection()
+    sent = (connection.send_messages(messages) or 0) if messages else 0
+    processed = batch.update(notified_at=timezone.now())
+    return sent, processed
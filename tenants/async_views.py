@@ -0,0 +1,10 @@
+# tenants/async_views.py
+
+from properties.async_views import AsyncListingPageView
+from .views import BrowsePropertiesView
+
+
+# Async counterpart of BrowsePropertiesView (see properties/async_views.py)
+class AsyncBrowsePropertiesView(AsyncListingPageView):
+    sync_view = BrowsePropertiesView
+    include_favorites = True
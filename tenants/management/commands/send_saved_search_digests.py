@@ -0,0 +1,33 @@
+# tenants/management/commands/send_saved_search_digests.py
+
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from tenants.alerts import send_digest_batch
+
+
+class Command(BaseCommand):
+    help = "Email queued saved-search matches as one digest per tenant (run from cron, or with --interval as a worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Tenants per mail connection")
+        parser.add_argument('--interval', type=int, default=0, help="Keep polling every N seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            emails = matches = 0
+            with get_connection() as connection:
+                while True:
+                    sent, processed = send_digest_batch(options['batch_size'], connection=connection)
+                    if not processed:
+                        break
+                    emails += sent
+                    matches += processed
+            if matches:
+                self.stdout.write(f"Sent {emails} digest(s) covering {matches} match(es).")
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+# tenants/management/commands/send_viewing_notifications.py
+
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from tenants.alerts import send_viewing_notification_batch
+
+
+class Command(BaseCommand):
+    help = "Email landlords one summary of their new viewing requests (run from cron, or with --interval as a worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Landlords per mail connection")
+        parser.add_argument('--interval', type=int, default=0, help="Keep polling every N seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            emails = requests = 0
+            with get_connection() as connection:
+                while True:
+                    sent, processed = send_viewing_notification_batch(options['batch_size'], connection=connection)
+                    if not processed:
+                        break
+                    emails += sent
+                    requests += processed
+            if requests:
+                self.stdout.write(f"Sent {emails} notification(s) covering {requests} viewing request(s).")
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landlords', '0002_initial'),
+        ('properties', '0003_propertyviewcount'),
+        ('tenants', '0002_savedsearch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewingRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('requested_on', models.DateField()),
+                ('message', models.CharField(blank=True, max_length=500)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('declined', 'Declined')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('landlord', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='viewing_requests', to='landlords.landlordprofile')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='viewing_requests', to='properties.property')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='viewing_requests', to='tenants.tenantprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['landlord', 'status', '-id'], name='viewingrequest_inbox_idx'), models.Index(fields=['notified_at', 'landlord'], name='viewingrequest_notify_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tenant', 'property', 'requested_on'), name='unique_viewing_request_per_day')],
+            },
+        ),
+    ]
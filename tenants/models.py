@@ -1,7 +1,10 @@
 # tenants/models.py
-from django.db import models
+from urllib.parse import urlencode
+
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from properties.models import Property
+from properties.filters import normalized_filter_spec, spec_matches, spec_rent_range
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -16,6 +19,155 @@ class FavoriteProperty(models.Model):
 
 @receiver(post_save, sender=TenantProfile)
 def assign_tenant_role(sender, instance, created, **kwargs):
-    if created:
+    # Signup already saves the role; only touch the user row if it differs
+    if created and instance.user.role != 'tenant':
         instance.user.role = 'tenant'
-        instance.user.save()
\ No newline at end of file
+        instance.user.save(update_fields=['role'])
+
+
+# =========================
+# Saved searches & new-listing alerts
+# =========================
+RENT_BUCKET_SIZE = 5000  # KES per rent bucket
+MAX_RENT_BUCKET = 2 ** 31 - 1  # "no maximum"
+
+
+def rent_bucket(rent):
+    # Clamped: a typed rent can be any size, the bucket columns are 32-bit
+    return min(max(rent, 0) // RENT_BUCKET_SIZE, MAX_RENT_BUCKET)
+
+
+class SavedSearchQuerySet(models.QuerySet):
+    def candidates_for(self, property_obj):
+        """
+        Searches that can match a listing, narrowed through the
+        (county, town, house_type, min_rent_bucket) index: each field is
+        either the listing's value or '' (any), and the listing's rent
+        bucket must fall inside the search's bucket range.
+        """
+        bucket = rent_bucket(property_obj.rent)
+        return self.filter(
+            county__in=[property_obj.county, ''],
+            town__in=[property_obj.town, ''],
+            house_type__in=[property_obj.house_type, ''],
+            min_rent_bucket__lte=bucket,
+            max_rent_bucket__gte=bucket,
+        )
+
+    def matching(self, property_obj):
+        # Buckets are coarse and q/location are free text: check exactly
+        return [s for s in self.candidates_for(property_obj) if spec_matches(s.spec, property_obj)]
+
+
+class SavedSearch(models.Model):
+    """A tenant's browse filters, stored as a normalized filter spec."""
+    tenant = models.ForeignKey(TenantProfile, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100, blank=True)
+    spec = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Indexed copies of the spec for the new-listing matcher ('' = any)
+    county = models.CharField(max_length=255, blank=True)
+    town = models.CharField(max_length=255, blank=True)
+    house_type = models.CharField(max_length=50, blank=True)
+    min_rent_bucket = models.PositiveIntegerField(default=0)
+    max_rent_bucket = models.PositiveIntegerField(default=MAX_RENT_BUCKET)
+
+    objects = SavedSearchQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['county', 'town', 'house_type', 'min_rent_bucket'], name='savedsearch_match_idx'),
+        ]
+
+    def __str__(self):
+        return self.name or ', '.join(f"{k}={v}" for k, v in sorted(self.spec.items())) or 'All properties'
+
+    def save(self, *args, **kwargs):
+        self.spec = dict(normalized_filter_spec(self.spec, resolve_towns=True))
+        self.county = self.spec.get('county', '')
+        self.town = self.spec.get('town', '')
+        self.house_type = self.spec.get('house_type', '')
+        min_rent, max_rent = spec_rent_range(self.spec)
+        self.min_rent_bucket = rent_bucket(min_rent) if min_rent is not None else 0
+        self.max_rent_bucket = rent_bucket(max_rent) if max_rent is not None else MAX_RENT_BUCKET
+        super().save(*args, **kwargs)
+
+    def get_browse_query(self):
+        return urlencode(sorted(self.spec.items()))
+
+
+class SavedSearchMatch(models.Model):
+    """A listing waiting to go out in its tenant's next alert digest."""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    property = models.ForeignKey(Property, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['saved_search', 'property'], name='unique_saved_search_match'),
+        ]
+        indexes = [
+            models.Index(fields=['sent_at', 'saved_search'], name='savedsearchmatch_queue_idx'),
+        ]
+
+
+def queue_saved_search_matches(property_obj):
+    """Queue a listing for every saved search it matches (once per search)."""
+    matches = [
+        SavedSearchMatch(saved_search=search, property=property_obj)
+        for search in SavedSearch.objects.matching(property_obj)
+    ]
+    SavedSearchMatch.objects.bulk_create(matches, ignore_conflicts=True)
+    return len(matches)
+
+
+@receiver(post_save, sender=Property)
+def match_new_listing(sender, instance, created, raw=False, **kwargs):
+    # New listings, and listings that come back on the market
+    came_back = getattr(instance, '_loaded_available', None) is False
+    if instance.available and not raw and (created or came_back):
+        transaction.on_commit(lambda: queue_saved_search_matches(instance))
+    instance._loaded_available = instance.available
+
+
+# =========================
+# Viewing requests
+# =========================
+class ViewingRequest(models.Model):
+    """
+    A tenant asking to view a listing. Inserted once per tenant, listing
+    and day (the unique constraint deduplicates); landlords are notified in
+    batches by send_viewing_notifications rather than per request.
+    """
+    PENDING = 'pending'
+    ACCEPTED = 'accepted'
+    DECLINED = 'declined'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (ACCEPTED, 'Accepted'),
+        (DECLINED, 'Declined'),
+    ]
+
+    tenant = models.ForeignKey(TenantProfile, on_delete=models.CASCADE, related_name='viewing_requests')
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='viewing_requests')
+    # Copied from the listing so the inbox reads one index, without a join
+    landlord = models.ForeignKey('landlords.LandlordProfile', on_delete=models.CASCADE, related_name='viewing_requests')
+    requested_on = models.DateField()
+    message = models.CharField(max_length=500, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tenant', 'property', 'requested_on'], name='unique_viewing_request_per_day'),
+        ]
+        indexes = [
+            models.Index(fields=['landlord', 'status', '-id'], name='viewingrequest_inbox_idx'),
+            models.Index(fields=['notified_at', 'landlord'], name='viewingrequest_notify_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tenant.user.username} → {self.property.house_number} ({self.requested_on})"
@@ -1,3 +1,106 @@
+from datetime import date
+
+from django.contrib.messages import get_messages
+from django.core import mail
 from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from landlords.models import LandlordProfile
+from properties.filters import normalized_filter_spec
+from properties.live import event_matches, listing_event
+from properties.models import Property, TownAlias
+from properties.towns import get_or_create_town
+from .alerts import send_viewing_notification_batch
+from .models import MAX_RENT_BUCKET, SavedSearch, TenantProfile, ViewingRequest
+
+
+class TownAliasMatchingTests(TestCase):
+    def setUp(self):
+        landlord = LandlordProfile.objects.create(
+            user=CustomUser.objects.create_user('landlord', 'l@example.com', 'pw', role='landlord'),
+        )
+        self.tenant = TenantProfile.objects.create(user=CustomUser.objects.create_user('tenant', 't@example.com', 'pw'))
+        town = get_or_create_town('Nairobi', 'Nairobi CBD')
+        TownAlias.objects.create(town=town, key='nrb cbd')
+        self.listing = Property.objects.create(
+            landlord=landlord, house_type='1BR', house_number='A1', rent=20000,
+            county='Nairobi', town='nairobi cbd', location='Moi Avenue',
+        )
+
+    def test_saved_search_typed_with_an_alias_matches(self):
+        search = SavedSearch.objects.create(tenant=self.tenant, spec={'county': 'nairobi', 'town': 'Nrb Cbd'})
+        self.assertEqual(search.town, 'Nairobi CBD')
+        self.assertEqual(SavedSearch.objects.matching(self.listing), [search])
+
+    def test_stream_spec_typed_with_an_alias_matches(self):
+        spec = normalized_filter_spec({'town': 'nrb  cbd'}, resolve_towns=True)
+        self.assertTrue(event_matches(spec, listing_event(self.listing)))
+
+    def test_unknown_town_keeps_the_typed_spelling(self):
+        spec = dict(normalized_filter_spec({'town': "kang'undo"}, resolve_towns=True))
+        self.assertEqual(spec['town'], "Kang'undo")
+
+    def test_huge_rent_bounds_fit_the_bucket_columns(self):
+        search = SavedSearch.objects.create(tenant=self.tenant, spec={'min_rent': '1' * 30, 'max_rent': '9' * 30})
+        search.refresh_from_db()
+        self.assertEqual((search.min_rent_bucket, search.max_rent_bucket), (MAX_RENT_BUCKET, MAX_RENT_BUCKET))
+
+
+class ViewingRequestTests(TestCase):
+    def setUp(self):
+        self.landlords = [
+            LandlordProfile.objects.create(
+                user=CustomUser.objects.create_user(f'landlord{n}', f'l{n}@example.com', 'pw', role='landlord'),
+            )
+            for n in range(2)
+        ]
+        self.listings = [
+            Property.objects.create(
+                landlord=landlord, house_type='1BR', house_number=f'A{n}', rent=20000,
+                county='Nairobi', town='Kilimani', location='Argwings Kodhek Road',
+            )
+            for n, landlord in enumerate([self.landlords[0], self.landlords[0], self.landlords[1]])
+        ]
+        self.user = CustomUser.objects.create_user('tenant', 't@example.com', 'pw')
+        self.tenant = TenantProfile.objects.create(user=self.user)
+
+    def test_second_request_on_the_same_day_is_not_queued(self):
+        self.client.force_login(self.user)
+        url = reverse('tenants:request_viewing', args=[self.listings[0].pk])
+        first = self.client.post(url, {'message': 'Saturday morning?'})
+        second = self.client.post(url)
+        self.assertEqual(ViewingRequest.objects.count(), 1)
+        self.assertEqual([m.level_tag for m in get_messages(first.wsgi_request)], ['success'])
+        # The first message was never displayed, so it is still queued
+        self.assertEqual(
+            [(m.level_tag, str(m)) for m in get_messages(second.wsgi_request)][-1],
+            ('info', "You already requested a viewing of this property today."),
+        )
+
+    def test_each_landlord_gets_one_email_for_all_their_requests(self):
+        for day in range(1, 4):
+            for listing in self.listings:
+                ViewingRequest.objects.create(
+                    tenant=self.tenant, property=listing, landlord_id=listing.landlord_id,
+                    requested_on=date(2026, 10, day),
+                )
+        self.assertEqual(send_viewing_notification_batch(), (2, 9))
+        self.assertEqual(
+            sorted((message.to, message.subject) for message in mail.outbox),
+            [
+                (['l0@example.com'], "6 new viewing requests for your properties"),
+                (['l1@example.com'], "3 new viewing requests for your properties"),
+            ],
+        )
+        self.assertFalse(ViewingRequest.objects.filter(notified_at__isnull=True).exists())
+        self.assertEqual(send_viewing_notification_batch(), (0, 0))
 
-# Create your tests here.
+    def test_batches_are_limited_to_whole_landlords(self):
+        for listing in self.listings:
+            ViewingRequest.objects.create(
+                tenant=self.tenant, property=listing, landlord_id=listing.landlord_id, requested_on=date(2026, 10, 1),
+            )
+        self.assertEqual(send_viewing_notification_batch(batch_size=1), (1, 2))
+        self.assertEqual(mail.outbox[0].to, ['l0@example.com'])
+        self.assertEqual(send_viewing_notification_batch(batch_size=1), (1, 1))
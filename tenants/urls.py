@@ -1,6 +1,8 @@
 # tenants/urls.py
 
+from django.conf import settings
 from django.urls import path
+from .async_views import AsyncBrowsePropertiesView
 from .views import (BrowsePropertiesView, 
                     FavoritePropertyView, 
                     FavoritePropertyDeleteView, 
@@ -8,17 +10,25 @@ from .views import (BrowsePropertiesView,
                     RequestViewingView,
                     TenantAccountUpdateView,
                     TenantProfileDeleteView,
+                    SaveSearchView,
+                    SavedSearchDeleteView,
 )
 
 
 app_name = 'tenants'
 
+# ASGI deployments serve the browse page from the async view
+browse_view = (AsyncBrowsePropertiesView if settings.ASYNC_VIEWS else BrowsePropertiesView).as_view()
+
 urlpatterns = [
-    path('', BrowsePropertiesView.as_view(), name='browse_properties'),
+    path('', browse_view, name='browse_properties'),
     path('favorite/<int:property_id>/', FavoritePropertyView.as_view(), name='favorite_property'),
     path('favorite/delete/<int:pk>/', FavoritePropertyDeleteView.as_view(), name='favorite_delete'),
     path('profile/', TenantProfileView.as_view(), name='tenant_profile'),
 
+    path('saved-searches/save/', SaveSearchView.as_view(), name='save_search'),
+    path('saved-searches/delete/<int:pk>/', SavedSearchDeleteView.as_view(), name='saved_search_delete'),
+
     path('request-viewing/<int:property_id>/', RequestViewingView.as_view(), name='request_viewing'),
 
     path('account/edit/', TenantAccountUpdateView.as_view(), name='tenant_account_edit'),
@@ -5,23 +5,34 @@ from django.views import View
 from django.views.generic import ListView, DeleteView, UpdateView
 from django.contrib.auth import login, logout
 from django.contrib import messages
+from accounts.deletion import request_account_deletion
 from properties.models import Property
-from .models import FavoriteProperty
-from django.urls import reverse_lazy
+from .models import FavoriteProperty, SavedSearch, ViewingRequest
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.urls import reverse, reverse_lazy
 from django.db.models import Q
 from .models import FavoriteProperty
 from django.contrib.auth.mixins import LoginRequiredMixin
 from properties.constants import KENYA_COUNTIES
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from properties.cache import AnonymousPageCacheMixin
+from properties.facets import towns_for_county
+from properties.filters import normalized_filter_spec
+from properties.fragments import ResultsFragmentMixin
+from properties.search import LOCATION_FIELDS, Q_FIELDS, fuzzy_filter
+from properties.towns import canonical_county, display_town_name, town_ids
 
 
 User = get_user_model()
 # -------------------------
 # Browse Properties with Pagination and Search/Filter
 # -------------------------
-class BrowsePropertiesView(ListView):
+class BrowsePropertiesView(AnonymousPageCacheMixin, ResultsFragmentMixin, ListView):
     model = Property
     template_name = 'tenants/browse_properties.html'
+    fragment_template_name = 'tenants/browse_results.html'
     context_object_name = 'properties'
     paginate_by = 6
 
@@ -31,53 +42,59 @@ class BrowsePropertiesView(ListView):
         q = self.request.GET.get('q', '')
         min_rent = self.request.GET.get('min_rent')
         max_rent = self.request.GET.get('max_rent')
-        county = self.request.GET.get('county', '').strip().title()
-        town = self.request.GET.get('town', '').strip().title()
+        county = canonical_county(self.request.GET.get('county', ''))
+        town = display_town_name(self.request.GET.get('town', ''))
         location = self.request.GET.get('location', '')
         house_type = self.request.GET.get('house_type', '')
 
-        if q:
-            queryset = queryset.filter(
-                Q(description__icontains=q) |
-                Q(location__icontains=q) |
-                Q(house_type__icontains=q)
-            )
-
         if min_rent:
             queryset = queryset.filter(rent__gte=min_rent)
         if max_rent:
             queryset = queryset.filter(rent__lte=max_rent)
         if county:
-            queryset = queryset.filter(county__iexact=county)
+            queryset = queryset.filter(county=county)
         if town:
-            queryset = queryset.filter(town__iexact=town)
-        if location:
-            queryset = queryset.filter(location__icontains=location)
+            queryset = queryset.filter(town_ref__in=town_ids(town, county))
         if house_type:
             queryset = queryset.filter(house_type=house_type)
 
-        return queryset
+        # Substring match first; when that finds nothing (usually a typo)
+        # fall back to similarity-ranked trigram search
+        self.fuzzy_search = False
+        exact = queryset
+        if q:
+            exact = exact.filter(
+                Q(description__icontains=q) |
+                Q(location__icontains=q) |
+                Q(house_type__icontains=q)
+            )
+        if location:
+            exact = exact.filter(location__icontains=location)
+        if exact is not queryset and not exact.exists():
+            self.fuzzy_search = True
+            if q:
+                queryset = fuzzy_filter(queryset, q, Q_FIELDS)
+            if location:
+                queryset = fuzzy_filter(queryset, location, LOCATION_FIELDS)
+        else:
+            queryset = exact
+
+        return queryset.with_cover_image()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        context['counties'] = KENYA_COUNTIES
-        context['county'] = self.request.GET.get('county', '').strip().title()
-        context['town'] = self.request.GET.get('town', '').strip().title()
-
-        # Populate town dropdown dynamically
-        if context['county']:
-            towns = Property.objects.filter(county__iexact=context['county']).values_list('town', flat=True).distinct()
-        else:
-            towns = Property.objects.values_list('town', flat=True).distinct()
-        context['towns'] = sorted([t.strip().title() for t in towns])
-
-        # Keep other filter values
+        # Keep filter values
+        context['county'] = canonical_county(self.request.GET.get('county', ''))
+        context['town'] = display_town_name(self.request.GET.get('town', ''))
         context['search_query'] = self.request.GET.get('q', '')
         context['min_rent'] = self.request.GET.get('min_rent', '')
         context['max_rent'] = self.request.GET.get('max_rent', '')
         context['location'] = self.request.GET.get('location', '')
         context['house_type'] = self.request.GET.get('house_type', '')
+        context['fuzzy_search'] = getattr(self, 'fuzzy_search', False)
+        # The live stream only holds a connection cheaply under ASGI
+        context['live_updates'] = settings.ASYNC_VIEWS
 
          # Favorite properties
         user = self.request.user
@@ -91,6 +108,11 @@ class BrowsePropertiesView(ListView):
             context['favorite_property_ids'] = []
 
         return context
+
+    def get_page_context_data(self):
+        # Dropdowns, not re-rendered by filter changes (properties/fragments.py)
+        county = canonical_county(self.request.GET.get('county', ''))
+        return {'counties': KENYA_COUNTIES, 'towns': towns_for_county(county)}
 # -------------------------
 # Favorite / Unfavorite Property
 # -------------------------
@@ -134,6 +156,45 @@ class FavoritePropertyDeleteView(LoginRequiredMixin, DeleteView):
         context['cancel_url'] = reverse_lazy('tenants:tenant_profile')
         return context
     
+# -------------------------
+# Saved searches (new-listing alerts)
+# -------------------------
+class SaveSearchView(LoginRequiredMixin, View):
+    def post(self, request):
+        tenant_profile = getattr(request.user, 'tenantprofile', None)
+        if not tenant_profile:
+            messages.error(request, "You need a tenant account to save searches.")
+            return redirect('tenants:browse_properties')
+
+        spec = dict(normalized_filter_spec(request.POST, resolve_towns=True))
+        saved = next((s for s in tenant_profile.saved_searches.all() if s.spec == spec), None)
+        if saved:
+            messages.info(request, "You already saved this search.")
+        else:
+            saved = SavedSearch.objects.create(
+                tenant=tenant_profile, spec=spec, name=request.POST.get('name', '').strip()[:100],
+            )
+            messages.success(request, "Search saved. We'll email you when new listings match it.")
+
+        query = saved.get_browse_query()
+        return redirect(reverse('tenants:browse_properties') + (f'?{query}' if query else ''))
+
+class SavedSearchDeleteView(LoginRequiredMixin, DeleteView):
+    model = SavedSearch
+    template_name = 'shared/confirm_delete.html'
+    success_url = reverse_lazy('tenants:tenant_profile')
+
+    def get_queryset(self):
+        # Only allow deleting the logged-in tenant's own searches
+        tenant_profile = getattr(self.request.user, 'tenantprofile', None)
+        return SavedSearch.objects.filter(tenant=tenant_profile)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['object_name'] = f"saved search: {self.object}"
+        context['cancel_url'] = reverse_lazy('tenants:tenant_profile')
+        return context
+
 # -------------------------
 # Tenant Profile
 # -------------------------
@@ -155,16 +216,39 @@ class TenantProfileView(View):
         context = {
             'tenant_profile': tenant_profile,
             'favorite_properties': favorite_properties,
+            'saved_searches': tenant_profile.saved_searches.order_by('-created_at'),
+            'viewing_requests': tenant_profile.viewing_requests.select_related('property').order_by('-id')[:10],
         }
         return render(request, self.template_name, context)
 
+# -------------------------
+# Viewing requests
+# -------------------------
 class RequestViewingView(LoginRequiredMixin, View):
-    def get(self, request, property_id):
-        property_obj = get_object_or_404(Property, id=property_id)
+    def post(self, request, property_id):
+        tenant_profile = getattr(request.user, 'tenantprofile', None)
+        if not tenant_profile:
+            messages.error(request, "You need a tenant account to request viewings.")
+            return redirect('properties:property_detail', pk=property_id)
 
-        # You can implement your "request viewing" logic here,
-        # e.g., send email to landlord or create a Request model
-        messages.success(request, f"You have requested a viewing for {property_obj.get_house_type_display} - {property_obj.house_number}")
+        property_obj = get_object_or_404(
+            Property.objects.only('landlord_id', 'house_type', 'house_number'), pk=property_id, available=True,
+        )
+        # One INSERT; a second request for the same listing on the same day
+        # hits the unique constraint instead of queueing a duplicate
+        try:
+            with transaction.atomic():
+                ViewingRequest.objects.create(
+                    tenant=tenant_profile,
+                    property=property_obj,
+                    landlord_id=property_obj.landlord_id,
+                    requested_on=timezone.localdate(),
+                    message=request.POST.get('message', '').strip()[:500],
+                )
+        except IntegrityError:
+            messages.info(request, "You already requested a viewing of this property today.")
+        else:
+            messages.success(request, f"You have requested a viewing for {property_obj.get_house_type_display()} - {property_obj.house_number}")
 
         return redirect('properties:property_detail', pk=property_id)
 
@@ -190,12 +274,13 @@ class TenantProfileDeleteView(LoginRequiredMixin, View):
     def post(self, request):
         user = request.user
 
+        # Deactivate now; process_account_deletions purges the profile and
+        # favorites later
+        request_account_deletion(user)
+
         # Log out and destroy session completely
         logout(request)
         request.session.flush()
 
-        # Delete user (cascades to TenantProfile)
-        user.delete()
-
         messages.success(request, "Your account has been deleted successfully.")
         return redirect('tenants:browse_properties')
\ No newline at end of file